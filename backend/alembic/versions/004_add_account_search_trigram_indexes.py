@@ -0,0 +1,56 @@
+"""Add trigram indexes for account search
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_INDEXES = {
+    "ix_copy_trade_accounts_buyer_name_trgm": "buyer_name",
+    "ix_copy_trade_accounts_account_number_trgm": "account_number",
+    "ix_copy_trade_accounts_buyer_email_trgm": "buyer_email",
+    "ix_copy_trade_accounts_server_trgm": "server",
+}
+
+
+def upgrade() -> None:
+    # pg_trgm only exists on Postgres; SQLite keeps scanning with LIKE.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for index_name, column in SEARCH_INDEXES.items():
+            op.create_index(
+                index_name,
+                "copy_trade_accounts",
+                [column],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        for index_name in SEARCH_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name="copy_trade_accounts",
+                postgresql_concurrently=True,
+                if_exists=True
+            )
@@ -0,0 +1,142 @@
+"""Partition security_audit_logs by month and use composite indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "security_audit_logs"
+
+SINGLE_COLUMN_INDEXES = {
+    "ix_security_audit_logs_id": ["id"],
+    "ix_security_audit_logs_user_id": ["user_id"],
+    "ix_security_audit_logs_action": ["action"],
+    "ix_security_audit_logs_target_type": ["target_type"],
+    "ix_security_audit_logs_target_id": ["target_id"],
+    "ix_security_audit_logs_success": ["success"],
+    "ix_security_audit_logs_created_at": ["created_at"],
+}
+
+# Audit queries filter by actor, action or target and read newest first.
+COMPOSITE_INDEXES = {
+    "ix_security_audit_logs_user_id_created_at": ["user_id", "created_at"],
+    "ix_security_audit_logs_action_created_at": ["action", "created_at"],
+    "ix_security_audit_logs_target_created_at": ["target_type", "target_id", "created_at"],
+    "ix_security_audit_logs_created_at_id": ["created_at", "id"],
+}
+
+# Months created ahead of time; the retention job keeps extending this window.
+MONTHS_AHEAD = 2
+
+COLUMNS_SQL = """
+    user_id INTEGER REFERENCES users (id),
+    action VARCHAR(64) NOT NULL,
+    target_type VARCHAR(64),
+    target_id VARCHAR(64),
+    success BOOLEAN NOT NULL DEFAULT false,
+    reason TEXT,
+    ip VARCHAR(64),
+    user_agent VARCHAR(255),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+"""
+COPY_COLUMNS = "id, user_id, action, target_type, target_id, success, reason, ip, user_agent"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def _create_indexes(indexes: dict[str, list[str]]) -> None:
+    for index_name, columns in indexes.items():
+        op.create_index(index_name, TABLE, columns, unique=False)
+
+
+def _drop_indexes(indexes: dict[str, list[str]]) -> None:
+    for index_name in indexes:
+        op.drop_index(index_name, table_name=TABLE)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # SQLite has no declarative partitioning; only the index layout changes.
+        _drop_indexes(SINGLE_COLUMN_INDEXES)
+        _create_indexes(COMPOSITE_INDEXES)
+        return
+
+    _drop_indexes(SINGLE_COLUMN_INDEXES)
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_legacy")
+    op.execute(f"ALTER TABLE {TABLE}_legacy RENAME CONSTRAINT {TABLE}_pkey TO {TABLE}_legacy_pkey")
+    # The partition key must be part of the primary key.
+    op.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id INTEGER NOT NULL DEFAULT nextval('{TABLE}_id_seq'),
+            {COLUMNS_SQL},
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+    oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {TABLE}_legacy")).scalar()
+    current = date.today().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest is not None else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        next_month = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {_partition_name(month)} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+
+    op.execute(
+        f"INSERT INTO {TABLE} ({COPY_COLUMNS}, created_at) "
+        f"SELECT {COPY_COLUMNS}, COALESCE(created_at, now()) FROM {TABLE}_legacy"
+    )
+    op.execute(f"DROP TABLE {TABLE}_legacy")
+    _create_indexes(COMPOSITE_INDEXES)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        _drop_indexes(COMPOSITE_INDEXES)
+        _create_indexes(SINGLE_COLUMN_INDEXES)
+        return
+
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned")
+    op.execute(f"ALTER TABLE {TABLE}_partitioned RENAME CONSTRAINT {TABLE}_pkey TO {TABLE}_partitioned_pkey")
+    op.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id INTEGER NOT NULL DEFAULT nextval('{TABLE}_id_seq'),
+            {COLUMNS_SQL},
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+    op.execute(
+        f"INSERT INTO {TABLE} ({COPY_COLUMNS}, created_at) "
+        f"SELECT {COPY_COLUMNS}, created_at FROM {TABLE}_partitioned"
+    )
+    op.execute(f"DROP TABLE {TABLE}_partitioned CASCADE")
+    _create_indexes(SINGLE_COLUMN_INDEXES)
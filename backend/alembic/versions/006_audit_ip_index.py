@@ -0,0 +1,29 @@
+"""Index security_audit_logs by source ip
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Brute-force investigations filter the audit API by source ip.
+    op.create_index(
+        "ix_security_audit_logs_ip_created_at",
+        "security_audit_logs",
+        ["ip", "created_at"],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_security_audit_logs_ip_created_at", table_name="security_audit_logs")
@@ -0,0 +1,68 @@
+"""Drop redundant refresh_tokens indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+ix_refresh_tokens_id duplicates the primary key and ix_refresh_tokens_token_hash
+duplicates the index behind the token_hash unique constraint, so every refresh
+paid for two extra index writes.
+
+A partial unique index on token_hash WHERE revoked_at IS NULL was considered
+and left out. The full unique constraint must stay: it is the ON CONFLICT
+target of the write-behind upserts (services.refresh_cache), which have to hit
+revoked rows too, and a partial index cannot serve that. With the constraint in
+place a partial index would only add a third write to every refresh.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "refresh_tokens"
+REDUNDANT_INDEXES = {
+    "ix_refresh_tokens_id": (["id"], False),
+    "ix_refresh_tokens_token_hash": (["token_hash"], True),
+}
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if not _is_postgres():
+        for index_name in REDUNDANT_INDEXES:
+            op.drop_index(index_name, table_name=TABLE)
+        return
+
+    with op.get_context().autocommit_block():
+        for index_name in REDUNDANT_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name=TABLE,
+                postgresql_concurrently=True,
+                if_exists=True
+            )
+
+
+def downgrade() -> None:
+    if not _is_postgres():
+        for index_name, (columns, unique) in REDUNDANT_INDEXES.items():
+            op.create_index(index_name, TABLE, columns, unique=unique)
+        return
+
+    with op.get_context().autocommit_block():
+        for index_name, (columns, unique) in REDUNDANT_INDEXES.items():
+            op.create_index(
+                index_name,
+                TABLE,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
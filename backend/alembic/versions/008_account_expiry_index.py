@@ -0,0 +1,54 @@
+"""Index copy_trade_accounts by (expiry_date, status) for the expiry sweeper
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "copy_trade_accounts"
+INDEX = "ix_copy_trade_accounts_expiry_date_status"
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    # The sweeper filters on expiry_date < today and checks status from the
+    # index entry, without visiting accounts that are not due.
+    if not _is_postgres():
+        op.create_index(INDEX, TABLE, ["expiry_date", "status"], unique=False)
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX,
+            TABLE,
+            ["expiry_date", "status"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    if not _is_postgres():
+        op.drop_index(INDEX, table_name=TABLE)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX,
+            table_name=TABLE,
+            postgresql_concurrently=True,
+            if_exists=True
+        )
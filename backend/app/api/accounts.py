@@ -22,6 +22,7 @@ from app.crud.account import (
     build_account_response_v1
 )
 from app.core.dependencies import require_admin
+from app.services.stats_cache import invalidate_public_stats
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -69,6 +70,7 @@ async def create_new_account(
         )
 
     account = create_account(db, account_data, current_user.id)
+    invalidate_public_stats()
     return build_account_response_v1(account)
 
 
@@ -94,6 +96,7 @@ async def update_existing_account(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta nao encontrada"
         )
+    invalidate_public_stats()
     return build_account_response_v1(account)
 
 
@@ -117,6 +120,7 @@ async def update_status(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta nao encontrada"
         )
+    invalidate_public_stats()
     return build_account_response_v1(account)
 
 
@@ -132,6 +136,7 @@ async def delete_existing_account(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta nao encontrada"
         )
+    invalidate_public_stats()
     return None
 
 
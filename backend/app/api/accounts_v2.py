@@ -1,71 +1,258 @@
-from datetime import datetime, timezone
-from typing import Optional
+import csv
+import io
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.core.dependencies import require_admin_v2, require_csrf
 from app.core.request_meta import get_request_ip, get_request_user_agent
-from app.core.security import verify_password
 from app.crud.account import (
+    ACCOUNT_STATUSES,
+    EXPORT_COLUMNS,
+    account_export_statement,
     build_account_response_v2,
     create_account,
     delete_account,
     get_account,
     get_account_by_number,
     get_accounts,
+    get_accounts_page,
     get_admin_stats,
     reveal_account_password,
     rotate_account_password,
     update_account,
     update_account_status,
+    update_accounts_status,
 )
-from app.db.database import get_db
+from app.crud.user import get_user_password_hash
+from app.db.database import get_async_db
 from app.db.models import User
 from app.schemas.account import (
     AccountAdminV2Response,
     AccountCreate,
+    AccountImportRequest,
+    AccountImportResponse,
     AccountUpdateV2,
     AdminStatsResponse,
+    BulkStatusUpdate,
+    BulkStatusUpdateResponse,
     PasswordRevealRequest,
     PasswordRevealResponse,
     PasswordRotateRequest,
     StatusUpdate,
 )
-from app.services.audit import log_security_event
+from app.services.account_import import prepare_import, write_import
+from app.services.audit import record_security_event
+from app.services.password_hashing import verify_password_async
 from app.services.rate_limit import enforce_rate_limit
+from app.services.stats_cache import invalidate_public_stats_async
 
 router = APIRouter(prefix="/api/v2/admin", tags=["admin-v2"])
 settings = get_settings()
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": NDJSON_MEDIA_TYPE}
+# Spreadsheet apps evaluate cells starting with these as formulas (OWASP CSV injection).
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
 
 
 @router.get("/accounts", response_model=list[AccountAdminV2Response])
 async def list_accounts_v2(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status_filter: Optional[str] = Query(default=None, alias="status"),
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin_v2)
+):
+    if skip and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use skip ou cursor, nao ambos"
+        )
+
+    # Legacy offset paging; kept for clients that still send skip.
+    if skip:
+        accounts = await db.run_sync(
+            get_accounts,
+            skip=skip,
+            limit=limit,
+            status=status_filter,
+            search=search
+        )
+        return [build_account_response_v2(acc) for acc in accounts]
+
+    try:
+        accounts, next_cursor = await db.run_sync(
+            get_accounts_page,
+            limit=limit,
+            cursor=cursor,
+            status=status_filter,
+            search=search
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor invalido"
+        )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [build_account_response_v2(acc) for acc in accounts]
+
+
+def _parse_export_columns(raw: Optional[str]) -> tuple[str, ...]:
+    if not raw:
+        return EXPORT_COLUMNS
+    columns = tuple(column.strip() for column in raw.split(",") if column.strip())
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if not columns or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Colunas invalidas: {', '.join(unknown)}" if unknown else "Nenhuma coluna informada"
+        )
+    return columns
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return _export_value(value)
+
+
+async def _export_accounts(
+    db: AsyncSession,
+    statement: Select,
+    columns: tuple[str, ...],
+    export_format: str
+) -> AsyncIterator[bytes]:
+    # yield_per streams through a server-side cursor: one partition of plain
+    # tuples in memory at a time, whatever the size of the inventory.
+    result = await db.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow(columns)
+    async for rows in result.partitions():
+        if export_format == "csv":
+            writer.writerows([_csv_cell(value) for value in row] for row in rows)
+        else:
+            for row in rows:
+                buffer.write(json.dumps(dict(zip(columns, map(_export_value, row)))) + "\n")
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+@router.get("/accounts/export")
+async def export_accounts_v2(
+    request: Request,
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
     status_filter: Optional[str] = Query(default=None, alias="status"),
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    columns: Optional[str] = Query(default=None, description="Colunas separadas por virgula"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
-    accounts = get_accounts(
+    selected = _parse_export_columns(columns)
+    await record_security_event(
         db,
-        skip=skip,
-        limit=limit,
-        status=status_filter,
-        search=search
+        action="account_export",
+        success=True,
+        user_id=current_user.id,
+        target_type="copy_trade_account",
+        ip=get_request_ip(request),
+        user_agent=get_request_user_agent(request)
     )
-    return [build_account_response_v2(acc) for acc in accounts]
+    filename = f"accounts-{datetime.now(timezone.utc):%Y%m%d}.{export_format}"
+    return StreamingResponse(
+        _export_accounts(
+            db,
+            account_export_statement(selected, status=status_filter, search=search),
+            selected,
+            export_format
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Cache-Control": "no-store",
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        }
+    )
+
+
+@router.patch(
+    "/accounts/status",
+    response_model=BulkStatusUpdateResponse,
+    dependencies=[Depends(require_csrf)]
+)
+async def bulk_update_status_v2(
+    payload: BulkStatusUpdate,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin_v2)
+):
+    for value in (payload.status, payload.current_status):
+        if value is not None and value not in ACCOUNT_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Status invalido. Valores validos: {list(ACCOUNT_STATUSES)}"
+            )
+    if payload.ids is None and not payload.current_status and not payload.search:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe ids ou um filtro"
+        )
+
+    updated_ids = await db.run_sync(
+        update_accounts_status,
+        payload.status,
+        ids=payload.ids,
+        current_status=payload.current_status,
+        search=payload.search
+    )
+    if updated_ids:
+        await invalidate_public_stats_async()
+    await record_security_event(
+        db,
+        action="account_status_bulk_update",
+        success=True,
+        user_id=current_user.id,
+        target_type="copy_trade_account",
+        ip=get_request_ip(request),
+        user_agent=get_request_user_agent(request)
+    )
+    return BulkStatusUpdateResponse(status=payload.status, updated=len(updated_ids), ids=updated_ids)
 
 
 @router.get("/accounts/{account_id}", response_model=AccountAdminV2Response)
 async def get_account_detail_v2(
     account_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
-    account = get_account(db, account_id)
+    account = await db.run_sync(get_account, account_id)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,19 +269,55 @@ async def get_account_detail_v2(
 )
 async def create_new_account_v2(
     account_data: AccountCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
-    existing = get_account_by_number(db, account_data.account_number)
+    existing = await db.run_sync(get_account_by_number, account_data.account_number)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Numero da conta ja existe"
         )
-    account = create_account(db, account_data, current_user.id)
+    account = await db.run_sync(create_account, account_data, current_user.id)
+    await invalidate_public_stats_async()
     return build_account_response_v2(account)
 
 
+@router.post(
+    "/accounts/import",
+    response_model=AccountImportResponse,
+    dependencies=[Depends(require_csrf)]
+)
+async def import_accounts_v2(
+    payload: AccountImportRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin_v2)
+):
+    if len(payload.accounts) > settings.account_import_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximo de {settings.account_import_max_rows} contas por importacao"
+        )
+
+    # Validation and encryption are CPU-bound: keep them off the event loop.
+    prepared = await run_in_threadpool(prepare_import, payload.accounts, user_id=current_user.id)
+    report = await db.run_sync(write_import, prepared, atomic=payload.atomic)
+    if report.created:
+        await invalidate_public_stats_async()
+    await record_security_event(
+        db,
+        action="account_import",
+        success=report.failed == 0,
+        user_id=current_user.id,
+        target_type="copy_trade_account",
+        reason=None if report.failed == 0 else "rows_rejected",
+        ip=get_request_ip(request),
+        user_agent=get_request_user_agent(request)
+    )
+    return AccountImportResponse.model_validate(report)
+
+
 @router.put(
     "/accounts/{account_id}",
     response_model=AccountAdminV2Response,
@@ -103,23 +326,24 @@ async def create_new_account_v2(
 async def update_existing_account_v2(
     account_id: int,
     account_data: AccountUpdateV2,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
     if account_data.account_number:
-        existing = get_account_by_number(db, account_data.account_number)
+        existing = await db.run_sync(get_account_by_number, account_data.account_number)
         if existing and existing.id != account_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Numero da conta ja existe"
             )
 
-    account = update_account(db, account_id, account_data)
+    account = await db.run_sync(update_account, account_id, account_data)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta nao encontrada"
         )
+    await invalidate_public_stats_async()
     return build_account_response_v2(account)
 
 
@@ -131,7 +355,7 @@ async def update_existing_account_v2(
 async def update_status_v2(
     account_id: int,
     status_data: StatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
     valid_statuses = ["pending", "approved", "in_copy", "expired", "suspended"]
@@ -141,12 +365,13 @@ async def update_status_v2(
             detail=f"Status invalido. Valores validos: {valid_statuses}"
         )
 
-    account = update_account_status(db, account_id, status_data.status)
+    account = await db.run_sync(update_account_status, account_id, status_data.status)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta nao encontrada"
         )
+    await invalidate_public_stats_async()
     return build_account_response_v2(account)
 
 
@@ -157,24 +382,25 @@ async def update_status_v2(
 )
 async def delete_existing_account_v2(
     account_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
-    success = delete_account(db, account_id)
+    success = await db.run_sync(delete_account, account_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta nao encontrada"
         )
+    await invalidate_public_stats_async()
     return None
 
 
 @router.get("/stats", response_model=AdminStatsResponse)
 async def get_statistics_v2(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
-    return get_admin_stats(db)
+    return await db.run_sync(get_admin_stats)
 
 
 @router.post(
@@ -187,20 +413,20 @@ async def reveal_account_password_v2(
     reveal_data: PasswordRevealRequest,
     request: Request,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
     ip = get_request_ip(request)
     user_agent = get_request_user_agent(request)
     try:
-        enforce_rate_limit(
+        await enforce_rate_limit(
             namespace="reveal_user",
             identifier=str(current_user.id),
             limit=3,
             window_seconds=600
         )
     except HTTPException:
-        log_security_event(
+        await record_security_event(
             db,
             action="account_password_reveal_rate_limit",
             success=False,
@@ -213,15 +439,17 @@ async def reveal_account_password_v2(
         )
         raise
 
-    account = get_account(db, account_id)
+    account = await db.run_sync(get_account, account_id)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta nao encontrada"
         )
 
-    if not verify_password(reveal_data.admin_password, current_user.hashed_password):
-        log_security_event(
+    # The cached principal carries no password hash; read it fresh for step-up auth.
+    admin_hash = await db.run_sync(get_user_password_hash, current_user.id)
+    if not admin_hash or not await verify_password_async(reveal_data.admin_password, admin_hash):
+        await record_security_event(
             db,
             action="account_password_reveal",
             success=False,
@@ -238,7 +466,7 @@ async def reveal_account_password_v2(
         )
 
     password = reveal_account_password(account)
-    log_security_event(
+    await record_security_event(
         db,
         action="account_password_reveal",
         success=True,
@@ -266,17 +494,17 @@ async def rotate_account_password_v2(
     account_id: int,
     rotate_data: PasswordRotateRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin_v2)
 ):
-    account = rotate_account_password(db, account_id, rotate_data.new_password)
+    account = await db.run_sync(rotate_account_password, account_id, rotate_data.new_password)
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conta nao encontrada"
         )
 
-    log_security_event(
+    await record_security_event(
         db,
         action="account_password_rotate",
         success=True,
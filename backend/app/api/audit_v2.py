@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.accounts_v2 import EXPORT_BATCH_SIZE, NDJSON_MEDIA_TYPE, NEXT_CURSOR_HEADER
+from app.core.dependencies import require_admin_v2
+from app.core.pagination import decode_time_cursor
+from app.core.request_meta import get_request_ip, get_request_user_agent
+from app.crud.audit import get_audit_logs_page
+from app.db.database import get_async_db
+from app.db.models import User
+from app.schemas.audit import SecurityAuditLogResponse
+from app.services.audit import record_security_event
+
+router = APIRouter(prefix="/api/v2/admin", tags=["admin-v2"])
+
+
+async def _export_audit_logs(
+    db: AsyncSession,
+    cursor: Optional[str],
+    filters: dict
+) -> AsyncIterator[bytes]:
+    # Walk the same keyset one batch at a time so memory stays flat no matter
+    # how many rows match. Committing after each batch ends the read
+    # transaction and hands the connection back to the pool while the client
+    # drains the chunk.
+    while True:
+        logs, cursor = await db.run_sync(
+            get_audit_logs_page,
+            limit=EXPORT_BATCH_SIZE,
+            cursor=cursor,
+            **filters
+        )
+        chunk = "".join(
+            SecurityAuditLogResponse.model_validate(log).model_dump_json() + "\n"
+            for log in logs
+        )
+        db.expunge_all()
+        await db.commit()
+        if chunk:
+            yield chunk.encode()
+        if cursor is None:
+            return
+
+
+@router.get("/audit", response_model=list[SecurityAuditLogResponse])
+async def list_audit_logs_v2(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    action: Optional[str] = None,
+    user_id: Optional[int] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    success: Optional[bool] = None,
+    ip: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    export_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin_v2)
+):
+    filters = {
+        "action": action,
+        "user_id": user_id,
+        "target_type": target_type,
+        "target_id": target_id,
+        "success": success,
+        "ip": ip,
+        "since": since,
+        "until": until,
+    }
+    if cursor:
+        try:
+            decode_time_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor invalido"
+            )
+
+    if export_format == "ndjson":
+        await record_security_event(
+            db,
+            action="audit_log_export",
+            success=True,
+            user_id=current_user.id,
+            target_type="security_audit_log",
+            ip=get_request_ip(request),
+            user_agent=get_request_user_agent(request)
+        )
+        return StreamingResponse(
+            _export_audit_logs(db, cursor, filters),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"Cache-Control": "no-store"}
+        )
+
+    logs, next_cursor = await db.run_sync(
+        get_audit_logs_page,
+        limit=limit,
+        cursor=cursor,
+        **filters
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return logs
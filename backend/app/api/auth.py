@@ -2,10 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.schemas.user import Token, LoginRequest, UserResponse
-from app.crud.user import authenticate_user
+from app.crud.user import get_user_by_username
 from app.core.security import create_access_token
 from app.core.dependencies import get_current_user
 from app.db.models import User
+from app.services.password_hashing import verify_password_async
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -16,8 +17,9 @@ async def login(
     response: Response,
     db: Session = Depends(get_db)
 ):
-    user = authenticate_user(db, login_data.username, login_data.password)
-    if not user:
+    # Only bcrypt goes to the hash pool; the lookup stays on the request's session.
+    user = get_user_by_username(db, login_data.username)
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario ou senha incorretos",
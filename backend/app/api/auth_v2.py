@@ -1,18 +1,23 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.core.dependencies import get_current_user_v2, require_csrf
 from app.core.request_meta import get_request_ip, get_request_user_agent
-from app.crud.user import authenticate_user
-from app.db.database import get_db
+from app.crud.user import authenticate_user_async
+from app.db.database import get_async_db
 from app.db.models import User
 from app.schemas.user import LoginRequest, MessageResponse, SessionLoginResponse, UserResponse
-from app.services.audit import log_security_event
+from app.services.audit import record_security_event
 from app.services.rate_limit import enforce_rate_limit
-from app.services.session import create_session_tokens, revoke_refresh_session, rotate_session_tokens
+from app.services.refresh_cache import RefreshSessionUnavailable
+from app.services.session import (
+    create_session_tokens_async,
+    revoke_refresh_session_async,
+    rotate_session_tokens_async
+)
 
 router = APIRouter(prefix="/api/v2/auth", tags=["auth-v2"])
 settings = get_settings()
@@ -69,21 +74,21 @@ async def login_v2(
     login_data: LoginRequest,
     response: Response,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     ip = get_request_ip(request) or "unknown"
     user_agent = get_request_user_agent(request)
 
     try:
-        enforce_rate_limit("login_ip", ip, limit=5, window_seconds=60)
-        enforce_rate_limit(
+        await enforce_rate_limit("login_ip", ip, limit=5, window_seconds=60)
+        await enforce_rate_limit(
             "login_username",
             login_data.username.lower(),
             limit=20,
             window_seconds=3600
         )
     except HTTPException:
-        log_security_event(
+        await record_security_event(
             db,
             action="auth_login_rate_limit",
             success=False,
@@ -95,9 +100,9 @@ async def login_v2(
         )
         raise
 
-    user = authenticate_user(db, login_data.username, login_data.password)
+    user = await authenticate_user_async(db, login_data.username, login_data.password)
     if not user:
-        log_security_event(
+        await record_security_event(
             db,
             action="auth_login",
             success=False,
@@ -112,7 +117,7 @@ async def login_v2(
             detail="Usuario ou senha incorretos"
         )
 
-    session_bundle = create_session_tokens(
+    session_bundle = await create_session_tokens_async(
         db,
         user=user,
         ip=ip,
@@ -125,7 +130,7 @@ async def login_v2(
         csrf_token=session_bundle.csrf_token
     )
     _set_no_store_headers(response)
-    log_security_event(
+    await record_security_event(
         db,
         action="auth_login",
         success=True,
@@ -143,7 +148,7 @@ async def login_v2(
 async def refresh_v2(
     request: Request,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     refresh_token = request.cookies.get(settings.session_cookie_name_refresh)
     csrf_token = request.cookies.get(settings.session_cookie_name_csrf)
@@ -157,14 +162,14 @@ async def refresh_v2(
         )
 
     try:
-        enforce_rate_limit(
+        await enforce_rate_limit(
             "refresh_session",
             refresh_token[:16],
             limit=10,
             window_seconds=60
         )
     except HTTPException:
-        log_security_event(
+        await record_security_event(
             db,
             action="auth_refresh_rate_limit",
             success=False,
@@ -174,7 +179,7 @@ async def refresh_v2(
         )
         raise
 
-    rotated = rotate_session_tokens(
+    rotated = await rotate_session_tokens_async(
         db,
         refresh_token=refresh_token,
         csrf_token=csrf_token,
@@ -182,7 +187,7 @@ async def refresh_v2(
         user_agent=user_agent
     )
     if rotated is None:
-        log_security_event(
+        await record_security_event(
             db,
             action="auth_refresh",
             success=False,
@@ -223,18 +228,36 @@ async def me_v2(
 async def logout_v2(
     request: Request,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user_v2)
 ):
     refresh_token = request.cookies.get(settings.session_cookie_name_refresh)
     ip = get_request_ip(request)
     user_agent = get_request_user_agent(request)
     if refresh_token:
-        revoke_refresh_session(db, refresh_token)
+        try:
+            await revoke_refresh_session_async(db, refresh_token)
+        except RefreshSessionUnavailable:
+            # Keep the cookies: reporting a logout that can still be undone
+            # would leave the session alive without the user knowing.
+            await record_security_event(
+                db,
+                action="auth_logout",
+                success=False,
+                user_id=current_user.id,
+                reason="session_store_unavailable",
+                ip=ip,
+                user_agent=user_agent
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servico de sessao indisponivel, tente novamente",
+                headers={"Retry-After": "1"}
+            )
 
     _clear_session_cookies(response)
     _set_no_store_headers(response)
-    log_security_event(
+    await record_security_event(
         db,
         action="auth_logout",
         success=True,
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import require_admin_v2
+from app.db.database import async_engine, engine
+from app.db.models import User
+from app.db.pool import describe_pool
+from app.services.audit import get_audit_writer
+from app.services.expiry_sweeper import get_expiry_sweeper
+from app.services.password_hashing import get_password_pool
+from app.services.refresh_cache import get_refresh_writer
+from app.services.revocation_cache import revoked_sessions
+
+router = APIRouter(prefix="/api/v2/admin", tags=["admin-v2"])
+
+
+@router.get("/metrics")
+async def get_runtime_metrics(current_user: User = Depends(require_admin_v2)):
+    """Per-worker runtime gauges used to size pools and queues."""
+    audit_writer = get_audit_writer()
+    refresh_writer = get_refresh_writer()
+    expiry_sweeper = get_expiry_sweeper()
+    return {
+        "password_hashing": get_password_pool().stats(),
+        "session_revocation": revoked_sessions.stats(),
+        "audit_writer": audit_writer.stats() if audit_writer else {"enabled": False},
+        "refresh_writer": refresh_writer.stats() if refresh_writer else {"enabled": False},
+        "expiry_sweeper": expiry_sweeper.stats() if expiry_sweeper else {"enabled": False},
+        "database": {
+            "sync": describe_pool(engine.pool),
+            "async": describe_pool(async_engine.pool),
+        },
+    }
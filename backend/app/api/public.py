@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.db.database import get_async_db
 from app.schemas.account import StatsResponse
-from app.crud.account import get_stats
+from app.services.stats_cache import build_etag, etag_matches, get_public_stats_payload
 
 router = APIRouter(prefix="/api/public", tags=["public"])
+settings = get_settings()
 
 
 @router.get("/stats", response_model=StatsResponse)
-async def get_public_stats(db: Session = Depends(get_db)):
+async def get_public_stats(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Returns only aggregated statistics.
     No individual account data is exposed for security.
     """
-    return get_stats(db)
+    payload = await get_public_stats_payload(db)
+    headers = {
+        "ETag": build_etag(payload),
+        "Cache-Control": f"public, max-age={settings.public_stats_cache_ttl_seconds}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
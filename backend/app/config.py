@@ -8,21 +8,33 @@ from cryptography.fernet import Fernet
 from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+RATE_LIMIT_ALGORITHMS = ("fixed_window", "sliding_window", "token_bucket")
+
 
 class Settings(BaseSettings):
     app_env: Literal["development", "test", "production"] = "development"
 
     # Database
     database_url: str = "sqlite:///./copytrade.db"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
 
     # JWT
     jwt_secret_key: str = ""
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
+    # Dead refresh rows are kept this long for forensics before the purge job deletes them
+    refresh_token_purge_grace_days: int = 7
+    refresh_token_purge_batch_size: int = 1000
 
     # Encryption
     encryption_key: str = ""
+    # Comma-separated retired keys, still accepted for decryption during rotation
+    encryption_previous_keys: str = ""
 
     # Session/Cookies
     session_cookie_name_access: str = "ct_access"
@@ -32,11 +44,51 @@ class Settings(BaseSettings):
     cookie_domain: str = ""
     password_reveal_ttl_seconds: int = 30
 
+    # bcrypt worker pool
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+
+    # Authenticated principal cache (local tier per worker, shared tier in the security store)
+    principal_cache_local_ttl_seconds: int = 5
+    principal_cache_ttl_seconds: int = 60
+
+    # Refresh session state in the security store; refresh_tokens rows are written behind
+    refresh_session_cache_enabled: bool = True
+    refresh_writer_enabled: bool = True
+    refresh_writer_queue_max_size: int = 10000
+    refresh_writer_batch_size: int = 500
+    refresh_writer_flush_interval_ms: int = 100
+
+    # Audit log writer (batched inserts off the request path)
+    audit_writer_enabled: bool = True
+    audit_queue_max_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval_ms: int = 200
+    audit_retention_months: int = 12
+
+    # Public stats cache
+    public_stats_cache_ttl_seconds: int = 30
+
+    # Moves accounts past expiry_date to "expired"; one worker runs it (Redis lease)
+    expiry_sweeper_enabled: bool = True
+    expiry_sweep_interval_seconds: int = 300
+    expiry_sweep_batch_size: int = 1000
+
+    # Bulk account import (API and app.jobs.import_accounts)
+    account_import_max_rows: int = 10000
+    account_import_chunk_size: int = 1000
+    account_import_workers: int = 4
+
     # CORS
     cors_origins: str = "http://localhost:3000,http://localhost:5173"
 
     # Redis (rate limit / distributed session state)
     redis_url: str = ""
+    redis_max_connections: int = 50
+    # Full reload of the per-worker revoked-session near-cache
+    revocation_resync_seconds: int = 60
+    # Per-namespace limiter overrides, e.g. "login_ip=sliding_window,login_username=token_bucket"
+    rate_limit_algorithms: str = ""
     trust_x_forwarded_for: bool = False
 
     # Admin
@@ -53,8 +105,32 @@ class Settings(BaseSettings):
     @field_validator(
         "access_token_expire_minutes",
         "refresh_token_expire_days",
+        "refresh_token_purge_grace_days",
+        "refresh_token_purge_batch_size",
         "v1_deprecation_window_days",
-        "password_reveal_ttl_seconds"
+        "password_reveal_ttl_seconds",
+        "public_stats_cache_ttl_seconds",
+        "principal_cache_local_ttl_seconds",
+        "principal_cache_ttl_seconds",
+        "refresh_writer_queue_max_size",
+        "refresh_writer_batch_size",
+        "refresh_writer_flush_interval_ms",
+        "redis_max_connections",
+        "revocation_resync_seconds",
+        "audit_queue_max_size",
+        "audit_batch_size",
+        "audit_flush_interval_ms",
+        "audit_retention_months",
+        "expiry_sweep_interval_seconds",
+        "expiry_sweep_batch_size",
+        "account_import_max_rows",
+        "account_import_chunk_size",
+        "account_import_workers",
+        "password_hash_workers",
+        "password_hash_max_queue",
+        "db_pool_size",
+        "db_pool_timeout_seconds",
+        "db_pool_recycle_seconds"
     )
     @classmethod
     def _validate_positive_ints(cls, value: int) -> int:
@@ -62,6 +138,13 @@ class Settings(BaseSettings):
             raise ValueError("Value must be greater than zero")
         return value
 
+    @field_validator("db_max_overflow")
+    @classmethod
+    def _validate_non_negative_ints(cls, value: int) -> int:
+        if value < 0:
+            raise ValueError("Value must not be negative")
+        return value
+
     @model_validator(mode="after")
     def _validate_security_settings(self) -> "Settings":
         if not self.jwt_secret_key:
@@ -82,6 +165,21 @@ class Settings(BaseSettings):
         except Exception as exc:  # pragma: no cover - direct validation branch
             raise ValueError("ENCRYPTION_KEY must be a valid Fernet key") from exc
 
+        for previous_key in self.encryption_keys[1:]:
+            try:
+                Fernet(previous_key.encode())
+            except Exception as exc:
+                raise ValueError(
+                    "ENCRYPTION_PREVIOUS_KEYS must contain valid Fernet keys"
+                ) from exc
+
+        for namespace, algorithm in self.rate_limit_algorithm_overrides.items():
+            if not namespace or algorithm not in RATE_LIMIT_ALGORITHMS:
+                raise ValueError(
+                    "RATE_LIMIT_ALGORITHMS entries must be namespace=algorithm with algorithm in "
+                    + ", ".join(RATE_LIMIT_ALGORITHMS)
+                )
+
         if not self.admin_password:
             if self.app_env == "production":
                 raise ValueError("ADMIN_PASSWORD is required in production")
@@ -101,6 +199,21 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
 
+    @property
+    def encryption_keys(self) -> list[str]:
+        """Primary key first, then retired keys (decrypt-only)."""
+        previous = [key.strip() for key in self.encryption_previous_keys.split(",") if key.strip()]
+        return [self.encryption_key, *previous]
+
+    @property
+    def rate_limit_algorithm_overrides(self) -> dict[str, str]:
+        overrides: dict[str, str] = {}
+        for entry in self.rate_limit_algorithms.split(","):
+            if entry.strip():
+                namespace, _, algorithm = entry.partition("=")
+                overrides[namespace.strip()] = algorithm.strip()
+        return overrides
+
     @property
     def cookie_secure(self) -> bool:
         return self.app_env == "production"
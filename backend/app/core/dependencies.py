@@ -4,12 +4,14 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_async_db, get_db
 from app.db.models import User
 from app.core.security import decode_token
 from app.config import get_settings
-from app.services.session import is_access_session_revoked
+from app.services.principal_cache import cache_principal, get_cached_principal
+from app.services.session import is_access_session_revoked_async
 
 security = HTTPBearer(auto_error=False)
 settings = get_settings()
@@ -41,7 +43,7 @@ async def require_admin(
     return current_user
 
 
-def _user_from_payload(payload: dict | None, db: Session) -> User:
+def _username_from_payload(payload: dict | None) -> str:
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,7 +57,10 @@ def _user_from_payload(payload: dict | None, db: Session) -> User:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token invalido",
         )
+    return username
+
 
+def _load_active_user(db: Session, username: str) -> User:
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise HTTPException(
@@ -72,21 +77,29 @@ def _user_from_payload(payload: dict | None, db: Session) -> User:
     return user
 
 
+def _user_from_payload(payload: dict | None, db: Session) -> User:
+    return _load_active_user(db, _username_from_payload(payload))
+
+
 async def get_current_user_v2(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     token = request.cookies.get(settings.session_cookie_name_access)
     payload = decode_token(token) if token else None
-    user = _user_from_payload(payload, db)
+    username = _username_from_payload(payload)
+    user = await get_cached_principal(username)
+    if user is None:
+        user = await db.run_sync(_load_active_user, username)
+        await cache_principal(user)
 
-    session_id = payload.get("sid") if payload else None
+    session_id = payload.get("sid")
     if not session_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Sessao invalida"
         )
-    if is_access_session_revoked(session_id):
+    if await is_access_session_revoked_async(session_id):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Sessao revogada"
@@ -0,0 +1,71 @@
+import time
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import Settings, get_settings
+
+BASE_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "Referrer-Policy": "no-referrer",
+    "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+}
+HSTS_HEADER_VALUE = "max-age=31536000; includeSubDomains"
+V1_PATH_PREFIXES = ("/api/auth", "/api/admin")
+V1_HEADER_NAMES = {b"deprecation", b"sunset"}
+
+
+def _encode_headers(headers: dict[str, str]) -> list[tuple[bytes, bytes]]:
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+
+class ResponseHeadersMiddleware:
+    """Security headers on every response plus the v1 deprecation/sunset guard.
+
+    Plain ASGI: headers are added to `http.response.start`, so bodies (including
+    streaming ones) pass through untouched. Everything derived from settings is
+    computed when the middleware stack is built.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Optional[Settings] = None) -> None:
+        settings = settings or get_settings()
+        self.app = app
+
+        security_headers = dict(BASE_SECURITY_HEADERS)
+        if settings.cookie_secure:
+            security_headers["Strict-Transport-Security"] = HSTS_HEADER_VALUE
+        self.security_headers = _encode_headers(security_headers)
+
+        deprecation_headers = {"Deprecation": "true", "Sunset": settings.v1_sunset_http}
+        self.deprecation_headers = _encode_headers(deprecation_headers)
+        self.sunset_timestamp = settings.v1_sunset_at.timestamp()
+        self.gone_response = JSONResponse(
+            status_code=410,
+            content={"detail": "API v1 descontinuada. Use /api/v2."},
+            headers=deprecation_headers
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        is_v1_path = scope["path"].startswith(V1_PATH_PREFIXES)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                if is_v1_path:
+                    headers = [header for header in headers if header[0].lower() not in V1_HEADER_NAMES]
+                    headers.extend(self.deprecation_headers)
+                present = {name.lower() for name, _ in headers}
+                headers.extend(header for header in self.security_headers if header[0] not in present)
+                message["headers"] = headers
+            await send(message)
+
+        if is_v1_path and time.time() >= self.sunset_timestamp:
+            await self.gone_response(scope, receive, send_with_headers)
+            return
+        await self.app(scope, receive, send_with_headers)
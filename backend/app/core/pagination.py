@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+
+
+def encode_cursor(last_id: int, rank: Optional[int] = None) -> str:
+    payload: dict[str, int] = {"id": last_id}
+    if rank is not None:
+        payload["rank"] = rank
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_valid_int(value: object) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor: str) -> tuple[int, Optional[int]]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload["id"]
+        rank = payload.get("rank")
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+
+    if not _is_valid_int(last_id) or last_id < 0:
+        raise ValueError("Invalid pagination cursor")
+    if rank is not None and not _is_valid_int(rank):
+        raise ValueError("Invalid pagination cursor")
+    return last_id, rank
+
+
+def encode_time_cursor(last_id: int, created_at: datetime) -> str:
+    payload = {"id": last_id, "ts": created_at.isoformat()}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_time_cursor(cursor: str) -> tuple[int, datetime]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload["id"]
+        created_at = datetime.fromisoformat(payload["ts"])
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+
+    if not _is_valid_int(last_id) or last_id < 0:
+        raise ValueError("Invalid pagination cursor")
+    return last_id, created_at
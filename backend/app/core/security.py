@@ -1,12 +1,13 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import hashlib
 import secrets
-from typing import Optional
+from typing import Iterable, Optional
 
 import jwt
 from jwt import InvalidTokenError
 from passlib.context import CryptContext
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from app.config import get_settings
 
 settings = get_settings()
@@ -57,17 +58,22 @@ def decode_token(token: str) -> Optional[dict]:
 
 
 # Account password encryption (Fernet)
-def get_fernet_cipher() -> Fernet:
-    key = settings.encryption_key
-    if not key:
-        raise ValueError("ENCRYPTION_KEY not set")
-
+@lru_cache(maxsize=8)
+def _build_cipher(keys: tuple[str, ...]) -> MultiFernet:
+    # Parsing keys is the expensive part; do it once per key ring.
     try:
-        return Fernet(key.encode())
+        return MultiFernet([Fernet(key.encode()) for key in keys])
     except Exception as exc:
         raise ValueError("ENCRYPTION_KEY must be a valid Fernet key") from exc
 
 
+def get_fernet_cipher() -> MultiFernet:
+    """Cipher for the configured key ring; encrypts with the primary key."""
+    if not settings.encryption_key:
+        raise ValueError("ENCRYPTION_KEY not set")
+    return _build_cipher(tuple(settings.encryption_keys))
+
+
 def encrypt_account_password(password: str) -> str:
     cipher = get_fernet_cipher()
     return cipher.encrypt(password.encode()).decode()
@@ -78,6 +84,29 @@ def decrypt_account_password(encrypted: str) -> str:
     return cipher.decrypt(encrypted.encode()).decode()
 
 
+def rotate_encrypted_value(encrypted: str) -> Optional[str]:
+    """Re-encrypt under the primary key; None when already current.
+
+    Raises InvalidToken when no key in the ring can decrypt the value.
+    """
+    cipher = get_fernet_cipher()
+    try:
+        _build_cipher((settings.encryption_key,)).decrypt(encrypted.encode())
+        return None
+    except InvalidToken:
+        return cipher.rotate(encrypted.encode()).decode()
+
+
+def encrypt_many(passwords: Iterable[str]) -> list[str]:
+    cipher = get_fernet_cipher()
+    return [cipher.encrypt(password.encode()).decode() for password in passwords]
+
+
+def decrypt_many(encrypted_values: Iterable[str]) -> list[str]:
+    cipher = get_fernet_cipher()
+    return [cipher.decrypt(value.encode()).decode() for value in encrypted_values]
+
+
 def create_refresh_token_value() -> str:
     return secrets.token_urlsafe(48)
 
@@ -1,14 +1,103 @@
 from __future__ import annotations
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Integer, Select, and_, any_, bindparam, case, cast, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from datetime import date
 from typing import Optional, Any
 from decimal import Decimal
 from app.db.models import CopyTradeAccount
 from app.schemas.account import AccountCreate, AccountUpdate, AccountUpdateV2
+from app.core.pagination import decode_cursor, encode_cursor
 from app.core.security import encrypt_account_password, decrypt_account_password
 
+ACCOUNT_STATUSES = ("pending", "approved", "in_copy", "expired", "suspended")
+PHASE_STATUSES = ("not_started", "in_progress", "passed", "failed")
+SEARCH_COLUMNS = (
+    CopyTradeAccount.buyer_name,
+    CopyTradeAccount.account_number,
+    CopyTradeAccount.buyer_email,
+    CopyTradeAccount.server,
+)
+EXPORT_COLUMNS = (
+    "id",
+    "account_number",
+    "server",
+    "buyer_name",
+    "buyer_email",
+    "buyer_phone",
+    "buyer_notes",
+    "purchase_date",
+    "expiry_date",
+    "purchase_price",
+    "status",
+    "copy_count",
+    "max_copies",
+    "margin_size",
+    "phase1_target",
+    "phase1_status",
+    "phase2_target",
+    "phase2_status",
+    "created_at",
+    "updated_at",
+    "created_by",
+)
+
+
+def _search_filter(search: str):
+    pattern = f"%{search}%"
+    return or_(*(column.ilike(pattern) for column in SEARCH_COLUMNS))
+
+
+def _search_rank(dialect_name: str, search: str):
+    """Integer relevance score, higher is better.
+
+    Postgres ranks by trigram similarity, computed per matching row (the
+    pg_trgm GIN indexes serve the ILIKE filter, not the ordering); other
+    dialects fall back to exact > prefix > substring tiers.
+    """
+    if dialect_name == "postgresql":
+        similarity = func.greatest(
+            *(func.similarity(column, search) for column in SEARCH_COLUMNS)
+        )
+        return cast(func.coalesce(similarity, 0) * 1000, Integer)
+
+    return case(
+        (or_(*(column.ilike(search) for column in SEARCH_COLUMNS)), 3),
+        (or_(*(column.ilike(f"{search}%") for column in SEARCH_COLUMNS)), 2),
+        else_=1
+    )
+
+
+def _account_filters(status: Optional[str] = None, search: Optional[str] = None) -> list:
+    filters = []
+    if status:
+        filters.append(CopyTradeAccount.status == status)
+    if search:
+        filters.append(_search_filter(search))
+    return filters
+
+
+def _filtered_accounts_query(
+    db: Session,
+    status: Optional[str] = None,
+    search: Optional[str] = None
+):
+    return db.query(CopyTradeAccount).filter(*_account_filters(status, search))
+
+
+def account_export_statement(
+    columns: tuple[str, ...] = EXPORT_COLUMNS,
+    status: Optional[str] = None,
+    search: Optional[str] = None
+) -> Select:
+    """Plain column rows ordered by id; the encrypted password is never exported."""
+    return (
+        select(*(getattr(CopyTradeAccount, column) for column in columns))
+        .where(*_account_filters(status, search))
+        .order_by(CopyTradeAccount.id)
+    )
+
 
 def get_accounts(
     db: Session,
@@ -17,14 +106,61 @@ def get_accounts(
     status: Optional[str] = None,
     search: Optional[str] = None
 ) -> list[CopyTradeAccount]:
-    query = db.query(CopyTradeAccount)
-    if status:
-        query = query.filter(CopyTradeAccount.status == status)
+    query = _filtered_accounts_query(db, status=status, search=search)
     if search:
-        query = query.filter(CopyTradeAccount.buyer_name.ilike(f"%{search}%"))
+        rank = _search_rank(db.get_bind().dialect.name, search)
+        query = query.order_by(rank.desc(), CopyTradeAccount.id)
+    else:
+        query = query.order_by(CopyTradeAccount.id)
     return query.offset(skip).limit(limit).all()
 
 
+def get_accounts_page(
+    db: Session,
+    *,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None
+) -> tuple[list[CopyTradeAccount], Optional[str]]:
+    """Keyset page ordered by id, or by (rank, id) when searching.
+
+    Unsearched pages seek on the primary key. Searched pages re-scan the
+    match set: the rank is computed per row, so no index serves the
+    (rank, id) seek and every page scores and sorts all matching rows again.
+    The cost is bounded by how many rows match the search, not by the page.
+
+    Raises ValueError for a malformed cursor.
+    """
+    query = _filtered_accounts_query(db, status=status, search=search)
+    last_id, last_rank = decode_cursor(cursor) if cursor else (None, None)
+
+    if not search:
+        if last_id is not None:
+            query = query.filter(CopyTradeAccount.id > last_id)
+        # One extra row tells us whether another page exists without a COUNT.
+        rows = query.order_by(CopyTradeAccount.id).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], encode_cursor(rows[limit - 1].id)
+
+    rank = _search_rank(db.get_bind().dialect.name, search)
+    query = query.add_columns(rank)
+    if last_id is not None:
+        if last_rank is None:
+            raise ValueError("Invalid pagination cursor")
+        query = query.filter(or_(
+            rank < last_rank,
+            and_(rank == last_rank, CopyTradeAccount.id > last_id)
+        ))
+    ranked = query.order_by(rank.desc(), CopyTradeAccount.id).limit(limit + 1).all()
+    accounts = [account for account, _ in ranked[:limit]]
+    if len(ranked) <= limit:
+        return accounts, None
+    last_account, last_account_rank = ranked[limit - 1]
+    return accounts, encode_cursor(last_account.id, rank=last_account_rank)
+
+
 def get_account(db: Session, account_id: int) -> CopyTradeAccount | None:
     return db.query(CopyTradeAccount).filter(
         CopyTradeAccount.id == account_id
@@ -114,6 +250,38 @@ def update_account_status(
     return db_account
 
 
+def _id_filter(dialect_name: str, ids: list[int]):
+    if dialect_name == "postgresql":
+        # One array parameter however many ids are sent.
+        return CopyTradeAccount.id == any_(bindparam("account_ids", ids, type_=ARRAY(Integer)))
+    return CopyTradeAccount.id.in_(ids)
+
+
+def update_accounts_status(
+    db: Session,
+    status: str,
+    *,
+    ids: Optional[list[int]] = None,
+    current_status: Optional[str] = None,
+    search: Optional[str] = None
+) -> list[int]:
+    """Set `status` on every matching account in one UPDATE; returns the ids changed.
+
+    Accounts already in `status` are left alone and not returned.
+    """
+    stmt = (
+        update(CopyTradeAccount)
+        .where(CopyTradeAccount.status != status, *_account_filters(current_status, search))
+        .values(status=status)
+        .returning(CopyTradeAccount.id)
+    )
+    if ids is not None:
+        stmt = stmt.where(_id_filter(db.get_bind().dialect.name, ids))
+    updated = sorted(db.scalars(stmt))
+    db.commit()
+    return updated
+
+
 def delete_account(db: Session, account_id: int) -> bool:
     db_account = get_account(db, account_id)
     if not db_account:
@@ -124,53 +292,42 @@ def delete_account(db: Session, account_id: int) -> bool:
     return True
 
 
-def get_stats(db: Session) -> dict:
-    total = db.query(func.count(CopyTradeAccount.id)).scalar() or 0
-    pending = db.query(func.count(CopyTradeAccount.id)).filter(
-        CopyTradeAccount.status == "pending"
-    ).scalar() or 0
-    approved = db.query(func.count(CopyTradeAccount.id)).filter(
-        CopyTradeAccount.status == "approved"
-    ).scalar() or 0
-    in_copy = db.query(func.count(CopyTradeAccount.id)).filter(
-        CopyTradeAccount.status == "in_copy"
-    ).scalar() or 0
-    expired = db.query(func.count(CopyTradeAccount.id)).filter(
-        CopyTradeAccount.status == "expired"
-    ).scalar() or 0
-    suspended = db.query(func.count(CopyTradeAccount.id)).filter(
-        CopyTradeAccount.status == "suspended"
-    ).scalar() or 0
+def _status_count_columns() -> list:
+    columns = [func.count(CopyTradeAccount.id).label("total_accounts")]
+    for status in ACCOUNT_STATUSES:
+        columns.append(
+            func.count(case((CopyTradeAccount.status == status, 1))).label(status)
+        )
+    return columns
 
-    return {
-        "total_accounts": total,
-        "pending": pending,
-        "approved": approved,
-        "in_copy": in_copy,
-        "expired": expired,
-        "suspended": suspended
-    }
 
+def _stats_from_row(row) -> dict:
+    stats = {"total_accounts": row.total_accounts}
+    for status in ACCOUNT_STATUSES:
+        stats[status] = getattr(row, status)
+    return stats
 
-def get_admin_stats(db: Session) -> dict:
-    stats = get_stats(db)
 
-    # Total revenue
-    total_revenue = db.query(
-        func.coalesce(func.sum(CopyTradeAccount.purchase_price), 0)
-    ).scalar() or Decimal("0")
+def get_stats(db: Session) -> dict:
+    row = db.query(*_status_count_columns()).one()
+    return _stats_from_row(row)
 
-    # Accounts created this month
-    today = date.today()
-    first_of_month = today.replace(day=1)
-    accounts_this_month = db.query(func.count(CopyTradeAccount.id)).filter(
-        CopyTradeAccount.purchase_date >= first_of_month
-    ).scalar() or 0
+
+def get_admin_stats(db: Session) -> dict:
+    # Single scan: status counts, revenue and this month's purchases together.
+    first_of_month = date.today().replace(day=1)
+    row = db.query(
+        *_status_count_columns(),
+        func.coalesce(func.sum(CopyTradeAccount.purchase_price), 0).label("total_revenue"),
+        func.count(
+            case((CopyTradeAccount.purchase_date >= first_of_month, 1))
+        ).label("accounts_this_month")
+    ).one()
 
     return {
-        **stats,
-        "total_revenue": total_revenue,
-        "accounts_this_month": accounts_this_month
+        **_stats_from_row(row),
+        "total_revenue": row.total_revenue or Decimal("0"),
+        "accounts_this_month": row.accounts_this_month
     }
 
 
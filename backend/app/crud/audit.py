@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_time_cursor, encode_time_cursor
+from app.db.models import SecurityAuditLog
+
+
+def _filtered_audit_query(
+    db: Session,
+    *,
+    action: Optional[str] = None,
+    user_id: Optional[int] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    success: Optional[bool] = None,
+    ip: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    # Equality filters lead each composite index; created_at bounds also
+    # prune partitions on Postgres.
+    query = db.query(SecurityAuditLog)
+    if action:
+        query = query.filter(SecurityAuditLog.action == action)
+    if user_id is not None:
+        query = query.filter(SecurityAuditLog.user_id == user_id)
+    if target_type:
+        query = query.filter(SecurityAuditLog.target_type == target_type)
+    if target_id:
+        query = query.filter(SecurityAuditLog.target_id == target_id)
+    if success is not None:
+        query = query.filter(SecurityAuditLog.success == success)
+    if ip:
+        query = query.filter(SecurityAuditLog.ip == ip)
+    if since is not None:
+        query = query.filter(SecurityAuditLog.created_at >= since)
+    if until is not None:
+        query = query.filter(SecurityAuditLog.created_at < until)
+    return query
+
+
+def get_audit_logs_page(
+    db: Session,
+    *,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    **filters: Any
+) -> tuple[list[SecurityAuditLog], Optional[str]]:
+    """Keyset page ordered newest first by (created_at, id).
+
+    Raises ValueError for a malformed cursor.
+    """
+    query = _filtered_audit_query(db, **filters)
+    if cursor:
+        last_id, last_created_at = decode_time_cursor(cursor)
+        query = query.filter(
+            tuple_(SecurityAuditLog.created_at, SecurityAuditLog.id)
+            < tuple_(last_created_at, last_id)
+        )
+
+    rows = query.order_by(
+        SecurityAuditLog.created_at.desc(),
+        SecurityAuditLog.id.desc()
+    ).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_time_cursor(last.id, last.created_at)
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.db.models import User
 from app.schemas.user import UserCreate
 from app.core.security import get_password_hash, verify_password
+from app.services.password_hashing import verify_password_async
+from app.services.revocation_cache import publish_principal_invalidation
 
 
 def get_user_by_username(db: Session, username: str) -> User | None:
     return db.query(User).filter(User.username == username).first()
 
 
+def get_user_password_hash(db: Session, user_id: int) -> str | None:
+    return db.query(User.hashed_password).filter(User.id == user_id).scalar()
+
+
 def get_user_by_email(db: Session, email: str) -> User | None:
     return db.query(User).filter(User.email == email).first()
 
@@ -28,6 +35,32 @@ def create_user(db: Session, user: UserCreate) -> User:
     return db_user
 
 
+def update_user_flags(
+    db: Session,
+    user: User,
+    *,
+    is_active: bool | None = None,
+    is_admin: bool | None = None
+) -> User:
+    """Change account flags and drop the cached principal so auth sees it at once."""
+    if is_active is not None:
+        user.is_active = is_active
+    if is_admin is not None:
+        user.is_admin = is_admin
+    db.commit()
+    db.refresh(user)
+    publish_principal_invalidation(user.username)
+    return user
+
+
+def update_user_password(db: Session, user: User, password: str) -> User:
+    user.hashed_password = get_password_hash(password)
+    db.commit()
+    db.refresh(user)
+    publish_principal_invalidation(user.username)
+    return user
+
+
 def authenticate_user(db: Session, username: str, password: str) -> User | None:
     user = get_user_by_username(db, username)
     if not user:
@@ -35,3 +68,13 @@ def authenticate_user(db: Session, username: str, password: str) -> User | None:
     if not verify_password(password, user.hashed_password):
         return None
     return user
+
+
+async def authenticate_user_async(db: AsyncSession, username: str, password: str) -> User | None:
+    """Same as authenticate_user, with bcrypt offloaded to the hash pool."""
+    user = await db.run_sync(get_user_by_username, username)
+    if not user:
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    return user
@@ -1,17 +1,51 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import get_settings
+from app.db.pool import PoolWaitStats, pool_engine_options
 
 settings = get_settings()
 
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    scheme, separator, rest = database_url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+
 connect_args = (
     {"check_same_thread": False}
     if settings.database_url.startswith("sqlite")
     else {}
 )
-engine = create_engine(settings.database_url, connect_args=connect_args)
+sync_pool_wait_stats = PoolWaitStats()
+async_pool_wait_stats = PoolWaitStats()
+
+engine = create_engine(
+    settings.database_url,
+    connect_args=connect_args,
+    **pool_engine_options(settings, QueuePool, sync_pool_wait_stats)
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# v2 routes run on the event loop; the async engine keeps their DB I/O off it.
+async_engine = create_async_engine(
+    get_async_database_url(settings.database_url),
+    **pool_engine_options(settings, AsyncAdaptedQueuePool, async_pool_wait_stats)
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -21,3 +55,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def dialect_insert(db: Session, model):
+    """INSERT with ON CONFLICT support for the session's dialect (PostgreSQL or SQLite)."""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, Boolean, DateTime, Date,
-    Numeric, Text, ForeignKey, CheckConstraint
+    Numeric, Text, ForeignKey, CheckConstraint, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -93,16 +93,42 @@ class CopyTradeAccount(Base):
             "phase2_status IS NULL OR phase2_status IN ('not_started', 'in_progress', 'passed', 'failed')",
             name="valid_phase2_status"
         ),
+        Index(
+            "ix_copy_trade_accounts_buyer_name_trgm",
+            "buyer_name",
+            postgresql_using="gin",
+            postgresql_ops={"buyer_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_copy_trade_accounts_account_number_trgm",
+            "account_number",
+            postgresql_using="gin",
+            postgresql_ops={"account_number": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_copy_trade_accounts_buyer_email_trgm",
+            "buyer_email",
+            postgresql_using="gin",
+            postgresql_ops={"buyer_email": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_copy_trade_accounts_server_trgm",
+            "server",
+            postgresql_using="gin",
+            postgresql_ops={"server": "gin_trgm_ops"}
+        ),
+        # Expiry sweeper (migration 008)
+        Index("ix_copy_trade_accounts_expiry_date_status", "expiry_date", "status"),
     )
 
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     session_id = Column(String(64), nullable=False, index=True)
-    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
     csrf_token = Column(String(128), nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -116,16 +142,30 @@ class RefreshToken(Base):
 
 class SecurityAuditLog(Base):
     __tablename__ = "security_audit_logs"
+    # On Postgres the table is partitioned by month on created_at (migration 005)
+    # and its primary key is (id, created_at); ids stay unique via the sequence.
+    __table_args__ = (
+        Index("ix_security_audit_logs_user_id_created_at", "user_id", "created_at"),
+        Index("ix_security_audit_logs_action_created_at", "action", "created_at"),
+        Index(
+            "ix_security_audit_logs_target_created_at",
+            "target_type",
+            "target_id",
+            "created_at"
+        ),
+        Index("ix_security_audit_logs_created_at_id", "created_at", "id"),
+        Index("ix_security_audit_logs_ip_created_at", "ip", "created_at"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    action = Column(String(64), nullable=False, index=True)
-    target_type = Column(String(64), nullable=True, index=True)
-    target_id = Column(String(64), nullable=True, index=True)
-    success = Column(Boolean, nullable=False, default=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    action = Column(String(64), nullable=False)
+    target_type = Column(String(64), nullable=True)
+    target_id = Column(String(64), nullable=True)
+    success = Column(Boolean, nullable=False, default=False)
     reason = Column(Text, nullable=True)
     ip = Column(String(64), nullable=True)
     user_agent = Column(String(255), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user = relationship("User", back_populates="security_logs")
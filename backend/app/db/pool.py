@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.config import Settings
+
+
+class PoolWaitStats:
+    """Time spent waiting for a pooled connection, shared across pool recreation."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, waited_seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += waited_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, waited_seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            average = self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(average * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class _WaitTimingMixin:
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - started)
+
+
+def instrumented_pool_class(pool_class: type[Pool], wait_stats: PoolWaitStats) -> type[Pool]:
+    # Stats live on the class so Pool.recreate() (engine.dispose) keeps them.
+    return type(
+        f"Instrumented{pool_class.__name__}",
+        (_WaitTimingMixin, pool_class),
+        {"wait_stats": wait_stats}
+    )
+
+
+def pool_engine_options(
+    settings: Settings,
+    pool_class: type[Pool],
+    wait_stats: PoolWaitStats
+) -> dict[str, Any]:
+    """Engine kwargs for a sized, pre-pinged, recycled pool.
+
+    SQLite keeps SQLAlchemy's defaults: its pools do not take size options.
+    """
+    if settings.database_url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(pool_class, wait_stats),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def describe_pool(pool: Pool) -> dict[str, Any]:
+    stats: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update(wait_stats.snapshot())
+    return stats
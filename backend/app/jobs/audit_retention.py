@@ -0,0 +1,210 @@
+"""
+Maintain monthly partitions of security_audit_logs and apply retention.
+
+On Postgres (see migration 005) the job creates the partitions for the current
+and upcoming months and drops whole partitions older than the retention window,
+which is instant and leaves no bloat behind. Other databases have no partitions,
+so expired rows are deleted instead.
+
+Run it daily, e.g. `python -m app.jobs.audit_retention --retention-months 12`.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone
+from typing import Optional
+
+from sqlalchemy import delete, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import get_settings
+from app.db import database
+from app.db.models import SecurityAuditLog
+from app.jobs import positive_int
+
+settings = get_settings()
+
+AUDIT_TABLE = SecurityAuditLog.__tablename__
+DEFAULT_PARTITION = f"{AUDIT_TABLE}_default"
+_PARTITION_PATTERN = re.compile(rf"^{AUDIT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+@dataclass
+class RetentionReport:
+    cutoff: date
+    ensured: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    moved_rows: int = 0
+    deleted_rows: int = 0
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{AUDIT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = _PARTITION_PATTERN.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def retention_cutoff(today: date, retention_months: int) -> date:
+    """First day of the oldest month that is kept."""
+    return add_months(today.replace(day=1), -retention_months)
+
+
+def expired_partitions(names: list[str], cutoff: date) -> list[str]:
+    expired = []
+    for name in sorted(names):
+        month = partition_month(name)
+        if month is not None and month < cutoff:
+            expired.append(name)
+    return expired
+
+
+def _list_partitions(conn: Connection) -> list[str]:
+    rows = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": AUDIT_TABLE}
+    )
+    return [row[0] for row in rows]
+
+
+def _default_has_rows(conn: Connection, month: date) -> bool:
+    return bool(conn.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end)"
+        ),
+        {"start": month, "end": add_months(month, 1)}
+    ).scalar())
+
+
+def _maintain_partitions(
+    conn: Connection,
+    report: RetentionReport,
+    today: date,
+    months_ahead: int
+) -> None:
+    """Create upcoming partitions, drop expired ones and trim the default.
+
+    Postgres refuses to create a partition while the default partition holds
+    rows in its range (a missed run, or events written before the job ran).
+    In that case the default is detached, the partitions are created, the rows
+    are moved into them and the default is attached again, all in the job's
+    single transaction.
+    """
+    existing = _list_partitions(conn)
+    current = today.replace(day=1)
+    months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+    missing = [month for month in months if partition_name(month) not in existing]
+    crowded = [
+        month for month in missing
+        if DEFAULT_PARTITION in existing and _default_has_rows(conn, month)
+    ]
+
+    if crowded:
+        conn.execute(text(f"ALTER TABLE {AUDIT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    for month in missing:
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {AUDIT_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        )
+    for month in crowded:
+        result = conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                f"INSERT INTO {partition_name(month)} SELECT * FROM moved"
+            ),
+            {"start": month, "end": add_months(month, 1)}
+        )
+        report.moved_rows += result.rowcount
+    if crowded:
+        conn.execute(
+            text(f"ALTER TABLE {AUDIT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+        )
+    report.ensured.extend(partition_name(month) for month in months)
+
+    for name in expired_partitions(existing, report.cutoff):
+        conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        report.dropped.append(name)
+
+    # Rows only land in the default partition when no monthly partition existed.
+    result = conn.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+        {"cutoff": report.cutoff}
+    )
+    report.deleted_rows = result.rowcount
+
+
+def run_retention(
+    engine: Optional[Engine] = None,
+    *,
+    retention_months: Optional[int] = None,
+    months_ahead: int = 2,
+    today: Optional[date] = None
+) -> RetentionReport:
+    if retention_months is None:
+        retention_months = settings.audit_retention_months
+    # A non-positive retention puts the cutoff at or past the current month
+    # and would drop the partition that is being written to.
+    if retention_months < 1:
+        raise ValueError("retention_months must be >= 1")
+    if months_ahead < 1:
+        raise ValueError("months_ahead must be >= 1")
+    engine = engine or database.engine
+    today = today or date.today()
+    report = RetentionReport(cutoff=retention_cutoff(today, retention_months))
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            _maintain_partitions(conn, report, today, months_ahead)
+            return report
+
+        cutoff_at = datetime.combine(report.cutoff, time.min, tzinfo=timezone.utc)
+        result = conn.execute(
+            delete(SecurityAuditLog).where(SecurityAuditLog.created_at < cutoff_at)
+        )
+        report.deleted_rows = result.rowcount
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply security audit log retention")
+    parser.add_argument(
+        "--retention-months",
+        type=positive_int,
+        default=settings.audit_retention_months
+    )
+    parser.add_argument("--months-ahead", type=positive_int, default=2)
+    args = parser.parse_args(argv)
+
+    report = run_retention(
+        retention_months=args.retention_months,
+        months_ahead=args.months_ahead
+    )
+    print(
+        f"Done: cutoff={report.cutoff.isoformat()} ensured={len(report.ensured)} "
+        f"dropped={report.dropped} moved_rows={report.moved_rows} deleted_rows={report.deleted_rows}"
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
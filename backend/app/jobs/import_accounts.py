@@ -0,0 +1,84 @@
+"""
+Import a spreadsheet of accounts into copy_trade_accounts.
+
+Accepts .csv (header row with AccountCreate field names; empty cells use the
+field default), .json (a list of objects) or .ndjson/.jsonl files:
+
+    python -m app.jobs.import_accounts accounts.csv --created-by admin
+    python -m app.jobs.import_accounts accounts.csv --atomic
+
+Rows that fail validation or already exist are reported and skipped; with
+--atomic nothing is written unless every row is accepted.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config import get_settings
+from app.crud.user import get_user_by_username
+from app.db.database import SessionLocal
+from app.jobs import positive_int
+from app.services.account_import import ImportReport, import_accounts
+
+settings = get_settings()
+
+
+def read_rows(path: Path) -> list[Any]:
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        return json.loads(path.read_text(encoding="utf-8"))
+    if suffix in (".ndjson", ".jsonl"):
+        with path.open(encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        return [
+            {name: value for name, value in row.items() if value not in ("", None)}
+            for row in csv.DictReader(handle)
+        ]
+
+
+def _print_report(report: ImportReport) -> None:
+    for error in report.errors:
+        print(f"row {error.row} ({error.account_number or '-'}): {'; '.join(error.errors)}")
+    print(
+        f"Done: received={report.received} created={report.created} "
+        f"failed={report.failed} chunks={report.chunks} elapsed={report.elapsed_seconds:.1f}s"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import copy trade accounts")
+    parser.add_argument("path", type=Path, help=".csv, .json or .ndjson file")
+    parser.add_argument("--created-by", default=None, help="username recorded as created_by")
+    parser.add_argument("--atomic", action="store_true", help="all rows or nothing, in one transaction")
+    parser.add_argument("--chunk-size", type=positive_int, default=settings.account_import_chunk_size)
+    parser.add_argument("--workers", type=positive_int, default=settings.account_import_workers)
+    args = parser.parse_args(argv)
+
+    rows = read_rows(args.path)
+    with SessionLocal() as db:
+        user_id = None
+        if args.created_by:
+            user = get_user_by_username(db, args.created_by)
+            if user is None:
+                print(f"Unknown user: {args.created_by}")
+                return 2
+            user_id = user.id
+        report = import_accounts(
+            db,
+            rows,
+            user_id=user_id,
+            atomic=args.atomic,
+            chunk_size=args.chunk_size,
+            workers=args.workers
+        )
+    _print_report(report)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+"""
+Change a user's flags or password.
+
+Goes through crud.user so the cached principal is dropped in every worker and
+the change applies to the next request instead of after the cache TTL:
+
+    python -m app.jobs.manage_user alice --deactivate
+    python -m app.jobs.manage_user alice --no-admin
+    python -m app.jobs.manage_user alice --reset-password
+"""
+from __future__ import annotations
+
+import argparse
+import getpass
+from typing import Optional
+
+from app.crud.user import get_user_by_username, update_user_flags, update_user_password
+from app.db.database import SessionLocal
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Change a user's flags or password")
+    parser.add_argument("username")
+    active = parser.add_mutually_exclusive_group()
+    active.add_argument("--activate", dest="is_active", action="store_const", const=True)
+    active.add_argument("--deactivate", dest="is_active", action="store_const", const=False)
+    admin = parser.add_mutually_exclusive_group()
+    admin.add_argument("--admin", dest="is_admin", action="store_const", const=True)
+    admin.add_argument("--no-admin", dest="is_admin", action="store_const", const=False)
+    parser.add_argument("--reset-password", action="store_true", help="prompt for a new password")
+    args = parser.parse_args(argv)
+
+    if args.is_active is None and args.is_admin is None and not args.reset_password:
+        parser.error("nothing to change")
+
+    with SessionLocal() as db:
+        user = get_user_by_username(db, args.username)
+        if user is None:
+            print(f"Unknown user: {args.username}")
+            return 2
+        if args.reset_password:
+            password = getpass.getpass("New password: ")
+            if not password:
+                print("Password must not be empty")
+                return 1
+            update_user_password(db, user, password)
+        if args.is_active is not None or args.is_admin is not None:
+            update_user_flags(db, user, is_active=args.is_active, is_admin=args.is_admin)
+        print(f"Updated {user.username}: active={user.is_active} admin={user.is_admin}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
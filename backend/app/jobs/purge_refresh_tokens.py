@@ -0,0 +1,133 @@
+"""
+Delete dead refresh_tokens rows.
+
+Every refresh inserts a new row and only marks the previous one revoked, so
+the table keeps growing. This job deletes rows that expired or were revoked
+more than REFRESH_TOKEN_PURGE_GRACE_DAYS ago, walking the table by id in small
+batches with one short transaction each, so live sessions are never blocked.
+
+Run it from cron, e.g. `python -m app.jobs.purge_refresh_tokens` hourly.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.db.database import SessionLocal
+from app.db.models import RefreshToken
+from app.jobs import non_negative_int, positive_int
+
+settings = get_settings()
+
+
+@dataclass
+class PurgeReport:
+    cutoff: datetime
+    deleted: int = 0
+    batches: int = 0
+    last_id: int = 0
+    elapsed_seconds: float = 0.0
+
+
+ProgressCallback = Callable[[PurgeReport], None]
+
+
+def purge_cutoff(grace_days: int, now: Optional[datetime] = None) -> datetime:
+    return (now or datetime.now(timezone.utc)) - timedelta(days=grace_days)
+
+
+def purge_refresh_tokens(
+    session_factory: Optional[sessionmaker] = None,
+    *,
+    grace_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    pause_seconds: float = 0.0,
+    now: Optional[datetime] = None,
+    progress: Optional[ProgressCallback] = None
+) -> PurgeReport:
+    session_factory = session_factory or SessionLocal
+    if grace_days is None:
+        grace_days = settings.refresh_token_purge_grace_days
+    if batch_size is None:
+        batch_size = settings.refresh_token_purge_batch_size
+    if grace_days < 0:
+        raise ValueError("grace_days must be >= 0")
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    report = PurgeReport(cutoff=purge_cutoff(grace_days, now))
+    started = time.perf_counter()
+    dead = or_(
+        RefreshToken.expires_at < report.cutoff,
+        RefreshToken.revoked_at < report.cutoff
+    )
+
+    with session_factory() as db:
+        while True:
+            # Ascending ids: dead rows cluster at the old end, and the keyset
+            # skips live rows already passed instead of rescanning them.
+            ids = db.scalars(
+                select(RefreshToken.id)
+                .where(RefreshToken.id > report.last_id, dead)
+                .order_by(RefreshToken.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+
+            db.execute(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+            db.commit()
+
+            report.deleted += len(ids)
+            report.batches += 1
+            report.last_id = ids[-1]
+            report.elapsed_seconds = time.perf_counter() - started
+            if progress is not None:
+                progress(report)
+            if pause_seconds > 0:
+                time.sleep(pause_seconds)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+def _print_progress(report: PurgeReport) -> None:
+    print(f"last_id={report.last_id} deleted={report.deleted} batches={report.batches}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Delete expired and revoked refresh tokens")
+    parser.add_argument(
+        "--grace-days",
+        type=non_negative_int,
+        default=settings.refresh_token_purge_grace_days
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=positive_int,
+        default=settings.refresh_token_purge_batch_size
+    )
+    parser.add_argument("--pause-ms", type=non_negative_int, default=0, help="sleep between batches")
+    args = parser.parse_args(argv)
+
+    report = purge_refresh_tokens(
+        grace_days=args.grace_days,
+        batch_size=args.batch_size,
+        pause_seconds=args.pause_ms / 1000,
+        progress=_print_progress
+    )
+    print(
+        f"Done: cutoff={report.cutoff.isoformat()} deleted={report.deleted} "
+        f"batches={report.batches} elapsed={report.elapsed_seconds:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,247 @@
+"""
+Re-encrypt copy_trade_accounts.account_password under the primary ENCRYPTION_KEY.
+
+Rotation steps:
+1. Move the current key to ENCRYPTION_PREVIOUS_KEYS and set a new ENCRYPTION_KEY.
+2. Deploy; the API keeps decrypting old values through the key ring.
+3. Run `python -m app.jobs.reencrypt_accounts` (safe to rerun; to resume, pass the
+   last printed last_id as --start-id, which holds for any --workers).
+4. Remove the old key from ENCRYPTION_PREVIOUS_KEYS.
+
+Each row is written back only if its ciphertext is still the one that was
+read, so a password changed through the API mid-run is never overwritten;
+such rows are counted as skipped and are already under the primary key.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from cryptography.fernet import InvalidToken
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.security import rotate_encrypted_value
+from app.db.database import SessionLocal
+from app.db.models import CopyTradeAccount
+from app.jobs import positive_int
+
+
+@dataclass
+class RotationReport:
+    scanned: int = 0
+    rotated: int = 0
+    skipped: int = 0
+    last_id: int = 0
+    elapsed_seconds: float = 0.0
+    failed_ids: list[int] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.scanned / self.elapsed_seconds
+
+
+ProgressCallback = Callable[[RotationReport], None]
+
+_accounts = CopyTradeAccount.__table__
+# Compare-and-set: a row whose password changed since the chunk was read is left alone.
+_ROTATE_STATEMENT = (
+    update(_accounts)
+    .where(
+        _accounts.c.id == bindparam("row_id"),
+        _accounts.c.account_password == bindparam("current_password")
+    )
+    .values(account_password=bindparam("rotated_password"))
+)
+
+
+def _id_ranges(
+    db: Session,
+    *,
+    start_id: int,
+    end_id: Optional[int],
+    workers: int
+) -> list[tuple[int, int]]:
+    """Split (start_id, max_id] into contiguous ranges, one per worker."""
+    max_id = db.scalar(select(func.max(CopyTradeAccount.id)))
+    if max_id is None:
+        return []
+    if end_id is not None:
+        max_id = min(max_id, end_id)
+    if max_id <= start_id:
+        return []
+
+    span = math.ceil((max_id - start_id) / workers)
+    return [
+        (lower, min(lower + span, max_id))
+        for lower in range(start_id, max_id, span)
+    ]
+
+
+def reencrypt_range(
+    session_factory: sessionmaker,
+    *,
+    after_id: int,
+    up_to_id: int,
+    batch_size: int = 500,
+    progress: Optional[ProgressCallback] = None
+) -> RotationReport:
+    """Rotate rows with after_id < id <= up_to_id, one short transaction per chunk."""
+    report = RotationReport(last_id=after_id)
+    started = time.perf_counter()
+
+    with session_factory() as db:
+        while True:
+            rows = db.execute(
+                select(CopyTradeAccount.id, CopyTradeAccount.account_password)
+                .where(
+                    CopyTradeAccount.id > report.last_id,
+                    CopyTradeAccount.id <= up_to_id
+                )
+                .order_by(CopyTradeAccount.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                try:
+                    rotated = rotate_encrypted_value(row.account_password)
+                except InvalidToken:
+                    report.failed_ids.append(row.id)
+                    continue
+                if rotated is not None:
+                    updates.append({
+                        "row_id": row.id,
+                        "current_password": row.account_password,
+                        "rotated_password": rotated,
+                    })
+
+            written = db.execute(_ROTATE_STATEMENT, updates).rowcount if updates else 0
+            db.commit()
+
+            report.scanned += len(rows)
+            report.rotated += written
+            report.skipped += len(updates) - written
+            report.last_id = rows[-1].id
+            report.elapsed_seconds = time.perf_counter() - started
+            if progress is not None:
+                progress(report)
+
+    return report
+
+
+def reencrypt_accounts(
+    session_factory: Optional[sessionmaker] = None,
+    *,
+    batch_size: int = 500,
+    start_id: int = 0,
+    end_id: Optional[int] = None,
+    workers: int = 1,
+    progress: Optional[ProgressCallback] = None
+) -> RotationReport:
+    session_factory = session_factory or SessionLocal
+    started = time.perf_counter()
+    with session_factory() as db:
+        ranges = _id_ranges(db, start_id=start_id, end_id=end_id, workers=workers)
+
+    # Progress is reported as one total whose last_id is the global low-water
+    # mark: every id at or below it is done, so it is always a safe --start-id.
+    range_reports = [RotationReport(last_id=lower) for lower, _ in ranges]
+    finished = [False] * len(ranges)
+    progress_lock = threading.Lock()
+
+    def _report_progress(index: int, report: RotationReport, done: bool = False) -> None:
+        with progress_lock:
+            range_reports[index] = report
+            finished[index] = done or finished[index]
+            if progress is None:
+                return
+            total = _combine(range_reports, last_id=_low_water_mark(ranges, range_reports, finished))
+            total.elapsed_seconds = time.perf_counter() - started
+            progress(total)
+
+    def _run(index: int) -> RotationReport:
+        lower, upper = ranges[index]
+        report = reencrypt_range(
+            session_factory,
+            after_id=lower,
+            up_to_id=upper,
+            batch_size=batch_size,
+            progress=lambda partial: _report_progress(index, partial)
+        )
+        _report_progress(index, report, done=True)
+        return report
+
+    with ThreadPoolExecutor(max_workers=max(1, len(ranges))) as pool:
+        reports = list(pool.map(_run, range(len(ranges))))
+
+    total = _combine(reports, last_id=ranges[-1][1] if ranges else start_id)
+    total.elapsed_seconds = time.perf_counter() - started
+    return total
+
+
+def _combine(reports: list[RotationReport], *, last_id: int) -> RotationReport:
+    total = RotationReport(last_id=last_id)
+    for report in reports:
+        total.scanned += report.scanned
+        total.rotated += report.rotated
+        total.skipped += report.skipped
+        total.failed_ids.extend(report.failed_ids)
+    return total
+
+
+def _low_water_mark(
+    ranges: list[tuple[int, int]],
+    reports: list[RotationReport],
+    finished: list[bool]
+) -> int:
+    """Highest id below which every range is done; the first unfinished range bounds it."""
+    for report, done in zip(reports, finished):
+        if not done:
+            return report.last_id
+    return ranges[-1][1]
+
+
+def _print_progress(report: RotationReport) -> None:
+    print(
+        f"last_id={report.last_id} scanned={report.scanned} "
+        f"rotated={report.rotated} skipped={report.skipped} rows/s={report.rows_per_second:.0f}"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-encrypt account passwords with the primary ENCRYPTION_KEY")
+    parser.add_argument("--batch-size", type=positive_int, default=500)
+    parser.add_argument("--start-id", type=int, default=0, help="resume after this id")
+    parser.add_argument("--end-id", type=int, default=None)
+    parser.add_argument("--workers", type=positive_int, default=1)
+    args = parser.parse_args(argv)
+
+    report = reencrypt_accounts(
+        batch_size=args.batch_size,
+        start_id=args.start_id,
+        end_id=args.end_id,
+        workers=args.workers,
+        progress=_print_progress
+    )
+    print(
+        f"Done: scanned={report.scanned} rotated={report.rotated} skipped={report.skipped} "
+        f"failed={len(report.failed_ids)} rows/s={report.rows_per_second:.0f}"
+    )
+    if report.failed_ids:
+        print(f"Undecryptable ids: {report.failed_ids}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
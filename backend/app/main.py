@@ -1,24 +1,23 @@
-from datetime import datetime, timezone
-
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
-from app.api.accounts_v2 import router as accounts_v2_router
+from app.api.accounts_v2 import NEXT_CURSOR_HEADER, router as accounts_v2_router
 from app.config import get_settings
+from app.api.audit_v2 import router as audit_v2_router
 from app.api.auth import router as auth_router
 from app.api.auth_v2 import router as auth_v2_router
+from app.api.metrics_v2 import router as metrics_v2_router
 from app.api.accounts import router as accounts_router
 from app.api.public import router as public_router
-from app.services.security_store import is_redis_available
+from app.core.middleware import ResponseHeadersMiddleware
+from app.db.database import async_engine
+from app.services.audit import start_audit_writer, stop_audit_writer
+from app.services.expiry_sweeper import start_expiry_sweeper, stop_expiry_sweeper
+from app.services.refresh_cache import start_refresh_writer, stop_refresh_writer
+from app.services.revocation_cache import start_revocation_listener, stop_revocation_listener
+from app.services.security_store import close_async_redis_client, is_redis_available
 
 settings = get_settings()
-BASE_SECURITY_HEADERS = {
-    "X-Content-Type-Options": "nosniff",
-    "X-Frame-Options": "DENY",
-    "Referrer-Policy": "no-referrer",
-    "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
-}
 
 app = FastAPI(
     title="Copy Trade Dashboard API",
@@ -36,11 +35,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization", settings.csrf_header_name],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Security headers and v1 deprecation (outermost, so the 410 gets headers too)
+app.add_middleware(ResponseHeadersMiddleware)
+
 # Routers (v2 first, then v1 deprecated)
 app.include_router(auth_v2_router)
 app.include_router(accounts_v2_router)
+app.include_router(audit_v2_router)
+app.include_router(metrics_v2_router)
 app.include_router(auth_router)
 app.include_router(accounts_router)
 app.include_router(public_router)
@@ -52,42 +57,22 @@ async def startup_security_checks() -> None:
         raise RuntimeError("Redis must be reachable in production")
 
 
-@app.middleware("http")
-async def v1_deprecation_middleware(request: Request, call_next):
-    path = request.url.path
-    is_v1_path = path.startswith("/api/auth") or path.startswith("/api/admin")
-    now = datetime.now(timezone.utc)
-
-    if is_v1_path and now >= settings.v1_sunset_at:
-        return JSONResponse(
-            status_code=410,
-            content={"detail": "API v1 descontinuada. Use /api/v2."},
-            headers={
-                "Deprecation": "true",
-                "Sunset": settings.v1_sunset_http
-            }
-        )
-
-    response = await call_next(request)
-    if is_v1_path:
-        response.headers["Deprecation"] = "true"
-        response.headers["Sunset"] = settings.v1_sunset_http
-    return response
-
-
-@app.middleware("http")
-async def security_headers_middleware(request: Request, call_next):
-    response = await call_next(request)
-    for header_name, header_value in BASE_SECURITY_HEADERS.items():
-        response.headers.setdefault(header_name, header_value)
-
-    if settings.cookie_secure:
-        response.headers.setdefault(
-            "Strict-Transport-Security",
-            "max-age=31536000; includeSubDomains"
-        )
-
-    return response
+@app.on_event("startup")
+async def start_background_workers() -> None:
+    start_revocation_listener()
+    start_audit_writer()
+    start_refresh_writer()
+    start_expiry_sweeper()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    await stop_revocation_listener()
+    await stop_expiry_sweeper()
+    await stop_audit_writer()
+    await stop_refresh_writer()
+    await async_engine.dispose()
+    await close_async_redis_client()
 
 
 @app.get("/api/health")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Optional
 from decimal import Decimal
 
 
@@ -72,6 +72,20 @@ class StatusUpdate(BaseModel):
     status: str
 
 
+class BulkStatusUpdate(BaseModel):
+    status: str
+    ids: Optional[list[int]] = Field(default=None, min_length=1, max_length=10000)
+    # Filters, same meaning as in GET /accounts
+    current_status: Optional[str] = None
+    search: Optional[str] = None
+
+
+class BulkStatusUpdateResponse(BaseModel):
+    status: str
+    updated: int
+    ids: list[int]
+
+
 # Response for admin (all data)
 class AccountAdminResponse(AccountBase):
     id: int
@@ -133,3 +147,27 @@ class PasswordRevealResponse(BaseModel):
 
 class PasswordRotateRequest(BaseModel):
     new_password: str = Field(min_length=8)
+
+
+class AccountImportRequest(BaseModel):
+    # Raw rows, validated one by one so a bad row is reported instead of
+    # rejecting the whole request.
+    accounts: list[dict[str, Any]] = Field(min_length=1)
+    atomic: bool = False
+
+
+class AccountImportRowError(BaseModel):
+    row: int
+    account_number: Optional[str] = None
+    errors: list[str]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AccountImportResponse(BaseModel):
+    received: int
+    created: int
+    failed: int
+    errors: list[AccountImportRowError]
+
+    model_config = ConfigDict(from_attributes=True)
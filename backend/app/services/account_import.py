@@ -0,0 +1,224 @@
+"""Bulk account import shared by the admin API and app.jobs.import_accounts.
+
+`prepare_import` is pure CPU (validation and Fernet encryption in a thread
+pool) and touches no database; `write_import` checks duplicates with one
+`account_number IN (...)` query per chunk and inserts each chunk as a single
+executemany.
+"""
+from __future__ import annotations
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.security import encrypt_many
+from app.crud.account import ACCOUNT_STATUSES, PHASE_STATUSES
+from app.db.database import dialect_insert
+from app.db.models import CopyTradeAccount
+from app.schemas.account import AccountCreate
+from app.services.stats_cache import invalidate_public_stats
+
+settings = get_settings()
+
+DUPLICATE_IN_DATABASE = "account_number: Numero da conta ja existe"
+DUPLICATE_IN_IMPORT = "account_number: Numero da conta repetido na importacao"
+INVALID_STATUS = f"status: Status invalido. Valores validos: {list(ACCOUNT_STATUSES)}"
+INVALID_PHASE_STATUS = "{field}: Status de fase invalido. Valores validos: " + str(list(PHASE_STATUSES))
+
+
+@dataclass
+class ImportRowError:
+    row: int
+    account_number: Optional[str]
+    errors: list[str]
+
+
+@dataclass
+class PreparedImport:
+    received: int
+    # (1-based input row, insert values with the password already encrypted)
+    rows: list[tuple[int, dict[str, Any]]] = field(default_factory=list)
+    errors: list[ImportRowError] = field(default_factory=list)
+
+
+@dataclass
+class ImportReport:
+    received: int = 0
+    created: int = 0
+    chunks: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+
+def _format_errors(exc: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+def _encrypt_passwords(passwords: list[str], workers: int) -> list[str]:
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    if not passwords:
+        return []
+    size = math.ceil(len(passwords) / workers)
+    parts = [passwords[start:start + size] for start in range(0, len(passwords), size)]
+    with ThreadPoolExecutor(max_workers=len(parts), thread_name_prefix="account-import") as pool:
+        return [value for part in pool.map(encrypt_many, parts) for value in part]
+
+
+def _invalid_statuses(account: AccountCreate) -> list[str]:
+    errors = []
+    if account.status not in ACCOUNT_STATUSES:
+        errors.append(INVALID_STATUS)
+    for field_name in ("phase1_status", "phase2_status"):
+        value = getattr(account, field_name)
+        if value is not None and value not in PHASE_STATUSES:
+            errors.append(INVALID_PHASE_STATUS.format(field=field_name))
+    return errors
+
+
+def prepare_import(
+    rows: list[Any],
+    *,
+    user_id: Optional[int] = None,
+    workers: Optional[int] = None
+) -> PreparedImport:
+    """Validate every row and encrypt the passwords of the valid ones."""
+    workers = settings.account_import_workers if workers is None else workers
+    prepared = PreparedImport(received=len(rows))
+    accounts: list[tuple[int, AccountCreate]] = []
+    seen: set[str] = set()
+    for index, raw in enumerate(rows, start=1):
+        account_number = raw.get("account_number") if isinstance(raw, dict) else None
+        try:
+            account = AccountCreate.model_validate(raw)
+        except ValidationError as exc:
+            prepared.errors.append(ImportRowError(
+                index,
+                account_number if isinstance(account_number, str) else None,
+                _format_errors(exc)
+            ))
+            continue
+        # Mirror the table's CHECK constraints so a bad value is a row error
+        # instead of an IntegrityError that aborts the whole chunk.
+        invalid = _invalid_statuses(account)
+        if invalid:
+            prepared.errors.append(ImportRowError(index, account.account_number, invalid))
+        elif account.account_number in seen:
+            prepared.errors.append(ImportRowError(index, account.account_number, [DUPLICATE_IN_IMPORT]))
+        else:
+            seen.add(account.account_number)
+            accounts.append((index, account))
+
+    encrypted = _encrypt_passwords(
+        [account.account_password for _, account in accounts],
+        workers
+    )
+    for (index, account), password in zip(accounts, encrypted):
+        values = account.model_dump(exclude={"account_password"})
+        values.update(account_password=password, created_by=user_id)
+        prepared.rows.append((index, values))
+    return prepared
+
+
+def _existing_account_numbers(db: Session, account_numbers: list[str]) -> set[str]:
+    return set(db.scalars(
+        select(CopyTradeAccount.account_number)
+        .where(CopyTradeAccount.account_number.in_(account_numbers))
+    ))
+
+
+def write_import(
+    db: Session,
+    prepared: PreparedImport,
+    *,
+    atomic: bool = False,
+    chunk_size: Optional[int] = None
+) -> ImportReport:
+    """Insert prepared rows in chunks.
+
+    Chunked mode commits each chunk and keeps going past rejected rows.
+    Atomic mode runs in one transaction and inserts nothing unless every row
+    is accepted; it still checks every chunk so the report lists all errors.
+    """
+    chunk_size = settings.account_import_chunk_size if chunk_size is None else chunk_size
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    report = ImportReport(received=prepared.received, errors=list(prepared.errors))
+    started = time.perf_counter()
+    # Conflicts from a concurrent import are skipped here and reported like
+    # any other duplicate.
+    stmt = (
+        dialect_insert(db, CopyTradeAccount)
+        .on_conflict_do_nothing(index_elements=["account_number"])
+        .returning(CopyTradeAccount.account_number)
+    )
+
+    for start in range(0, len(prepared.rows), chunk_size):
+        chunk = prepared.rows[start:start + chunk_size]
+        existing = _existing_account_numbers(db, [values["account_number"] for _, values in chunk])
+        accepted = []
+        for index, values in chunk:
+            if values["account_number"] in existing:
+                report.errors.append(ImportRowError(index, values["account_number"], [DUPLICATE_IN_DATABASE]))
+            else:
+                accepted.append((index, values))
+        if atomic and report.errors:
+            continue
+        if accepted:
+            inserted = set(db.scalars(stmt, [values for _, values in accepted]))
+            report.errors.extend(
+                ImportRowError(index, values["account_number"], [DUPLICATE_IN_DATABASE])
+                for index, values in accepted
+                if values["account_number"] not in inserted
+            )
+            report.created += len(inserted)
+        if not atomic:
+            db.commit()
+            report.chunks += 1
+
+    if atomic:
+        if report.errors:
+            db.rollback()
+            report.created = 0
+        else:
+            db.commit()
+            report.chunks = 1
+    report.errors.sort(key=lambda error: error.row)
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+def import_accounts(
+    db: Session,
+    rows: list[Any],
+    *,
+    user_id: Optional[int] = None,
+    atomic: bool = False,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None
+) -> ImportReport:
+    started = time.perf_counter()
+    report = write_import(
+        db,
+        prepare_import(rows, user_id=user_id, workers=workers),
+        atomic=atomic,
+        chunk_size=chunk_size
+    )
+    if report.created:
+        invalidate_public_stats()
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Optional
 
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
+from app.db.database import AsyncSessionLocal
 from app.db.models import SecurityAuditLog
+from app.services.batch_writer import BatchWriter
+
+settings = get_settings()
 
 
 def log_security_event(
@@ -27,10 +35,69 @@ def log_security_event(
         success=success,
         reason=reason,
         ip=ip,
-        user_agent=user_agent
+        user_agent=user_agent,
+        # Same clock as the batched writer, so keyset cursors compare like
+        # with like (SQLite stores CURRENT_TIMESTAMP in a different format).
+        created_at=datetime.now(timezone.utc)
     )
     try:
         db.add(event)
         db.commit()
     except Exception:
         db.rollback()
+
+
+class AuditLogWriter(BatchWriter):
+    """Writes queued audit events in multi-row INSERTs."""
+
+    label = "audit events"
+
+    async def write_batch(self, db: AsyncSession, batch: list[dict[str, Any]]) -> None:
+        await db.execute(insert(SecurityAuditLog), batch)
+
+
+_writer: Optional[AuditLogWriter] = None
+
+
+def get_audit_writer() -> Optional[AuditLogWriter]:
+    return _writer
+
+
+def start_audit_writer(
+    session_factory: Optional[async_sessionmaker] = None
+) -> Optional[AuditLogWriter]:
+    global _writer
+
+    if not settings.audit_writer_enabled or _writer is not None:
+        return _writer
+
+    _writer = AuditLogWriter(
+        session_factory or AsyncSessionLocal,
+        max_queue=settings.audit_queue_max_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval_seconds=settings.audit_flush_interval_ms / 1000
+    )
+    _writer.start()
+    return _writer
+
+
+async def stop_audit_writer() -> None:
+    global _writer
+
+    if _writer is None:
+        return
+    await _writer.stop()
+    _writer = None
+
+
+async def record_security_event(db: AsyncSession, **fields: Any) -> None:
+    """Queue an audit event (same keywords as log_security_event).
+
+    Falls back to a direct write through `db` when the writer is not running.
+    """
+    writer = _writer
+    if writer is None:
+        await db.run_sync(log_security_event, **fields)
+        return
+    # Stamp the event time now; the row is inserted later.
+    await writer.submit({**fields, "created_at": datetime.now(timezone.utc)})
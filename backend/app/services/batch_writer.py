@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import logging
+from typing import Any, Optional
+
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+# Lost connections, an unreachable server or an exhausted pool: the batch is
+# fine and will go through once the database is back.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError, OSError)
+
+
+class BatchWriter(abc.ABC):
+    """Buffers rows and writes them in batches off the request path.
+
+    The queue is bounded: when the database falls behind, `submit` waits up
+    to `submit_timeout_seconds` for room and then drops the item, so request
+    handlers never hang on an outage. A batch is written once it reaches
+    `batch_size` or `flush_interval_seconds` after its first item; `stop`
+    drains whatever is queued. Subclasses implement `write_batch`.
+
+    A failed batch is retried with backoff. Connection-level errors are
+    retried for up to `max_retry_seconds`; other errors, and any error while
+    stopping, give up after `max_attempts`. Dropped items and abandoned
+    batches are counted in `stats()`.
+    """
+
+    label = "rows"
+    max_retry_delay_seconds = 5.0
+    max_retry_seconds = 30.0
+    submit_timeout_seconds = 1.0
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        *,
+        max_queue: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+        max_attempts: int = 5,
+        retry_delay_seconds: float = 0.1
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.batches = 0
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, values: Any) -> None:
+        try:
+            await asyncio.wait_for(self._queue.put(values), self.submit_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logger.warning("Write queue for %s is full, dropping one item", self.label)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._stopping = False
+
+    async def _next_batch(self) -> tuple[list[Any], bool]:
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval_seconds
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._write(batch)
+
+    @abc.abstractmethod
+    async def write_batch(self, db: AsyncSession, batch: list[Any]) -> None:
+        """Write one batch through `db`; the caller commits."""
+
+    async def _write(self, batch: list[Any]) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_retry_seconds
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self.session_factory() as db:
+                    await self.write_batch(db, batch)
+                    await db.commit()
+                break
+            except Exception as exc:
+                transient = (
+                    isinstance(exc, TRANSIENT_ERRORS)
+                    and not self._stopping
+                    and loop.time() < deadline
+                )
+                if attempt >= self.max_attempts and not transient:
+                    self.failed += len(batch)
+                    logger.exception(
+                        "Giving up on %d %s after %d attempts", len(batch), self.label, attempt
+                    )
+                    return
+                self.retries += 1
+                logger.warning(
+                    "Failed to write %d %s (attempt %d), retrying",
+                    len(batch),
+                    self.label,
+                    attempt,
+                    exc_info=True
+                )
+            await asyncio.sleep(
+                min(self.retry_delay_seconds * 2 ** (attempt - 1), self.max_retry_delay_seconds)
+            )
+        self.written += len(batch)
+        self.batches += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": True,
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "batches": self.batches,
+        }
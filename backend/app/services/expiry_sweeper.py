@@ -0,0 +1,207 @@
+"""Moves accounts whose expiry_date has passed to "expired".
+
+Each batch is one set-based UPDATE bounded by a LIMIT subquery and committed
+on its own, served by the (expiry_date, status) index from migration 008.
+Every worker runs the loop, but only the holder of a lease in the security
+store sweeps; the others skip the run. The UPDATE is idempotent, so a lease
+lost mid-run at worst lets two workers sweep the same rows once.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+from app.db.database import SessionLocal
+from app.db.models import CopyTradeAccount
+from app.services.security_store import get_async_security_store
+from app.services.stats_cache import invalidate_public_stats_async
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+EXPIRY_SWEEPER_LEASE_KEY = "lease:expiry_sweeper"
+# Suspended accounts keep their status; expired ones are already done.
+FINAL_STATUSES = ("expired", "suspended")
+RECENT_RUNS = 20
+
+
+@dataclass
+class SweepReport:
+    today: date
+    transitioned: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def _due_filter(today: date) -> list:
+    return [
+        CopyTradeAccount.expiry_date < today,
+        CopyTradeAccount.status.not_in(FINAL_STATUSES),
+    ]
+
+
+def expire_accounts_batch(db: Session, *, today: date, batch_size: int) -> int:
+    due_ids = select(CopyTradeAccount.id).where(*_due_filter(today)).limit(batch_size)
+    # The predicate is repeated on the UPDATE so a row whose status changed
+    # after the subquery picked it is left alone.
+    expired = db.scalars(
+        update(CopyTradeAccount)
+        .where(CopyTradeAccount.id.in_(due_ids.scalar_subquery()), *_due_filter(today))
+        .values(status="expired")
+        .returning(CopyTradeAccount.id)
+    ).all()
+    db.commit()
+    return len(expired)
+
+
+def sweep_expired_accounts(
+    session_factory: Optional[sessionmaker] = None,
+    *,
+    today: Optional[date] = None,
+    batch_size: Optional[int] = None
+) -> SweepReport:
+    session_factory = session_factory or SessionLocal
+    batch_size = batch_size or settings.expiry_sweep_batch_size
+    report = SweepReport(today=today or date.today())
+    started = time.perf_counter()
+    with session_factory() as db:
+        while True:
+            count = expire_accounts_batch(db, today=report.today, batch_size=batch_size)
+            if count:
+                report.batches += 1
+                report.transitioned += count
+            if count < batch_size:
+                break
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+class ExpirySweeper:
+    def __init__(
+        self,
+        session_factory: Optional[sessionmaker] = None,
+        *,
+        interval_seconds: int,
+        batch_size: int,
+        owner: Optional[str] = None
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        # The leader renews the lease every run; if it dies, another worker
+        # takes over within two intervals.
+        self.lease_seconds = interval_seconds * 2
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+        self.is_leader = False
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.transitioned_total = 0
+        self.recent_runs: deque[dict[str, Any]] = deque(maxlen=RECENT_RUNS)
+
+    async def run_once(self) -> Optional[SweepReport]:
+        store = get_async_security_store()
+        self.is_leader = await store.acquire_lease(
+            EXPIRY_SWEEPER_LEASE_KEY,
+            self.owner,
+            self.lease_seconds
+        )
+        if not self.is_leader:
+            self.skipped += 1
+            return None
+
+        report = await asyncio.to_thread(
+            sweep_expired_accounts,
+            self.session_factory,
+            batch_size=self.batch_size
+        )
+        self.runs += 1
+        self.transitioned_total += report.transitioned
+        self.recent_runs.append({
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "transitioned": report.transitioned,
+            "batches": report.batches,
+            "elapsed_seconds": round(report.elapsed_seconds, 3),
+        })
+        if report.transitioned:
+            await invalidate_public_stats_async()
+        return report
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.failures += 1
+                logger.exception("Expiry sweep failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self.is_leader:
+            await get_async_security_store().release_lease(EXPIRY_SWEEPER_LEASE_KEY, self.owner)
+            self.is_leader = False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": True,
+            "owner": self.owner,
+            "is_leader": self.is_leader,
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "skipped_not_leader": self.skipped,
+            "failures": self.failures,
+            "transitioned_total": self.transitioned_total,
+            "recent_runs": list(self.recent_runs),
+        }
+
+
+_sweeper: Optional[ExpirySweeper] = None
+
+
+def get_expiry_sweeper() -> Optional[ExpirySweeper]:
+    return _sweeper
+
+
+def start_expiry_sweeper(session_factory: Optional[sessionmaker] = None) -> Optional[ExpirySweeper]:
+    global _sweeper
+
+    if not settings.expiry_sweeper_enabled or _sweeper is not None:
+        return _sweeper
+
+    _sweeper = ExpirySweeper(
+        session_factory,
+        interval_seconds=settings.expiry_sweep_interval_seconds,
+        batch_size=settings.expiry_sweep_batch_size
+    )
+    _sweeper.start()
+    return _sweeper
+
+
+async def stop_expiry_sweeper() -> None:
+    global _sweeper
+
+    sweeper, _sweeper = _sweeper, None
+    if sweeper is not None:
+        await sweeper.stop()
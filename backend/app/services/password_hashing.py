@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.core.security import verify_password
+
+settings = get_settings()
+T = TypeVar("T")
+
+
+class PasswordHashPool:
+    """Bounded thread pool for bcrypt so hashing never runs on the event loop.
+
+    Work beyond ``max_workers + max_queue`` pending jobs is rejected with a
+    503 instead of piling up behind a login burst.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="password-hash"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor ocupado, tente novamente",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            pending = self._pending
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(pending, self.max_workers),
+                "queued": max(0, pending - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+_pool_cache: Optional[PasswordHashPool] = None
+
+
+def get_password_pool() -> PasswordHashPool:
+    global _pool_cache
+
+    if _pool_cache is None:
+        _pool_cache = PasswordHashPool(
+            max_workers=settings.password_hash_workers,
+            max_queue=settings.password_hash_max_queue
+        )
+    return _pool_cache
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await get_password_pool().run(verify_password, plain_password, hashed_password)
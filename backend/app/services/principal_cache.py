@@ -0,0 +1,108 @@
+"""Short-lived cache of authenticated users for the v2 cookie auth path.
+
+Entries only hold the columns auth and `/me` need; the password hash is never
+cached. Only active users are cached, so flag and password changes must go
+through `crud.user`, which calls `revocation_cache.publish_principal_invalidation`
+to drop the shared entry and every worker's local copy.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+from app.config import get_settings
+from app.db.models import User
+from app.services.security_store import get_async_security_store, get_security_store
+
+settings = get_settings()
+
+PRINCIPAL_CACHE_PREFIX = "principal:"
+LOCAL_CACHE_MAX_ENTRIES = 10000
+
+_local_lock = threading.Lock()
+_local_cache: dict[str, tuple[dict[str, Any], float]] = {}
+
+
+def _store_key(username: str) -> str:
+    return f"{PRINCIPAL_CACHE_PREFIX}{username}"
+
+
+def _to_payload(user: User) -> dict[str, Any]:
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "is_active": user.is_active,
+        "is_admin": user.is_admin,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
+
+
+def _from_payload(payload: dict[str, Any]) -> User:
+    created_at = payload["created_at"]
+    # Transient instance: never attached to a session, so it can be shared safely.
+    return User(
+        id=payload["id"],
+        username=payload["username"],
+        email=payload["email"],
+        is_active=payload["is_active"],
+        is_admin=payload["is_admin"],
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+    )
+
+
+def _remember_locally(username: str, payload: dict[str, Any]) -> None:
+    with _local_lock:
+        if len(_local_cache) >= LOCAL_CACHE_MAX_ENTRIES:
+            _local_cache.pop(next(iter(_local_cache)))
+        _local_cache[username] = (
+            payload,
+            time.monotonic() + settings.principal_cache_local_ttl_seconds
+        )
+
+
+async def get_cached_principal(username: str) -> Optional[User]:
+    with _local_lock:
+        entry = _local_cache.get(username)
+        if entry is not None and entry[1] <= time.monotonic():
+            del _local_cache[username]
+            entry = None
+    if entry is not None:
+        return _from_payload(entry[0])
+
+    raw = await get_async_security_store().get_value(_store_key(username))
+    if raw is None:
+        return None
+    payload = json.loads(raw)
+    _remember_locally(username, payload)
+    return _from_payload(payload)
+
+
+async def cache_principal(user: User) -> None:
+    if not user.is_active:
+        return
+    payload = _to_payload(user)
+    await get_async_security_store().set_with_ttl(
+        _store_key(user.username),
+        json.dumps(payload),
+        settings.principal_cache_ttl_seconds
+    )
+    _remember_locally(user.username, payload)
+
+
+def forget_local_principal(username: str) -> None:
+    with _local_lock:
+        _local_cache.pop(username, None)
+
+
+def invalidate_principal(username: str) -> None:
+    forget_local_principal(username)
+    get_security_store().delete(_store_key(username))
+
+
+def clear_local_principals() -> None:
+    with _local_lock:
+        _local_cache.clear()
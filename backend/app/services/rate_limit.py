@@ -1,32 +1,59 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from fastapi import HTTPException, status
 
-from app.services.security_store import get_security_store
+from app.config import get_settings
+from app.services.security_store import get_async_security_store
+
+settings = get_settings()
+
+FIXED_WINDOW = "fixed_window"
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
 
 
-def check_rate_limit(
+def resolve_algorithm(namespace: str, algorithm: Optional[str] = None) -> str:
+    """Explicit argument, then the RATE_LIMIT_ALGORITHMS override, then fixed window."""
+    if algorithm:
+        return algorithm
+    return settings.rate_limit_algorithm_overrides.get(namespace, FIXED_WINDOW)
+
+
+async def check_rate_limit(
     namespace: str,
     identifier: str,
     limit: int,
-    window_seconds: int
+    window_seconds: int,
+    algorithm: Optional[str] = None
 ) -> tuple[bool, int, int]:
+    store = get_async_security_store()
+    algorithm = resolve_algorithm(namespace, algorithm)
+    if algorithm == SLIDING_WINDOW:
+        return await store.sliding_window_hit(f"rl:sw:{namespace}:{identifier}", limit, window_seconds)
+    if algorithm == TOKEN_BUCKET:
+        return await store.token_bucket_hit(f"rl:tb:{namespace}:{identifier}", limit, window_seconds)
+
     key = f"rl:{namespace}:{identifier}"
-    count, retry_after = get_security_store().incr_with_window(key, window_seconds)
+    count, retry_after = await store.incr_with_window(key, window_seconds)
     return count <= limit, retry_after, count
 
 
-def enforce_rate_limit(
+async def enforce_rate_limit(
     namespace: str,
     identifier: str,
     limit: int,
-    window_seconds: int
+    window_seconds: int,
+    algorithm: Optional[str] = None
 ) -> None:
-    allowed, retry_after, current_count = check_rate_limit(
+    algorithm = resolve_algorithm(namespace, algorithm)
+    allowed, retry_after, current_count = await check_rate_limit(
         namespace=namespace,
         identifier=identifier,
         limit=limit,
-        window_seconds=window_seconds
+        window_seconds=window_seconds,
+        algorithm=algorithm
     )
     if allowed:
         return
@@ -36,6 +63,7 @@ def enforce_rate_limit(
         detail={
             "code": "rate_limit_exceeded",
             "namespace": namespace,
+            "algorithm": algorithm,
             "limit": limit,
             "window_seconds": window_seconds,
             "current_count": current_count,
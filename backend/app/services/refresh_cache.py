@@ -0,0 +1,231 @@
+"""Hot refresh-session state in the security store, keyed by token hash.
+
+A refresh claims the presented token by atomically swapping its entry for a
+marker, so each token is honoured once even when several tabs or workers race,
+and the rotation is validated without reading refresh_tokens. The rows are then
+written behind by `RefreshTokenWriter`. Tokens with no entry (Redis restart,
+issued before the cache existed) fall back to the database. The marker lives
+until the claimed token would have expired, so a claimed token never takes
+that path even if its revocation row was lost to a failed batch or a crashed
+worker. When the store cannot be reached the refresh is rejected rather than
+sent to the database, where queued revocations may not have landed yet.
+
+Row writes are upserts where revocation always wins: a rotated token's row may
+reach the database before or after the row that issued it, from any worker,
+and still ends up revoked.
+"""
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db.database import AsyncSessionLocal, dialect_insert
+from app.db.models import RefreshToken
+from app.services.batch_writer import BatchWriter
+from app.services.security_store import RedisError, get_async_security_store
+
+settings = get_settings()
+
+REFRESH_SESSION_PREFIX = "refresh_session:"
+CLAIMED_MARKER = "claimed"
+
+
+class RefreshSessionClaimed(Exception):
+    """Another request already rotated or revoked this token."""
+
+
+class RefreshSessionUnavailable(Exception):
+    """The security store could not be reached to claim the token."""
+
+
+@dataclass
+class RefreshSessionState:
+    user_id: int
+    username: str
+    session_id: str
+    csrf_token: str
+    expires_at: datetime
+
+    def row_values(self, token_hash: str, **extra: Any) -> dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+            "token_hash": token_hash,
+            "csrf_token": self.csrf_token,
+            "expires_at": self.expires_at,
+            **extra,
+        }
+
+
+def _store_key(token_hash: str) -> str:
+    return f"{REFRESH_SESSION_PREFIX}{token_hash}"
+
+
+def _encode(state: RefreshSessionState) -> str:
+    return json.dumps({
+        "user_id": state.user_id,
+        "username": state.username,
+        "session_id": state.session_id,
+        "csrf_token": state.csrf_token,
+        "expires_at": state.expires_at.isoformat(),
+    })
+
+
+def _decode(raw: str) -> RefreshSessionState:
+    payload = json.loads(raw)
+    return RefreshSessionState(
+        user_id=payload["user_id"],
+        username=payload["username"],
+        session_id=payload["session_id"],
+        csrf_token=payload["csrf_token"],
+        expires_at=datetime.fromisoformat(payload["expires_at"]),
+    )
+
+
+def _seconds_left(expires_at: datetime) -> int:
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return math.ceil((expires_at - datetime.now(timezone.utc)).total_seconds())
+
+
+async def remember_refresh_session(token_hash: str, state: RefreshSessionState) -> None:
+    if not settings.refresh_session_cache_enabled:
+        return
+    ttl_seconds = _seconds_left(state.expires_at)
+    if ttl_seconds <= 0:
+        return
+    await get_async_security_store().set_with_ttl(_store_key(token_hash), _encode(state), ttl_seconds)
+
+
+async def claim_refresh_session(token_hash: str) -> Optional[RefreshSessionState]:
+    """Take the cached state for this token; None when nothing is cached.
+
+    Raises RefreshSessionClaimed when another caller claimed it first and
+    RefreshSessionUnavailable when the store is down.
+    """
+    if not settings.refresh_session_cache_enabled:
+        return None
+    try:
+        # The token's expiry is only known after the swap, so the marker starts
+        # with the longest lifetime a token can have and is shortened below.
+        raw = await get_async_security_store().swap_value(
+            _store_key(token_hash),
+            CLAIMED_MARKER,
+            settings.refresh_token_expire_days * 86400
+        )
+    except RedisError as exc:
+        raise RefreshSessionUnavailable(token_hash) from exc
+    if raw is None:
+        return None
+    if raw == CLAIMED_MARKER:
+        raise RefreshSessionClaimed(token_hash)
+    state = _decode(raw)
+    await settle_refresh_claim(token_hash, state.expires_at)
+    return state
+
+
+async def settle_refresh_claim(token_hash: str, expires_at: datetime) -> None:
+    """Keep the claim marker only until the claimed token would have expired."""
+    if not settings.refresh_session_cache_enabled:
+        return
+    store = get_async_security_store()
+    ttl_seconds = _seconds_left(expires_at)
+    if ttl_seconds <= 0:
+        await store.delete(_store_key(token_hash))
+        return
+    await store.set_with_ttl(_store_key(token_hash), CLAIMED_MARKER, ttl_seconds)
+
+
+async def release_refresh_claim(token_hash: str) -> None:
+    """Drop a claim whose database fallback found nothing to rotate."""
+    if not settings.refresh_session_cache_enabled:
+        return
+    await get_async_security_store().delete(_store_key(token_hash))
+
+
+def write_refresh_rows(db: Session, changes: list[dict[str, Any]]) -> None:
+    """Apply queued changes; each may carry an "issued" and a "revoked" row."""
+    issued = [change["issued"] for change in changes if change.get("issued")]
+    revoked = [change["revoked"] for change in changes if change.get("revoked")]
+    if issued:
+        db.execute(
+            dialect_insert(db, RefreshToken).on_conflict_do_nothing(index_elements=["token_hash"]),
+            issued
+        )
+    if revoked:
+        stmt = dialect_insert(db, RefreshToken)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["token_hash"],
+                set_={
+                    "revoked_at": func.coalesce(RefreshToken.revoked_at, stmt.excluded.revoked_at),
+                    "last_used_at": stmt.excluded.last_used_at,
+                }
+            ),
+            revoked
+        )
+
+
+def apply_refresh_rows(db: Session, changes: list[dict[str, Any]]) -> None:
+    write_refresh_rows(db, changes)
+    db.commit()
+
+
+class RefreshTokenWriter(BatchWriter):
+    """Writes rotated refresh tokens behind the request."""
+
+    label = "refresh token changes"
+
+    async def write_batch(self, db: AsyncSession, batch: list[dict[str, Any]]) -> None:
+        await db.run_sync(write_refresh_rows, batch)
+
+
+_writer: Optional[RefreshTokenWriter] = None
+
+
+def get_refresh_writer() -> Optional[RefreshTokenWriter]:
+    return _writer
+
+
+def start_refresh_writer(
+    session_factory: Optional[async_sessionmaker] = None
+) -> Optional[RefreshTokenWriter]:
+    global _writer
+
+    if not settings.refresh_writer_enabled or _writer is not None:
+        return _writer
+
+    _writer = RefreshTokenWriter(
+        session_factory or AsyncSessionLocal,
+        max_queue=settings.refresh_writer_queue_max_size,
+        batch_size=settings.refresh_writer_batch_size,
+        flush_interval_seconds=settings.refresh_writer_flush_interval_ms / 1000
+    )
+    _writer.start()
+    return _writer
+
+
+async def stop_refresh_writer() -> None:
+    global _writer
+
+    if _writer is None:
+        return
+    await _writer.stop()
+    _writer = None
+
+
+async def record_refresh_rows(db: AsyncSession, change: dict[str, Any]) -> None:
+    """Queue a change for the writer, or apply it through `db` when it is off."""
+    writer = _writer
+    if writer is None:
+        await db.run_sync(apply_refresh_rows, [change])
+        return
+    await writer.submit(change)
@@ -0,0 +1,160 @@
+"""Per-worker near-cache of revoked access sessions.
+
+Revocations are rare, so every worker mirrors the revoked session ids in memory
+and learns about new ones over Redis pub/sub. The common "not revoked" answer
+then needs no network round trip. Until the subscription is established and a
+snapshot of the revoked keys is loaded (startup, reconnects, no Redis), the
+cache reports itself as not ready and callers fall back to the store lookup.
+A periodic resync bounds the damage of a lost publish.
+
+The same channel carries "principal:<username>" messages, which drop that
+user from every worker's local principal cache after a flag or password change.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Any, Optional
+
+from app.config import get_settings
+from app.services.principal_cache import (
+    PRINCIPAL_CACHE_PREFIX,
+    forget_local_principal,
+    invalidate_principal,
+)
+from app.services.security_store import (
+    AsyncRedisSecurityStore,
+    RedisError,
+    get_async_security_store,
+    get_security_store,
+)
+
+settings = get_settings()
+
+REVOKED_SESSION_PREFIX = "revoked_session:"
+REVOCATION_CHANNEL = "revoked_sessions"
+
+
+class RevokedSessionCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._revoked: dict[str, float] = {}
+        self.ready = False
+
+    def add_many(self, ttls: dict[str, float]) -> None:
+        now = time.time()
+        with self._lock:
+            # Revocations are rare; dropping expired ids on write keeps reads O(1).
+            self._revoked = {sid: expiry for sid, expiry in self._revoked.items() if expiry > now}
+            for session_id, ttl_seconds in ttls.items():
+                expiry = now + ttl_seconds
+                self._revoked[session_id] = max(expiry, self._revoked.get(session_id, 0.0))
+
+    def add(self, session_id: str, ttl_seconds: float) -> None:
+        self.add_many({session_id: ttl_seconds})
+
+    def contains(self, session_id: str) -> bool:
+        with self._lock:
+            expiry = self._revoked.get(session_id)
+        return expiry is not None and expiry > time.time()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"ready": self.ready, "entries": len(self._revoked)}
+
+
+revoked_sessions = RevokedSessionCache()
+_listener_task: Optional[asyncio.Task] = None
+
+
+def encode_revocation(session_id: str, ttl_seconds: int) -> str:
+    return f"{ttl_seconds}:{session_id}"
+
+
+def publish_principal_invalidation(username: str) -> None:
+    """Drop a cached principal here and in the local tier of every other worker."""
+    invalidate_principal(username)
+    get_security_store().publish(REVOCATION_CHANNEL, f"{PRINCIPAL_CACHE_PREFIX}{username}")
+
+
+def _apply_message(cache: RevokedSessionCache, data: str) -> None:
+    if data.startswith(PRINCIPAL_CACHE_PREFIX):
+        forget_local_principal(data[len(PRINCIPAL_CACHE_PREFIX):])
+        return
+    ttl, _, session_id = data.partition(":")
+    if session_id and ttl.isdigit():
+        cache.add(session_id, int(ttl))
+
+
+async def _load_snapshot(client, cache: RevokedSessionCache) -> None:
+    ttls: dict[str, float] = {}
+    async for key in client.scan_iter(match=f"{REVOKED_SESSION_PREFIX}*", count=500):
+        ttl_ms = await client.pttl(key)
+        if ttl_ms > 0:
+            ttls[key[len(REVOKED_SESSION_PREFIX):]] = ttl_ms / 1000
+    cache.add_many(ttls)
+    cache.ready = True
+
+
+async def run_revocation_listener(
+    client,
+    cache: RevokedSessionCache = revoked_sessions,
+    *,
+    resync_seconds: Optional[int] = None,
+    poll_seconds: float = 1.0,
+    retry_seconds: float = 1.0
+) -> None:
+    resync_seconds = resync_seconds or settings.revocation_resync_seconds
+    while True:
+        pubsub = client.pubsub()
+        try:
+            # Subscribe before the snapshot so no revocation falls in between.
+            await pubsub.subscribe(REVOCATION_CHANNEL)
+            await _load_snapshot(client, cache)
+            next_resync = time.monotonic() + resync_seconds
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=poll_seconds
+                )
+                if message is not None:
+                    _apply_message(cache, message["data"])
+                if time.monotonic() >= next_resync:
+                    await _load_snapshot(client, cache)
+                    next_resync = time.monotonic() + resync_seconds
+        except RedisError:
+            cache.ready = False
+            await asyncio.sleep(retry_seconds)
+        finally:
+            cache.ready = False
+            await pubsub.aclose()
+
+
+def start_revocation_listener() -> bool:
+    """Start the per-worker subscriber when the shared store is Redis."""
+    global _listener_task
+
+    if _listener_task is not None:
+        return True
+
+    store = get_async_security_store()
+    if not isinstance(store, AsyncRedisSecurityStore):
+        return False
+
+    _listener_task = asyncio.get_running_loop().create_task(
+        run_revocation_listener(store.redis_client)
+    )
+    return True
+
+
+async def stop_revocation_listener() -> None:
+    global _listener_task
+
+    if _listener_task is None:
+        return
+    _listener_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _listener_task
+    _listener_task = None
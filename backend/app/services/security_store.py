@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import heapq
+import math
 import threading
 import time
+import uuid
+from collections import deque
 from typing import Optional
 
 from app.config import get_settings
@@ -10,30 +14,143 @@ settings = get_settings()
 
 try:  # pragma: no cover - import branch depends on runtime env
     from redis import Redis
+    from redis.asyncio import ConnectionPool as AsyncConnectionPool
+    from redis.asyncio import Redis as AsyncRedis
     from redis.exceptions import RedisError
 except Exception:  # pragma: no cover - handled by fallback store
     Redis = None  # type: ignore[assignment]
+    AsyncRedis = None  # type: ignore[assignment]
+    AsyncConnectionPool = None  # type: ignore[assignment]
     RedisError = Exception  # type: ignore[assignment,misc]
 
 
+# Rate limit scripts run atomically on the server and are sent once, then
+# invoked by SHA (redis-py's Script falls back to SCRIPT LOAD on NOSCRIPT).
+FIXED_WINDOW_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+local ttl = redis.call('TTL', KEYS[1])
+if ttl < 0 then
+    ttl = tonumber(ARGV[1])
+    redis.call('EXPIRE', KEYS[1], ttl)
+end
+return {count, ttl}
+"""
+
+# Sliding log in a sorted set; only accepted hits are recorded.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window_ms)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, tonumber(oldest[2]) + window_ms - now, count + 1}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], window_ms)
+return {1, 0, count + 1}
+"""
+
+# Bucket of `limit` tokens refilled evenly over the window.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local rate = capacity / window_ms
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - last) * rate)
+local allowed = 0
+local retry_ms = 0
+local count = capacity + 1
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+    count = capacity - math.floor(tokens)
+else
+    retry_ms = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], window_ms)
+return {allowed, retry_ms, count}
+"""
+
+# Leases for single-runner background jobs: take the key when it is free or
+# already ours (renewing the TTL), and release it only if we still own it.
+LEASE_ACQUIRE_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', tonumber(ARGV[2]))
+return 1
+"""
+
+LEASE_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _limit_result(result: list, window_seconds: int) -> tuple[bool, int, int]:
+    allowed, retry_ms, count = result
+    if allowed:
+        return True, window_seconds, int(count)
+    return False, max(1, math.ceil(int(retry_ms) / 1000)), int(count)
+
+
 class InMemorySecurityStore:
+    # Heap entries are (expiry, kind, key); every table entry ends with its
+    # expiry. Overwritten or deleted keys leave stale heap entries behind;
+    # they are skipped on pop and compacted in bulk.
+    _VALUE = "value"
+    _COUNTER = "counter"
+    _WINDOW = "window"
+    _BUCKET = "bucket"
+    _TABLES = {
+        _VALUE: "_values",
+        _COUNTER: "_counters",
+        _WINDOW: "_windows",
+        _BUCKET: "_buckets",
+    }
+    _COMPACT_MIN_ENTRIES = 1024
+
     def __init__(self) -> None:
         self._lock = threading.Lock()
         self._values: dict[str, tuple[str, float]] = {}
         self._counters: dict[str, tuple[int, float]] = {}
+        self._windows: dict[str, tuple[deque[float], float]] = {}
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._expiries: list[tuple[float, str, str]] = []
+
+    def _table(self, kind: str) -> dict:
+        return getattr(self, self._TABLES[kind])
+
+    def _schedule(self, kind: str, key: str, expiry: float) -> None:
+        heapq.heappush(self._expiries, (expiry, kind, key))
+        live = sum(len(self._table(kind)) for kind in self._TABLES)
+        if len(self._expiries) > max(self._COMPACT_MIN_ENTRIES, 2 * live):
+            self._expiries = [
+                (entry[-1], kind, key)
+                for kind in self._TABLES
+                for key, entry in self._table(kind).items()
+            ]
+            heapq.heapify(self._expiries)
 
     def _prune(self) -> None:
         now = time.time()
-        self._values = {
-            key: (value, expiry)
-            for key, (value, expiry) in self._values.items()
-            if expiry > now
-        }
-        self._counters = {
-            key: (count, expiry)
-            for key, (count, expiry) in self._counters.items()
-            if expiry > now
-        }
+        while self._expiries and self._expiries[0][0] <= now:
+            expiry, kind, key = heapq.heappop(self._expiries)
+            table = self._table(kind)
+            current = table.get(key)
+            if current is not None and current[-1] == expiry:
+                del table[key]
 
     def incr_with_window(self, key: str, window_seconds: int) -> tuple[int, int]:
         now = time.time()
@@ -43,6 +160,7 @@ class InMemorySecurityStore:
             if current is None:
                 expiry = now + window_seconds
                 self._counters[key] = (1, expiry)
+                self._schedule(self._COUNTER, key, expiry)
                 return 1, window_seconds
 
             count, expiry = current
@@ -50,10 +168,61 @@ class InMemorySecurityStore:
             self._counters[key] = (count, expiry)
             return count, max(1, int(expiry - now))
 
+    def sliding_window_hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        now = time.time()
+        with self._lock:
+            self._prune()
+            entry = self._windows.get(key)
+            hits = entry[0] if entry is not None else deque()
+            while hits and hits[0] <= now - window_seconds:
+                hits.popleft()
+            if len(hits) >= limit:
+                retry_after = max(1, math.ceil(hits[0] + window_seconds - now))
+                return False, retry_after, len(hits) + 1
+
+            hits.append(now)
+            expiry = now + window_seconds
+            self._windows[key] = (hits, expiry)
+            self._schedule(self._WINDOW, key, expiry)
+            return True, window_seconds, len(hits)
+
+    def token_bucket_hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        now = time.time()
+        rate = limit / window_seconds
+        with self._lock:
+            self._prune()
+            entry = self._buckets.get(key)
+            tokens = float(limit)
+            if entry is not None:
+                tokens = min(tokens, entry[0] + (now - entry[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            # An idle bucket is full again after one window, so it can expire.
+            expiry = now + window_seconds
+            self._buckets[key] = (tokens, now, expiry)
+            self._schedule(self._BUCKET, key, expiry)
+            if allowed:
+                return True, window_seconds, limit - math.floor(tokens)
+            return False, max(1, math.ceil((1 - tokens) / rate)), limit + 1
+
     def set_with_ttl(self, key: str, value: str, ttl_seconds: int) -> None:
         with self._lock:
             self._prune()
-            self._values[key] = (value, time.time() + ttl_seconds)
+            expiry = time.time() + ttl_seconds
+            self._values[key] = (value, expiry)
+            self._schedule(self._VALUE, key, expiry)
 
     def get_value(self, key: str) -> Optional[str]:
         with self._lock:
@@ -63,24 +232,98 @@ class InMemorySecurityStore:
                 return None
             return value[0]
 
+    def swap_value(self, key: str, value: str, ttl_seconds: int) -> Optional[str]:
+        with self._lock:
+            self._prune()
+            previous = self._values.get(key)
+            expiry = time.time() + ttl_seconds
+            self._values[key] = (value, expiry)
+            self._schedule(self._VALUE, key, expiry)
+            if previous is None:
+                return None
+            return previous[0]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def acquire_lease(self, key: str, owner: str, ttl_seconds: int) -> bool:
+        with self._lock:
+            self._prune()
+            current = self._values.get(key)
+            if current is not None and current[0] != owner:
+                return False
+            expiry = time.time() + ttl_seconds
+            self._values[key] = (owner, expiry)
+            self._schedule(self._VALUE, key, expiry)
+            return True
+
+    def release_lease(self, key: str, owner: str) -> None:
+        with self._lock:
+            current = self._values.get(key)
+            if current is not None and current[0] == owner:
+                del self._values[key]
+
+    def publish(self, channel: str, message: str) -> None:
+        # Single process: there are no other workers to notify.
+        return None
+
 
 class RedisSecurityStore:
     def __init__(self, redis_client: Redis) -> None:
         self.redis_client = redis_client
+        self._fixed_window = redis_client.register_script(FIXED_WINDOW_SCRIPT)
+        self._sliding_window = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._token_bucket = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._lease_acquire = redis_client.register_script(LEASE_ACQUIRE_SCRIPT)
+        self._lease_release = redis_client.register_script(LEASE_RELEASE_SCRIPT)
 
     def incr_with_window(self, key: str, window_seconds: int) -> tuple[int, int]:
         try:
-            with self.redis_client.pipeline() as pipe:
-                pipe.incr(key)
-                pipe.ttl(key)
-                count, ttl = pipe.execute()
-            if ttl in (-1, -2):
-                self.redis_client.expire(key, window_seconds)
-                ttl = window_seconds
+            count, ttl = self._fixed_window(keys=[key], args=[window_seconds])
             return int(count), max(1, int(ttl))
         except RedisError:
             return 1, window_seconds
 
+    def _run_limit_script(
+        self,
+        script,
+        key: str,
+        args: list,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        try:
+            result = script(keys=[key], args=args)
+        except RedisError:
+            return True, window_seconds, 1
+        return _limit_result(result, window_seconds)
+
+    def sliding_window_hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        return self._run_limit_script(
+            self._sliding_window,
+            key,
+            [limit, window_seconds * 1000, uuid.uuid4().hex],
+            window_seconds
+        )
+
+    def token_bucket_hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        return self._run_limit_script(
+            self._token_bucket,
+            key,
+            [limit, window_seconds * 1000],
+            window_seconds
+        )
+
     def set_with_ttl(self, key: str, value: str, ttl_seconds: int) -> None:
         try:
             self.redis_client.setex(key, ttl_seconds, value)
@@ -96,9 +339,193 @@ class RedisSecurityStore:
         except RedisError:
             return None
 
+    def swap_value(self, key: str, value: str, ttl_seconds: int) -> Optional[str]:
+        # SET ... GET: exactly one caller sees the previous value, even across workers.
+        # RedisError propagates so an outage is never mistaken for a missing key.
+        value = self.redis_client.set(key, value, ex=ttl_seconds, get=True)
+        if value is None:
+            return None
+        return str(value)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.redis_client.delete(key)
+        except RedisError:
+            return
+
+    def acquire_lease(self, key: str, owner: str, ttl_seconds: int) -> bool:
+        try:
+            return bool(self._lease_acquire(keys=[key], args=[owner, ttl_seconds]))
+        except RedisError:
+            return False
+
+    def release_lease(self, key: str, owner: str) -> None:
+        try:
+            self._lease_release(keys=[key], args=[owner])
+        except RedisError:
+            return
+
+    def publish(self, channel: str, message: str) -> None:
+        try:
+            self.redis_client.publish(channel, message)
+        except RedisError:
+            return
+
+
+class AsyncInMemorySecurityStore:
+    """Awaitable view of an InMemorySecurityStore; calls never leave the process."""
+
+    def __init__(self, store: InMemorySecurityStore) -> None:
+        self.store = store
+
+    async def incr_with_window(self, key: str, window_seconds: int) -> tuple[int, int]:
+        return self.store.incr_with_window(key, window_seconds)
+
+    async def sliding_window_hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        return self.store.sliding_window_hit(key, limit, window_seconds)
+
+    async def token_bucket_hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        return self.store.token_bucket_hit(key, limit, window_seconds)
+
+    async def set_with_ttl(self, key: str, value: str, ttl_seconds: int) -> None:
+        self.store.set_with_ttl(key, value, ttl_seconds)
+
+    async def get_value(self, key: str) -> Optional[str]:
+        return self.store.get_value(key)
+
+    async def swap_value(self, key: str, value: str, ttl_seconds: int) -> Optional[str]:
+        return self.store.swap_value(key, value, ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        self.store.delete(key)
+
+    async def acquire_lease(self, key: str, owner: str, ttl_seconds: int) -> bool:
+        return self.store.acquire_lease(key, owner, ttl_seconds)
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        self.store.release_lease(key, owner)
+
+    async def publish(self, channel: str, message: str) -> None:
+        self.store.publish(channel, message)
+
+
+class AsyncRedisSecurityStore:
+    """RedisSecurityStore for the event loop, backed by a redis.asyncio pool."""
+
+    def __init__(self, redis_client: AsyncRedis) -> None:
+        self.redis_client = redis_client
+        self._fixed_window = redis_client.register_script(FIXED_WINDOW_SCRIPT)
+        self._sliding_window = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._token_bucket = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._lease_acquire = redis_client.register_script(LEASE_ACQUIRE_SCRIPT)
+        self._lease_release = redis_client.register_script(LEASE_RELEASE_SCRIPT)
+
+    async def incr_with_window(self, key: str, window_seconds: int) -> tuple[int, int]:
+        try:
+            count, ttl = await self._fixed_window(keys=[key], args=[window_seconds])
+            return int(count), max(1, int(ttl))
+        except RedisError:
+            return 1, window_seconds
+
+    async def _run_limit_script(
+        self,
+        script,
+        key: str,
+        args: list,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        try:
+            result = await script(keys=[key], args=args)
+        except RedisError:
+            return True, window_seconds, 1
+        return _limit_result(result, window_seconds)
+
+    async def sliding_window_hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        return await self._run_limit_script(
+            self._sliding_window,
+            key,
+            [limit, window_seconds * 1000, uuid.uuid4().hex],
+            window_seconds
+        )
+
+    async def token_bucket_hit(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        return await self._run_limit_script(
+            self._token_bucket,
+            key,
+            [limit, window_seconds * 1000],
+            window_seconds
+        )
+
+    async def set_with_ttl(self, key: str, value: str, ttl_seconds: int) -> None:
+        try:
+            await self.redis_client.setex(key, ttl_seconds, value)
+        except RedisError:
+            return
+
+    async def get_value(self, key: str) -> Optional[str]:
+        try:
+            value = await self.redis_client.get(key)
+            if value is None:
+                return None
+            return str(value)
+        except RedisError:
+            return None
+
+    async def swap_value(self, key: str, value: str, ttl_seconds: int) -> Optional[str]:
+        value = await self.redis_client.set(key, value, ex=ttl_seconds, get=True)
+        if value is None:
+            return None
+        return str(value)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.redis_client.delete(key)
+        except RedisError:
+            return
+
+    async def acquire_lease(self, key: str, owner: str, ttl_seconds: int) -> bool:
+        try:
+            return bool(await self._lease_acquire(keys=[key], args=[owner, ttl_seconds]))
+        except RedisError:
+            return False
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        try:
+            await self._lease_release(keys=[key], args=[owner])
+        except RedisError:
+            return
+
+    async def publish(self, channel: str, message: str) -> None:
+        try:
+            await self.redis_client.publish(channel, message)
+        except RedisError:
+            return
+
 
 _store_cache: Optional[InMemorySecurityStore | RedisSecurityStore] = None
 _redis_cache: Optional[Redis] = None
+_async_store_cache: Optional[AsyncRedisSecurityStore] = None
+_async_redis_cache: Optional[AsyncRedis] = None
 
 
 def get_redis_client() -> Optional[Redis]:
@@ -124,6 +551,36 @@ def get_redis_client() -> Optional[Redis]:
         return None
 
 
+def get_async_redis_client() -> Optional[AsyncRedis]:
+    """Pooled redis.asyncio client; connections are opened lazily on the running loop."""
+    global _async_redis_cache
+
+    if _async_redis_cache is not None:
+        return _async_redis_cache
+
+    if AsyncRedis is None or not settings.redis_url:
+        return None
+
+    pool = AsyncConnectionPool.from_url(
+        settings.redis_url,
+        decode_responses=True,
+        socket_connect_timeout=1,
+        socket_timeout=1,
+        max_connections=settings.redis_max_connections
+    )
+    _async_redis_cache = AsyncRedis(connection_pool=pool)
+    return _async_redis_cache
+
+
+async def close_async_redis_client() -> None:
+    global _async_redis_cache, _async_store_cache
+
+    if _async_redis_cache is not None:
+        await _async_redis_cache.aclose()
+    _async_redis_cache = None
+    _async_store_cache = None
+
+
 def is_redis_available() -> bool:
     return get_redis_client() is not None
 
@@ -144,3 +601,20 @@ def get_security_store() -> InMemorySecurityStore | RedisSecurityStore:
 
     _store_cache = InMemorySecurityStore()
     return _store_cache
+
+
+def get_async_security_store() -> AsyncInMemorySecurityStore | AsyncRedisSecurityStore:
+    """Awaitable store matching get_security_store().
+
+    Redis availability is still decided once by the sync client's ping; the
+    in-memory variant wraps the same instance so sync and async callers agree.
+    """
+    global _async_store_cache
+
+    store = get_security_store()
+    if not isinstance(store, RedisSecurityStore):
+        return AsyncInMemorySecurityStore(store)
+
+    if _async_store_cache is None:
+        _async_store_cache = AsyncRedisSecurityStore(get_async_redis_client())
+    return _async_store_cache
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 import uuid
 from typing import Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
@@ -15,7 +16,24 @@ from app.core.security import (
     hash_token
 )
 from app.db.models import RefreshToken, User
-from app.services.security_store import get_security_store
+from app.services.refresh_cache import (
+    RefreshSessionClaimed,
+    RefreshSessionState,
+    RefreshSessionUnavailable,
+    apply_refresh_rows,
+    claim_refresh_session,
+    record_refresh_rows,
+    release_refresh_claim,
+    remember_refresh_session,
+    settle_refresh_claim,
+)
+from app.services.revocation_cache import (
+    REVOCATION_CHANNEL,
+    REVOKED_SESSION_PREFIX,
+    encode_revocation,
+    revoked_sessions,
+)
+from app.services.security_store import get_async_security_store
 
 settings = get_settings()
 
@@ -27,6 +45,18 @@ class SessionBundle:
     csrf_token: str
     session_id: str
     session_expires_at: datetime
+    user_id: int
+    username: str
+
+    @property
+    def refresh_state(self) -> RefreshSessionState:
+        return RefreshSessionState(
+            user_id=self.user_id,
+            username=self.username,
+            session_id=self.session_id,
+            csrf_token=self.csrf_token,
+            expires_at=self.session_expires_at
+        )
 
 
 def _utcnow() -> datetime:
@@ -70,10 +100,24 @@ def create_session_tokens(
         refresh_token=refresh_token,
         csrf_token=csrf_token,
         session_id=session_id,
-        session_expires_at=expires_at
+        session_expires_at=expires_at,
+        user_id=user.id,
+        username=user.username
     )
 
 
+async def create_session_tokens_async(
+    db: AsyncSession,
+    *,
+    user: User,
+    ip: Optional[str] = None,
+    user_agent: Optional[str] = None
+) -> SessionBundle:
+    bundle = await db.run_sync(create_session_tokens, user=user, ip=ip, user_agent=user_agent)
+    await remember_refresh_session(hash_token(bundle.refresh_token), bundle.refresh_state)
+    return bundle
+
+
 def _get_active_refresh_row(db: Session, refresh_token: str) -> Optional[RefreshToken]:
     now = _utcnow()
     return db.query(RefreshToken).filter(
@@ -83,23 +127,14 @@ def _get_active_refresh_row(db: Session, refresh_token: str) -> Optional[Refresh
     ).first()
 
 
-def rotate_session_tokens(
+def _rotate_refresh_row(
     db: Session,
+    current: RefreshToken,
     *,
-    refresh_token: str,
-    csrf_token: str,
     ip: Optional[str] = None,
     user_agent: Optional[str] = None
 ) -> Optional[SessionBundle]:
     now = _utcnow()
-    current = _get_active_refresh_row(db, refresh_token)
-    if current is None:
-        return None
-    if current.csrf_token != csrf_token:
-        return None
-    if is_access_session_revoked(current.session_id):
-        return None
-
     current.revoked_at = now
     current.last_used_at = now
 
@@ -129,11 +164,102 @@ def rotate_session_tokens(
         refresh_token=new_refresh,
         csrf_token=new_csrf,
         session_id=current.session_id,
-        session_expires_at=expires_at
+        session_expires_at=expires_at,
+        user_id=user.id,
+        username=user.username
     )
 
 
-def revoke_refresh_session(db: Session, refresh_token: str) -> Optional[RefreshToken]:
+async def _rotate_cached_session(
+    db: AsyncSession,
+    token_hash: str,
+    state: RefreshSessionState,
+    *,
+    csrf_token: str,
+    ip: Optional[str] = None,
+    user_agent: Optional[str] = None
+) -> Optional[SessionBundle]:
+    now = _utcnow()
+    if state.csrf_token != csrf_token:
+        # A bad CSRF cookie must not burn the caller's token; put it back.
+        await remember_refresh_session(token_hash, state)
+        return None
+    if state.expires_at <= now:
+        return None
+    if await is_access_session_revoked_async(state.session_id):
+        return None
+
+    new_refresh = create_refresh_token_value()
+    new_csrf = create_csrf_token_value()
+    expires_at = now + timedelta(days=settings.refresh_token_expire_days)
+    bundle = SessionBundle(
+        access_token=_build_access_token(state.username, state.session_id),
+        refresh_token=new_refresh,
+        csrf_token=new_csrf,
+        session_id=state.session_id,
+        session_expires_at=expires_at,
+        user_id=state.user_id,
+        username=state.username
+    )
+    new_hash = hash_token(new_refresh)
+    await remember_refresh_session(new_hash, bundle.refresh_state)
+    await record_refresh_rows(db, {
+        "issued": bundle.refresh_state.row_values(
+            new_hash,
+            created_ip=ip,
+            created_user_agent=user_agent
+        ),
+        "revoked": state.row_values(token_hash, revoked_at=now, last_used_at=now),
+    })
+    return bundle
+
+
+async def rotate_session_tokens_async(
+    db: AsyncSession,
+    *,
+    refresh_token: str,
+    csrf_token: str,
+    ip: Optional[str] = None,
+    user_agent: Optional[str] = None
+) -> Optional[SessionBundle]:
+    """Rotate from the cached session state, falling back to refresh_tokens.
+
+    The cached path claims the token atomically and queues the row writes, so
+    a refresh costs one store round trip instead of a SELECT, UPDATE and INSERT.
+    """
+    token_hash = hash_token(refresh_token)
+    try:
+        state = await claim_refresh_session(token_hash)
+    except (RefreshSessionClaimed, RefreshSessionUnavailable):
+        return None
+    if state is not None:
+        return await _rotate_cached_session(
+            db,
+            token_hash,
+            state,
+            csrf_token=csrf_token,
+            ip=ip,
+            user_agent=user_agent
+        )
+
+    current = await db.run_sync(_get_active_refresh_row, refresh_token)
+    if current is None or current.csrf_token != csrf_token:
+        await release_refresh_claim(token_hash)
+        return None
+    await settle_refresh_claim(token_hash, current.expires_at)
+    if await is_access_session_revoked_async(current.session_id):
+        return None
+    bundle = await db.run_sync(_rotate_refresh_row, current, ip=ip, user_agent=user_agent)
+    if bundle is not None:
+        await remember_refresh_session(hash_token(bundle.refresh_token), bundle.refresh_state)
+    return bundle
+
+
+def _get_refresh_row(db: Session, token_hash: str) -> Optional[RefreshToken]:
+    return db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).first()
+
+
+def _revoke_refresh_row(db: Session, refresh_token: str) -> Optional[RefreshToken]:
     row = _get_active_refresh_row(db, refresh_token)
     if row is None:
         return None
@@ -142,15 +268,53 @@ def revoke_refresh_session(db: Session, refresh_token: str) -> Optional[RefreshT
     row.last_used_at = _utcnow()
     db.commit()
     db.refresh(row)
+    return row
 
-    revoke_access_session(row.session_id)
+
+async def revoke_refresh_session_async(
+    db: AsyncSession,
+    refresh_token: str
+) -> Optional[RefreshToken]:
+    """Revoke the refresh token and its access session.
+
+    Raises RefreshSessionUnavailable when the store is down: the token's row
+    may still be queued in a writer and its cached state cannot be claimed, so
+    a database-only revocation could be undone once the store is back.
+    """
+    token_hash = hash_token(refresh_token)
+    try:
+        state = await claim_refresh_session(token_hash)
+    except RefreshSessionClaimed:
+        state = None
+    if state is not None:
+        # Its row may still be queued in a writer; the upsert revokes it either way.
+        now = _utcnow()
+        await db.run_sync(apply_refresh_rows, [{
+            "revoked": state.row_values(token_hash, revoked_at=now, last_used_at=now),
+        }])
+        row = await db.run_sync(_get_refresh_row, token_hash)
+    else:
+        row = await db.run_sync(_revoke_refresh_row, refresh_token)
+        if row is not None:
+            await settle_refresh_claim(token_hash, row.expires_at)
+    if row is not None:
+        await revoke_access_session_async(row.session_id)
     return row
 
 
-def revoke_access_session(session_id: str) -> None:
+def _revoked_session_key(session_id: str) -> str:
+    return f"{REVOKED_SESSION_PREFIX}{session_id}"
+
+
+async def revoke_access_session_async(session_id: str) -> None:
     ttl_seconds = settings.access_token_expire_minutes * 60
-    get_security_store().set_with_ttl(f"revoked_session:{session_id}", "1", ttl_seconds)
+    store = get_async_security_store()
+    await store.set_with_ttl(_revoked_session_key(session_id), "1", ttl_seconds)
+    revoked_sessions.add(session_id, ttl_seconds)
+    await store.publish(REVOCATION_CHANNEL, encode_revocation(session_id, ttl_seconds))
 
 
-def is_access_session_revoked(session_id: str) -> bool:
-    return get_security_store().get_value(f"revoked_session:{session_id}") == "1"
+async def is_access_session_revoked_async(session_id: str) -> bool:
+    if revoked_sessions.ready:
+        return revoked_sessions.contains(session_id)
+    return await get_async_security_store().get_value(_revoked_session_key(session_id)) == "1"
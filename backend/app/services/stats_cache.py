@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import weakref
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.crud.account import get_stats
+from app.services.security_store import get_async_security_store, get_security_store
+
+settings = get_settings()
+
+PUBLIC_STATS_CACHE_KEY = "cache:public_stats"
+
+# One lock per event loop: asyncio locks cannot be shared across loops.
+_refresh_locks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _refresh_lock() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    lock = _refresh_locks.get(loop)
+    if lock is None:
+        lock = _refresh_locks[loop] = asyncio.Lock()
+    return lock
+
+
+async def get_public_stats_payload(db: AsyncSession) -> str:
+    store = get_async_security_store()
+    cached = await store.get_value(PUBLIC_STATS_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    # Single flight: concurrent misses in this worker wait for one query and
+    # then read its result from the store instead of each hitting the DB.
+    async with _refresh_lock():
+        cached = await store.get_value(PUBLIC_STATS_CACHE_KEY)
+        if cached is not None:
+            return cached
+        payload = json.dumps(await db.run_sync(get_stats), separators=(",", ":"), sort_keys=True)
+        await store.set_with_ttl(
+            PUBLIC_STATS_CACHE_KEY,
+            payload,
+            settings.public_stats_cache_ttl_seconds
+        )
+    return payload
+
+
+def invalidate_public_stats() -> None:
+    """Drop the cached counters after any write that changes them."""
+    get_security_store().delete(PUBLIC_STATS_CACHE_KEY)
+
+
+async def invalidate_public_stats_async() -> None:
+    await get_async_security_store().delete(PUBLIC_STATS_CACHE_KEY)
+
+
+def build_etag(payload: str) -> str:
+    return f'"{hashlib.sha256(payload.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -0,0 +1,119 @@
+"""Requests/sec through the legacy @app.middleware("http") pair vs ResponseHeadersMiddleware.
+
+Both apps expose the same JSON and streaming routes and are driven in-process
+over ASGI, so the numbers isolate middleware overhead from network and server.
+
+Usage (from backend/):
+    python -m benchmarks.bench_middleware --requests 5000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.config import get_settings
+from app.core.middleware import BASE_SECURITY_HEADERS, HSTS_HEADER_VALUE, ResponseHeadersMiddleware
+
+settings = get_settings()
+
+
+def _routes(app: FastAPI, chunks: int) -> FastAPI:
+    @app.get("/api/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/admin/stream")
+    async def stream():
+        async def body():
+            for _ in range(chunks):
+                yield b"x" * 1024
+
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    return app
+
+
+def legacy_app(chunks: int) -> FastAPI:
+    """The middleware as it was registered in main.py before the ASGI rewrite."""
+    app = _routes(FastAPI(), chunks)
+
+    @app.middleware("http")
+    async def v1_deprecation_middleware(request: Request, call_next):
+        path = request.url.path
+        is_v1_path = path.startswith("/api/auth") or path.startswith("/api/admin")
+        now = datetime.now(timezone.utc)
+
+        if is_v1_path and now >= settings.v1_sunset_at:
+            return JSONResponse(
+                status_code=410,
+                content={"detail": "API v1 descontinuada. Use /api/v2."},
+                headers={"Deprecation": "true", "Sunset": settings.v1_sunset_http}
+            )
+
+        response = await call_next(request)
+        if is_v1_path:
+            response.headers["Deprecation"] = "true"
+            response.headers["Sunset"] = settings.v1_sunset_http
+        return response
+
+    @app.middleware("http")
+    async def security_headers_middleware(request: Request, call_next):
+        response = await call_next(request)
+        for header_name, header_value in BASE_SECURITY_HEADERS.items():
+            response.headers.setdefault(header_name, header_value)
+        if settings.cookie_secure:
+            response.headers.setdefault("Strict-Transport-Security", HSTS_HEADER_VALUE)
+        return response
+
+    return app
+
+
+def asgi_app(chunks: int) -> FastAPI:
+    app = _routes(FastAPI(), chunks)
+    app.add_middleware(ResponseHeadersMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get(path)
+
+        remaining = iter(range(requests))
+
+        async def worker() -> None:
+            for _ in remaining:
+                response = await client.get(path)
+                assert response.headers["x-frame-options"] == "DENY"
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def run(requests: int, concurrency: int, chunks: int) -> None:
+    print(f"{'route':>18} | {'decorators req/s':>16} | {'asgi req/s':>10} | {'speedup':>7}")
+    for path in ("/api/health", "/api/admin/stream"):
+        before = await measure(legacy_app(chunks), path, requests, concurrency)
+        after = await measure(asgi_app(chunks), path, requests, concurrency)
+        print(f"{path:>18} | {before:>16.0f} | {after:>10.0f} | {after / before:>6.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--chunks", type=int, default=32, help="1 KiB chunks per streaming response")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.chunks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Per-call cost of InMemorySecurityStore as the number of live keys grows.
+
+Compares the previous full-dict prune with the heap-based expiry.
+
+Usage (from backend/):
+    python -m benchmarks.bench_security_store --sizes 1000 10000 100000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.services.security_store import InMemorySecurityStore
+
+
+class LegacyInMemorySecurityStore(InMemorySecurityStore):
+    """The O(total keys) prune that rebuilt both dicts on every call."""
+
+    def _schedule(self, kind: str, key: str, expiry: float) -> None:
+        return None
+
+    def _prune(self) -> None:
+        now = time.time()
+        self._values = {
+            key: (value, expiry)
+            for key, (value, expiry) in self._values.items()
+            if expiry > now
+        }
+        self._counters = {
+            key: (count, expiry)
+            for key, (count, expiry) in self._counters.items()
+            if expiry > now
+        }
+
+
+def populate(store: InMemorySecurityStore, keys: int) -> None:
+    # Fill the tables directly: going through the legacy API would be O(n^2).
+    expiry = time.time() + 3600
+    for index in range(keys):
+        store._values[f"session:{index}"] = ("1", expiry)
+        store._schedule(store._VALUE, f"session:{index}", expiry)
+        store._counters[f"rl:login:{index}"] = (1, expiry)
+        store._schedule(store._COUNTER, f"rl:login:{index}", expiry)
+
+
+def per_call_us(store: InMemorySecurityStore, calls: int) -> float:
+    started = time.perf_counter()
+    for index in range(calls):
+        store.incr_with_window(f"rl:bench:{index % 100}", 60)
+        store.get_value(f"session:{index}")
+    return (time.perf_counter() - started) / (calls * 2) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--legacy-calls", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'keys':>8} | {'legacy us/call':>15} | {'heap us/call':>13}")
+    for size in args.sizes:
+        legacy = LegacyInMemorySecurityStore()
+        heap = InMemorySecurityStore()
+        populate(legacy, size)
+        populate(heap, size)
+        legacy_cost = per_call_us(legacy, args.legacy_calls)
+        heap_cost = per_call_us(heap, args.calls)
+        print(f"{size:>8} | {legacy_cost:>15.1f} | {heap_cost:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
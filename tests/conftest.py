@@ -1,12 +1,15 @@
 import os
 import sys
+import tempfile
+from datetime import date
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 os.environ.setdefault(
     "ENCRYPTION_KEY",
@@ -19,32 +22,60 @@ os.environ.setdefault(
 )
 os.environ.setdefault("ADMIN_PASSWORD", "test-admin-password")
 os.environ.setdefault("V1_DEPRECATION_START", "2099-01-01T00:00:00+00:00")
+# Audit and refresh rows are asserted right after requests; the writers have their own tests.
+os.environ.setdefault("AUDIT_WRITER_ENABLED", "false")
+os.environ.setdefault("REFRESH_WRITER_ENABLED", "false")
+# The sweeper would rewrite account statuses behind the tests; it is tested directly.
+os.environ.setdefault("EXPIRY_SWEEPER_ENABLED", "false")
 
 ROOT = Path(__file__).resolve().parents[1]
 BACKEND_PATH = ROOT / "backend"
 if str(BACKEND_PATH) not in sys.path:
     sys.path.insert(0, str(BACKEND_PATH))
 
-from app.db.database import Base, get_db  # noqa: E402
-from app.db import models  # noqa: F401,E402
+from app.db.database import Base, get_async_db, get_db  # noqa: E402
+from app.db import models  # noqa: E402
+from app.crud import user as user_crud  # noqa: E402
+from app.schemas.user import UserCreate  # noqa: E402
 from app.main import app  # noqa: E402
+from app.services import principal_cache  # noqa: E402
 
+# Sync fixtures and async v2 routes must see the same data, so both engines
+# point at one throwaway SQLite file instead of a per-connection :memory: db.
+TEST_DB_PATH = Path(tempfile.gettempdir()) / f"copytrade-test-{os.getpid()}.db"
 TEST_ENGINE = create_engine(
-    "sqlite:///:memory:",
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool
+    f"sqlite:///{TEST_DB_PATH}",
+    connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=TEST_ENGINE
 )
+TEST_ASYNC_ENGINE = create_async_engine(
+    f"sqlite+aiosqlite:///{TEST_DB_PATH}",
+    poolclass=NullPool
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=TEST_ASYNC_ENGINE,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _remove_test_database():
+    yield
+    TEST_ENGINE.dispose()
+    TEST_DB_PATH.unlink(missing_ok=True)
 
 
 @pytest.fixture()
 def db_session():
     Base.metadata.drop_all(bind=TEST_ENGINE)
     Base.metadata.create_all(bind=TEST_ENGINE)
+    # Each test rebuilds the schema, so cached principals would point at stale rows.
+    principal_cache.clear_local_principals()
     db = TestingSessionLocal()
     try:
         yield db
@@ -60,7 +91,55 @@ def client(db_session):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def async_session_factory(db_session):
+    return TestingAsyncSessionLocal
+
+
+@pytest.fixture()
+def session_factory(db_session):
+    """Sessionmaker on the test database, for jobs that open their own sessions."""
+    return TestingSessionLocal
+
+
+@pytest.fixture()
+def create_user(db_session):
+    def _create(username: str, *, is_admin: bool = False, password: str = "strong-password"):
+        return user_crud.create_user(db_session, UserCreate(
+            username=username,
+            email=f"{username}@example.com",
+            password=password,
+            is_admin=is_admin
+        ))
+
+    return _create
+
+
+@pytest.fixture()
+def seed_accounts(session_factory):
+    """Insert accounts with raw column values; each row overrides the defaults."""
+    def _seed(*rows: dict) -> None:
+        with session_factory() as db:
+            for row in rows:
+                db.add(models.CopyTradeAccount(**{
+                    "account_password": "encrypted",
+                    "server": "MetaTrader",
+                    "buyer_name": "Buyer",
+                    "purchase_date": date.today(),
+                    "status": "pending",
+                    **row,
+                }))
+            db.commit()
+
+    return _seed
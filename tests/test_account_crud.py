@@ -2,6 +2,8 @@ from datetime import date, timedelta
 from decimal import Decimal
 from typing import Optional
 
+import pytest
+
 from app.crud import account as account_crud
 from app.crud import user as user_crud
 from app.schemas.account import AccountCreate, AccountUpdate
@@ -151,3 +153,139 @@ def test_get_accounts_filters_stats_and_admin_stats(db_session):
     admin_stats = account_crud.get_admin_stats(db_session)
     assert admin_stats["total_revenue"] == Decimal("1500.00")
     assert admin_stats["accounts_this_month"] == 4
+
+
+def test_get_accounts_page_walks_keyset_cursor(db_session):
+    admin = create_admin_user(db_session)
+    for index in range(5):
+        account_crud.create_account(
+            db_session,
+            build_account_payload(f"ACC-PAGE-{index}", f"Buyer Page {index}"),
+            admin.id
+        )
+
+    first, first_cursor = account_crud.get_accounts_page(db_session, limit=2)
+    assert [acc.account_number for acc in first] == ["ACC-PAGE-0", "ACC-PAGE-1"]
+    assert first_cursor is not None
+
+    second, second_cursor = account_crud.get_accounts_page(
+        db_session,
+        limit=2,
+        cursor=first_cursor
+    )
+    assert [acc.account_number for acc in second] == ["ACC-PAGE-2", "ACC-PAGE-3"]
+
+    last, last_cursor = account_crud.get_accounts_page(
+        db_session,
+        limit=2,
+        cursor=second_cursor
+    )
+    assert [acc.account_number for acc in last] == ["ACC-PAGE-4"]
+    assert last_cursor is None
+
+    legacy = account_crud.get_accounts(db_session, skip=2, limit=2)
+    assert [acc.id for acc in legacy] == [acc.id for acc in second]
+
+
+def test_pagination_cursor_roundtrip_and_rejects_garbage():
+    from app.core.pagination import decode_cursor, encode_cursor
+
+    assert decode_cursor(encode_cursor(42)) == (42, None)
+    assert decode_cursor(encode_cursor(42, rank=7)) == (42, 7)
+    for garbage in (
+        "not-base64!",
+        "e30",
+        "WzFd",
+        "eyJpZCI6ICJ4In0",
+        "eyJpZCI6LTF9",
+        "eyJpZCI6MSwicmFuayI6IngifQ"
+    ):
+        with pytest.raises(ValueError):
+            decode_cursor(garbage)
+
+
+def test_stats_use_a_single_aggregated_query(db_session):
+    from sqlalchemy import event
+
+    statements: list[str] = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    empty_stats = account_crud.get_admin_stats(db_session)
+    assert empty_stats["total_accounts"] == 0
+    assert empty_stats["total_revenue"] == Decimal("0")
+    assert empty_stats["accounts_this_month"] == 0
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _count_statement)
+    try:
+        account_crud.get_stats(db_session)
+        assert len(statements) == 1
+        statements.clear()
+        account_crud.get_admin_stats(db_session)
+        assert len(statements) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", _count_statement)
+
+
+def test_search_covers_several_columns_and_ranks_matches(db_session):
+    admin = create_admin_user(db_session)
+    account_crud.create_account(
+        db_session,
+        build_account_payload("ZX-100", "Carol Substring ZX"),
+        admin.id
+    )
+    account_crud.create_account(
+        db_session,
+        build_account_payload("ACC-ZX", "Zx Prefix"),
+        admin.id
+    )
+    account_crud.create_account(
+        db_session,
+        build_account_payload("ZX", "Dave"),
+        admin.id
+    )
+    account_crud.create_account(
+        db_session,
+        build_account_payload("ACC-OTHER", "Nobody"),
+        admin.id
+    )
+
+    ranked = account_crud.get_accounts(db_session, search="zx")
+    assert [acc.account_number for acc in ranked] == ["ZX", "ZX-100", "ACC-ZX"]
+
+    by_email = account_crud.get_accounts(db_session, search="nobody@example")
+    assert [acc.account_number for acc in by_email] == ["ACC-OTHER"]
+
+    first, cursor = account_crud.get_accounts_page(db_session, limit=2, search="zx")
+    assert [acc.account_number for acc in first] == ["ZX", "ZX-100"]
+    rest, last_cursor = account_crud.get_accounts_page(
+        db_session,
+        limit=2,
+        search="zx",
+        cursor=cursor
+    )
+    assert [acc.account_number for acc in rest] == ["ACC-ZX"]
+    assert last_cursor is None
+
+    id_only_cursor = account_crud.get_accounts_page(db_session, limit=1)[1]
+    with pytest.raises(ValueError):
+        account_crud.get_accounts_page(db_session, search="zx", cursor=id_only_cursor)
+
+
+def test_search_rank_uses_trigram_similarity_on_postgres():
+    from sqlalchemy.dialects import postgresql
+
+    rank = account_crud._search_rank("postgresql", "alice")
+    compiled = str(rank.compile(dialect=postgresql.dialect()))
+    assert "greatest(similarity(copy_trade_accounts.buyer_name" in compiled
+    assert "similarity(copy_trade_accounts.server" in compiled
+
+
+def test_bulk_status_id_filter_binds_one_array_on_postgres():
+    from sqlalchemy.dialects import postgresql
+
+    compiled = account_crud._id_filter("postgresql", [1, 2, 3]).compile(dialect=postgresql.dialect())
+    assert str(compiled) == "copy_trade_accounts.id = ANY (%(account_ids)s::INTEGER[])"
+    assert compiled.params == {"account_ids": [1, 2, 3]}
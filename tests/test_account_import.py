@@ -0,0 +1,163 @@
+import json
+from datetime import date
+
+import pytest
+
+import app.jobs.import_accounts as import_module
+from app.core.security import decrypt_account_password
+from app.db.models import CopyTradeAccount
+from app.services import account_import, security_store
+from app.services.stats_cache import PUBLIC_STATS_CACHE_KEY
+
+
+def _row(account_number: str, **overrides) -> dict:
+    row = {
+        "account_number": account_number,
+        "account_password": f"pass-{account_number}",
+        "server": "MetaTrader",
+        "buyer_name": "Buyer",
+        "purchase_date": str(date.today()),
+    }
+    row.update(overrides)
+    return row
+
+
+def _account_numbers(session_factory) -> list[str]:
+    with session_factory() as db:
+        return [
+            number for (number,) in
+            db.query(CopyTradeAccount.account_number).order_by(CopyTradeAccount.account_number)
+        ]
+
+
+def test_prepare_import_validates_and_encrypts_in_parallel():
+    prepared = account_import.prepare_import(
+        [_row("P-1"), ["not", "a", "row"], _row("P-2", max_copies="x"), _row("P-3")],
+        user_id=7,
+        workers=2
+    )
+    assert prepared.received == 4
+    assert [index for index, _ in prepared.rows] == [1, 4]
+    values = prepared.rows[1][1]
+    assert values["created_by"] == 7
+    assert values["status"] == "pending"
+    assert decrypt_account_password(values["account_password"]) == "pass-P-3"
+    assert [(error.row, error.account_number) for error in prepared.errors] == [(2, None), (3, "P-2")]
+    assert prepared.errors[0].errors[0].startswith("row: ")
+    assert prepared.errors[1].errors[0].startswith("max_copies: ")
+
+    empty = account_import.prepare_import([])
+    assert empty.rows == [] and empty.errors == []
+
+
+def test_import_reports_phase_statuses_rejected_by_check_constraints(session_factory):
+    rows = [
+        _row("PH-1"),
+        _row("PH-2", phase1_status="bogus"),
+        _row("PH-3", phase2_status="bogus", status="bogus"),
+        _row("PH-4", phase1_status=None, phase2_status="passed"),
+    ]
+    with session_factory() as db:
+        report = account_import.import_accounts(db, rows, chunk_size=1)
+
+    assert report.created == 2
+    assert [(error.row, error.errors) for error in report.errors] == [
+        (2, [account_import.INVALID_PHASE_STATUS.format(field="phase1_status")]),
+        (3, [
+            account_import.INVALID_STATUS,
+            account_import.INVALID_PHASE_STATUS.format(field="phase2_status"),
+        ]),
+    ]
+    assert _account_numbers(session_factory) == ["PH-1", "PH-4"]
+
+
+def test_write_import_reports_rows_lost_to_a_concurrent_import(session_factory, monkeypatch):
+    store = security_store.InMemorySecurityStore()
+    monkeypatch.setattr(security_store, "_store_cache", store)
+    store.set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
+    with session_factory() as db:
+        account_import.import_accounts(db, [_row("RACE-1")])
+    assert store.get_value(PUBLIC_STATS_CACHE_KEY) is None
+
+    # Another import inserted RACE-1 between the IN check and the insert.
+    monkeypatch.setattr(account_import, "_existing_account_numbers", lambda db, numbers: set())
+    with session_factory() as db:
+        report = account_import.import_accounts(db, [_row("RACE-1"), _row("RACE-2")], chunk_size=10)
+    assert report.created == 1
+    assert report.chunks == 1
+    assert [(error.row, error.errors) for error in report.errors] == [
+        (1, [account_import.DUPLICATE_IN_DATABASE])
+    ]
+    assert _account_numbers(session_factory) == ["RACE-1", "RACE-2"]
+
+
+def test_import_accounts_cli_reads_csv_json_and_ndjson(
+    tmp_path,
+    session_factory,
+    create_user,
+    monkeypatch,
+    capsys
+):
+    monkeypatch.setattr(import_module, "SessionLocal", session_factory)
+    admin_id = create_user("importer").id
+
+    csv_path = tmp_path / "accounts.csv"
+    csv_path.write_text(
+        "\ufeffaccount_number,account_password,server,buyer_name,purchase_date,buyer_email,max_copies\n"
+        f"CSV-1,secret,MT5,Buyer,{date.today()},,\n"
+        f"CSV-2,secret,MT5,Buyer,{date.today()},buyer@example.com,3\n",
+        encoding="utf-8"
+    )
+    assert import_module.main([str(csv_path), "--created-by", "importer", "--chunk-size", "1"]) == 0
+    assert "received=2 created=2 failed=0 chunks=2" in capsys.readouterr().out
+
+    json_path = tmp_path / "accounts.json"
+    json_path.write_text(json.dumps([_row("JSON-1"), _row("CSV-1")]), encoding="utf-8")
+    assert import_module.main([str(json_path), "--atomic"]) == 1
+    output = capsys.readouterr().out
+    assert "row 2 (CSV-1): account_number: Numero da conta ja existe" in output
+    assert "created=0 failed=1" in output
+
+    ndjson_path = tmp_path / "accounts.ndjson"
+    ndjson_path.write_text(
+        json.dumps(_row("ND-1")) + "\n\n" + json.dumps({"server": "x"}) + "\n",
+        encoding="utf-8"
+    )
+    assert import_module.main([str(ndjson_path), "--workers", "1"]) == 1
+    assert "row 2 (-): account_number: Field required" in capsys.readouterr().out
+
+    assert import_module.main([str(csv_path), "--created-by", "ghost"]) == 2
+    assert "Unknown user: ghost" in capsys.readouterr().out
+
+    assert _account_numbers(session_factory) == ["CSV-1", "CSV-2", "ND-1"]
+    with session_factory() as db:
+        csv_2 = db.query(CopyTradeAccount).filter(CopyTradeAccount.account_number == "CSV-2").one()
+        assert csv_2.created_by == admin_id
+        assert csv_2.max_copies == 3
+        assert csv_2.buyer_email == "buyer@example.com"
+
+
+@pytest.mark.parametrize("option,value", [
+    ("--workers", "0"),
+    ("--chunk-size", "0"),
+    ("--chunk-size", "-5"),
+])
+def test_import_accounts_cli_rejects_non_positive_counts(tmp_path, option, value, capsys):
+    path = tmp_path / "accounts.json"
+    path.write_text("[]", encoding="utf-8")
+    with pytest.raises(SystemExit) as exc:
+        import_module.main([str(path), option, value])
+    assert exc.value.code == 2
+    assert "must be >= 1" in capsys.readouterr().err
+
+
+def test_import_helpers_refuse_non_positive_counts(session_factory):
+    with pytest.raises(ValueError):
+        account_import.prepare_import([_row("W-1")], workers=0)
+    with pytest.raises(ValueError):
+        account_import.prepare_import([], workers=0)
+    prepared = account_import.prepare_import([_row("C-1")], workers=1)
+    with session_factory() as db:
+        with pytest.raises(ValueError):
+            account_import.write_import(db, prepared, chunk_size=0)
+    assert _account_numbers(session_factory) == []
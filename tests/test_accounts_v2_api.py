@@ -1,10 +1,13 @@
 from datetime import date, timedelta
 
+import pytest
+
 from app.config import get_settings
 from app.crud import user as user_crud
 from app.db.models import SecurityAuditLog
 from app.schemas.user import UserCreate
 from app.services import security_store
+from app.services.stats_cache import PUBLIC_STATS_CACHE_KEY
 
 settings = get_settings()
 
@@ -61,12 +64,14 @@ def test_admin_accounts_v2_full_flow(client, db_session):
     create_admin(db_session)
     login_v2(client, "admin-v2-accounts", "strong-password")
 
+    security_store.get_security_store().set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
     create_resp = client.post(
         "/api/v2/admin/accounts",
         json=account_payload("ACC-V2-1"),
         headers=csrf_headers(client)
     )
     assert create_resp.status_code == 201
+    assert security_store.get_security_store().get_value(PUBLIC_STATS_CACHE_KEY) is None
     created = create_resp.json()
     account_id = created["id"]
     assert "account_password" not in created
@@ -136,6 +141,7 @@ def test_admin_accounts_v2_full_flow(client, db_session):
     assert reveal_rotated.status_code == 200
     assert reveal_rotated.json()["account_password"] == "brand-new-password"
 
+    security_store.get_security_store().set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
     status_changed = client.patch(
         f"/api/v2/admin/accounts/{account_id}/status",
         json={"status": "approved"},
@@ -143,7 +149,9 @@ def test_admin_accounts_v2_full_flow(client, db_session):
     )
     assert status_changed.status_code == 200
     assert status_changed.json()["status"] == "approved"
+    assert security_store.get_security_store().get_value(PUBLIC_STATS_CACHE_KEY) is None
 
+    security_store.get_security_store().set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
     updated = client.put(
         f"/api/v2/admin/accounts/{account_id}",
         json={"buyer_name": "Buyer Updated"},
@@ -151,6 +159,7 @@ def test_admin_accounts_v2_full_flow(client, db_session):
     )
     assert updated.status_code == 200
     assert updated.json()["buyer_name"] == "Buyer Updated"
+    assert security_store.get_security_store().get_value(PUBLIC_STATS_CACHE_KEY) is None
 
     invalid_status = client.patch(
         f"/api/v2/admin/accounts/{account_id}/status",
@@ -177,11 +186,13 @@ def test_admin_accounts_v2_full_flow(client, db_session):
     assert stats.status_code == 200
     assert stats.json()["total_accounts"] == 2
 
+    security_store.get_security_store().set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
     deleted = client.delete(
         f"/api/v2/admin/accounts/{account_id}",
         headers=csrf_headers(client)
     )
     assert deleted.status_code == 204
+    assert security_store.get_security_store().get_value(PUBLIC_STATS_CACHE_KEY) is None
 
     second_deleted = client.delete(
         f"/api/v2/admin/accounts/{second_id}",
@@ -263,3 +274,295 @@ def test_admin_accounts_v2_requires_admin_role(client, db_session):
     login_v2(client, "basic-v2-user", "strong-password")
     denied = client.get("/api/v2/admin/accounts")
     assert denied.status_code == 403
+
+
+def test_admin_accounts_v2_cursor_pagination(client, db_session):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    create_admin(db_session, username="admin-v2-cursor")
+    login_v2(client, "admin-v2-cursor", "strong-password")
+
+    for index in range(3):
+        created = client.post(
+            "/api/v2/admin/accounts",
+            json=account_payload(f"ACC-V2-CUR-{index}"),
+            headers=csrf_headers(client)
+        )
+        assert created.status_code == 201
+
+    first = client.get("/api/v2/admin/accounts", params={"limit": 2})
+    assert first.status_code == 200
+    assert [acc["account_number"] for acc in first.json()] == ["ACC-V2-CUR-0", "ACC-V2-CUR-1"]
+    next_cursor = first.headers.get("X-Next-Cursor")
+    assert next_cursor
+
+    second = client.get("/api/v2/admin/accounts", params={"limit": 2, "cursor": next_cursor})
+    assert second.status_code == 200
+    assert [acc["account_number"] for acc in second.json()] == ["ACC-V2-CUR-2"]
+    assert "X-Next-Cursor" not in second.headers
+
+    legacy = client.get("/api/v2/admin/accounts", params={"limit": 2, "skip": 2})
+    assert legacy.status_code == 200
+    assert [acc["account_number"] for acc in legacy.json()] == ["ACC-V2-CUR-2"]
+
+    both = client.get("/api/v2/admin/accounts", params={"skip": 1, "cursor": next_cursor})
+    assert both.status_code == 400
+
+    invalid = client.get("/api/v2/admin/accounts", params={"cursor": "garbage"})
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"] == "Cursor invalido"
+
+
+def test_admin_accounts_v2_streaming_export(client, db_session, monkeypatch):
+    import csv
+    import io
+    import json
+
+    from app.api import accounts_v2 as accounts_api
+
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    create_admin(db_session, username="admin-v2-export")
+    login_v2(client, "admin-v2-export", "strong-password")
+    monkeypatch.setattr(accounts_api, "EXPORT_BATCH_SIZE", 2)
+
+    for index in range(3):
+        payload = account_payload(f"ACC-V2-EXP-{index}")
+        payload["status"] = "approved" if index else "pending"
+        payload["buyer_name"] = "=HYPERLINK(1)" if index == 2 else f"Buyer {index}"
+        created = client.post("/api/v2/admin/accounts", json=payload, headers=csrf_headers(client))
+        assert created.status_code == 201
+
+    exported = client.get("/api/v2/admin/accounts/export")
+    assert exported.status_code == 200
+    assert exported.headers["content-type"].startswith("text/csv")
+    assert exported.headers["content-disposition"].startswith('attachment; filename="accounts-')
+    assert exported.headers["cache-control"] == "no-store"
+    rows = list(csv.DictReader(io.StringIO(exported.text)))
+    assert [row["account_number"] for row in rows] == ["ACC-V2-EXP-0", "ACC-V2-EXP-1", "ACC-V2-EXP-2"]
+    assert "account_password" not in rows[0]
+    assert rows[0]["purchase_price"] == "150.00"
+    assert rows[0]["phase2_status"] == ""
+    assert rows[2]["buyer_name"] == "'=HYPERLINK(1)"
+
+    projected = client.get(
+        "/api/v2/admin/accounts/export",
+        params={"format": "ndjson", "status": "approved", "columns": "id, account_number,expiry_date"}
+    )
+    assert projected.status_code == 200
+    assert projected.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in projected.text.splitlines()]
+    assert [record["account_number"] for record in records] == ["ACC-V2-EXP-1", "ACC-V2-EXP-2"]
+    assert set(records[0]) == {"id", "account_number", "expiry_date"}
+    assert records[0]["expiry_date"] == str(date.today() + timedelta(days=30))
+
+    searched = client.get(
+        "/api/v2/admin/accounts/export",
+        params={"format": "ndjson", "search": "exp-1", "columns": "account_number"}
+    )
+    assert searched.text == '{"account_number": "ACC-V2-EXP-1"}\n'
+
+    empty = client.get("/api/v2/admin/accounts/export", params={"status": "expired", "columns": "id,status"})
+    assert empty.text == "id,status\r\n"
+
+    unknown = client.get("/api/v2/admin/accounts/export", params={"columns": "id,account_password"})
+    assert unknown.status_code == 400
+    assert unknown.json()["detail"] == "Colunas invalidas: account_password"
+    blank = client.get("/api/v2/admin/accounts/export", params={"columns": " , "})
+    assert blank.status_code == 400
+    assert blank.json()["detail"] == "Nenhuma coluna informada"
+
+    exports = db_session.query(SecurityAuditLog).filter(SecurityAuditLog.action == "account_export").count()
+    assert exports == 4
+
+
+@pytest.mark.parametrize("prefix", ["=", "+", "-", "@", "\t", "\r"])
+def test_export_csv_cells_escape_formula_prefixes(prefix):
+    from app.api import accounts_v2 as accounts_api
+
+    assert accounts_api._csv_cell(f"{prefix}SUM(A1)") == f"'{prefix}SUM(A1)"
+    assert accounts_api._csv_cell(f"Buyer {prefix}") == f"Buyer {prefix}"
+
+
+def test_admin_accounts_v2_bulk_import(client, db_session, monkeypatch):
+    from app.core.security import decrypt_account_password
+    from app.db.models import CopyTradeAccount
+    from app.services import account_import
+
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    admin = create_admin(db_session, username="admin-v2-import")
+    login_v2(client, "admin-v2-import", "strong-password")
+    monkeypatch.setattr(account_import.settings, "account_import_chunk_size", 2)
+    existing = client.post(
+        "/api/v2/admin/accounts",
+        json=account_payload("IMP-EXISTING"),
+        headers=csrf_headers(client)
+    )
+    assert existing.status_code == 201
+
+    missing_server = account_payload("IMP-BAD")
+    del missing_server["server"]
+    bad_status = dict(account_payload("IMP-STATUS"), status="sold")
+    rows = [
+        account_payload("IMP-1"),
+        missing_server,
+        account_payload("IMP-EXISTING"),
+        account_payload("IMP-2"),
+        account_payload("IMP-1"),
+        bad_status,
+        account_payload("IMP-3"),
+    ]
+
+    without_csrf = client.post("/api/v2/admin/accounts/import", json={"accounts": rows})
+    assert without_csrf.status_code == 403
+
+    security_store.get_security_store().set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
+    imported = client.post(
+        "/api/v2/admin/accounts/import",
+        json={"accounts": rows},
+        headers=csrf_headers(client)
+    )
+    assert imported.status_code == 200
+    assert security_store.get_security_store().get_value(PUBLIC_STATS_CACHE_KEY) is None
+    body = imported.json()
+    assert body["received"] == 7
+    assert body["created"] == 3
+    assert body["failed"] == 4
+    assert [(error["row"], error["account_number"]) for error in body["errors"]] == [
+        (2, "IMP-BAD"),
+        (3, "IMP-EXISTING"),
+        (5, "IMP-1"),
+        (6, "IMP-STATUS"),
+    ]
+    assert body["errors"][0]["errors"] == ["server: Field required"]
+    assert body["errors"][1]["errors"] == ["account_number: Numero da conta ja existe"]
+    assert body["errors"][2]["errors"] == ["account_number: Numero da conta repetido na importacao"]
+    assert body["errors"][3]["errors"][0].startswith("status: Status invalido")
+
+    created = db_session.query(CopyTradeAccount).filter(
+        CopyTradeAccount.account_number.in_(["IMP-1", "IMP-2", "IMP-3"])
+    ).all()
+    assert len(created) == 3
+    assert {account.created_by for account in created} == {admin.id}
+    assert decrypt_account_password(created[0].account_password) == "plain-account-pass"
+
+    rejected = client.post(
+        "/api/v2/admin/accounts/import",
+        json={"accounts": [account_payload("IMP-4"), account_payload("IMP-3")], "atomic": True},
+        headers=csrf_headers(client)
+    )
+    assert rejected.status_code == 200
+    assert rejected.json()["created"] == 0
+    assert rejected.json()["failed"] == 1
+    assert db_session.query(CopyTradeAccount).filter(
+        CopyTradeAccount.account_number == "IMP-4"
+    ).count() == 0
+
+    atomic = client.post(
+        "/api/v2/admin/accounts/import",
+        json={"accounts": [account_payload(f"IMP-ATOMIC-{index}") for index in range(3)], "atomic": True},
+        headers=csrf_headers(client)
+    )
+    assert atomic.json() == {"received": 3, "created": 3, "failed": 0, "errors": []}
+
+    monkeypatch.setattr(account_import.settings, "account_import_max_rows", 2)
+    too_many = client.post(
+        "/api/v2/admin/accounts/import",
+        json={"accounts": rows},
+        headers=csrf_headers(client)
+    )
+    assert too_many.status_code == 400
+    assert too_many.json()["detail"] == "Maximo de 2 contas por importacao"
+
+    events = db_session.query(SecurityAuditLog).filter(
+        SecurityAuditLog.action == "account_import"
+    ).order_by(SecurityAuditLog.id).all()
+    assert [(event.success, event.reason) for event in events] == [
+        (False, "rows_rejected"),
+        (False, "rows_rejected"),
+        (True, None),
+    ]
+
+
+def test_admin_accounts_v2_bulk_status_update(client, db_session):
+    from app.db.models import CopyTradeAccount
+
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    create_admin(db_session, username="admin-v2-bulk-status")
+    login_v2(client, "admin-v2-bulk-status", "strong-password")
+
+    ids = []
+    for index in range(4):
+        payload = dict(account_payload(f"BULK-{index}"), status="approved" if index < 3 else "pending")
+        created = client.post("/api/v2/admin/accounts", json=payload, headers=csrf_headers(client))
+        assert created.status_code == 201
+        ids.append(created.json()["id"])
+
+    store = security_store.get_security_store()
+    store.set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
+    by_ids = client.patch(
+        "/api/v2/admin/accounts/status",
+        json={"status": "in_copy", "ids": [ids[0], ids[1], ids[3], 999999], "current_status": "approved"},
+        headers=csrf_headers(client)
+    )
+    assert by_ids.status_code == 200
+    assert by_ids.json() == {"status": "in_copy", "updated": 2, "ids": [ids[0], ids[1]]}
+    assert store.get_value(PUBLIC_STATS_CACHE_KEY) is None
+
+    # Accounts already in the target status are not reported as changed.
+    store.set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
+    unchanged = client.patch(
+        "/api/v2/admin/accounts/status",
+        json={"status": "in_copy", "ids": [ids[0], ids[1]]},
+        headers=csrf_headers(client)
+    )
+    assert unchanged.json() == {"status": "in_copy", "updated": 0, "ids": []}
+    assert store.get_value(PUBLIC_STATS_CACHE_KEY) == "{}"
+
+    by_filter = client.patch(
+        "/api/v2/admin/accounts/status",
+        json={"status": "suspended", "search": "BULK-2"},
+        headers=csrf_headers(client)
+    )
+    assert by_filter.json()["ids"] == [ids[2]]
+
+    db_session.expire_all()
+    statuses = {
+        account.id: account.status
+        for account in db_session.query(CopyTradeAccount).filter(CopyTradeAccount.id.in_(ids))
+    }
+    assert statuses == {ids[0]: "in_copy", ids[1]: "in_copy", ids[2]: "suspended", ids[3]: "pending"}
+
+    invalid = client.patch(
+        "/api/v2/admin/accounts/status",
+        json={"status": "sold", "ids": ids},
+        headers=csrf_headers(client)
+    )
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"].startswith("Status invalido")
+    invalid_filter = client.patch(
+        "/api/v2/admin/accounts/status",
+        json={"status": "expired", "current_status": "sold"},
+        headers=csrf_headers(client)
+    )
+    assert invalid_filter.status_code == 400
+
+    unscoped = client.patch(
+        "/api/v2/admin/accounts/status",
+        json={"status": "expired"},
+        headers=csrf_headers(client)
+    )
+    assert unscoped.status_code == 400
+    assert unscoped.json()["detail"] == "Informe ids ou um filtro"
+
+    empty_ids = client.patch(
+        "/api/v2/admin/accounts/status",
+        json={"status": "expired", "ids": []},
+        headers=csrf_headers(client)
+    )
+    assert empty_ids.status_code == 422
+
+    without_csrf = client.patch("/api/v2/admin/accounts/status", json={"status": "expired", "ids": ids})
+    assert without_csrf.status_code == 403
+
+    assert db_session.query(SecurityAuditLog).filter(
+        SecurityAuditLog.action == "account_status_bulk_update"
+    ).count() == 3
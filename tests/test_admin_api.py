@@ -7,6 +7,8 @@ from app.db.models import User
 from app.main import app
 from app.schemas.account import AccountCreate
 from app.schemas.user import UserCreate
+from app.services import security_store
+from app.services.stats_cache import PUBLIC_STATS_CACHE_KEY
 
 
 def build_account_payload(account_number: str, buyer_name: str, status: str = "pending") -> dict:
@@ -56,6 +58,8 @@ def create_non_admin_user(db_session, username: str = "basic") -> User:
 
 
 def test_admin_accounts_full_flow_with_errors(client, db_session):
+    store = security_store.InMemorySecurityStore()
+    security_store._store_cache = store
     admin = create_admin_user(db_session)
     app.dependency_overrides[accounts_api.require_admin] = lambda: admin
     try:
@@ -63,11 +67,13 @@ def test_admin_accounts_full_flow_with_errors(client, db_session):
         assert list_empty.status_code == 200
         assert list_empty.json() == []
 
+        store.set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
         create_resp = client.post(
             "/api/admin/accounts",
             json=build_account_payload("ACC-200", "Buyer One")
         )
         assert create_resp.status_code == 201
+        assert store.get_value(PUBLIC_STATS_CACHE_KEY) is None
         account_id = create_resp.json()["id"]
 
         duplicate = client.post(
@@ -98,6 +104,7 @@ def test_admin_accounts_full_flow_with_errors(client, db_session):
         assert update_conflict.status_code == 400
         assert update_conflict.json()["detail"] == "Numero da conta ja existe"
 
+        store.set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
         update_ok = client.put(
             f"/api/admin/accounts/{account_id}",
             json={"buyer_name": "Buyer Updated", "account_password": "new-pass"}
@@ -105,6 +112,7 @@ def test_admin_accounts_full_flow_with_errors(client, db_session):
         assert update_ok.status_code == 200
         assert update_ok.json()["buyer_name"] == "Buyer Updated"
         assert update_ok.json()["account_password"] == "********"
+        assert store.get_value(PUBLIC_STATS_CACHE_KEY) is None
 
         update_missing = client.put(
             "/api/admin/accounts/9999",
@@ -144,8 +152,10 @@ def test_admin_accounts_full_flow_with_errors(client, db_session):
         assert stats.json()["total_accounts"] == 2
         assert Decimal(stats.json()["total_revenue"]) == Decimal("300.00")
 
+        store.set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
         delete_ok = client.delete(f"/api/admin/accounts/{second_id}")
         assert delete_ok.status_code == 204
+        assert store.get_value(PUBLIC_STATS_CACHE_KEY) is None
 
         delete_missing = client.delete("/api/admin/accounts/9999")
         assert delete_missing.status_code == 404
@@ -0,0 +1,159 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import app.api.audit_v2 as audit_api
+from app.config import get_settings
+from app.core.pagination import decode_time_cursor, encode_time_cursor
+from app.crud import user as user_crud
+from app.db.models import SecurityAuditLog
+from app.schemas.user import UserCreate
+from app.services import security_store
+
+settings = get_settings()
+BASE_TIME = datetime(2026, 1, 10, 12, 0, 0)
+
+
+def create_user(db_session, username: str, is_admin: bool = True):
+    return user_crud.create_user(
+        db_session,
+        UserCreate(
+            username=username,
+            email=f"{username}@example.com",
+            password="strong-password",
+            is_admin=is_admin
+        )
+    )
+
+
+def login_v2(client, username: str):
+    response = client.post(
+        "/api/v2/auth/login",
+        json={"username": username, "password": "strong-password"}
+    )
+    assert response.status_code == 200
+
+
+def seed_logs(db_session, user_id: int) -> None:
+    rows = [
+        ("login", True, "10.0.0.1", BASE_TIME),
+        ("login", False, "10.0.0.9", BASE_TIME + timedelta(minutes=1)),
+        ("login", False, "10.0.0.9", BASE_TIME + timedelta(minutes=1)),
+        ("logout", True, "10.0.0.1", BASE_TIME + timedelta(minutes=2)),
+        ("login", False, "10.0.0.9", BASE_TIME + timedelta(minutes=3)),
+    ]
+    for action, success, ip, created_at in rows:
+        db_session.add(SecurityAuditLog(
+            user_id=user_id,
+            action=action,
+            success=success,
+            ip=ip,
+            target_type="user",
+            target_id=str(user_id),
+            created_at=created_at
+        ))
+    db_session.commit()
+
+
+def test_time_cursor_round_trip_and_validation():
+    cursor = encode_time_cursor(7, BASE_TIME)
+    assert decode_time_cursor(cursor) == (7, BASE_TIME)
+
+    for bad in ("garbage", encode_time_cursor(-1, BASE_TIME), "eyJpZCI6MX0"):
+        with pytest.raises(ValueError):
+            decode_time_cursor(bad)
+
+
+def test_audit_logs_keyset_pagination_and_filters(client, db_session):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    admin = create_user(db_session, "admin-audit-api")
+    seed_logs(db_session, admin.id)
+    login_v2(client, "admin-audit-api")
+    params = {"ip": "10.0.0.9", "action": "login", "success": "false", "limit": 2}
+
+    first = client.get("/api/v2/admin/audit", params=params)
+    assert first.status_code == 200
+    first_page = first.json()
+    assert [row["created_at"][:19] for row in first_page] == [
+        "2026-01-10T12:03:00",
+        "2026-01-10T12:01:00",
+    ]
+    next_cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/api/v2/admin/audit", params={**params, "cursor": next_cursor})
+    assert second.status_code == 200
+    assert "X-Next-Cursor" not in second.headers
+    second_page = second.json()
+    assert len(second_page) == 1
+    # Rows sharing a timestamp are split across pages by id without repeats.
+    assert {row["id"] for row in first_page}.isdisjoint(row["id"] for row in second_page)
+
+    window = client.get(
+        "/api/v2/admin/audit",
+        params={
+            "user_id": admin.id,
+            "target_type": "user",
+            "target_id": str(admin.id),
+            "since": "2026-01-10T12:01:00",
+            "until": "2026-01-10T12:03:00",
+        }
+    )
+    assert [row["action"] for row in window.json()] == ["logout", "login", "login"]
+
+    invalid = client.get("/api/v2/admin/audit", params={"cursor": "garbage"})
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"] == "Cursor invalido"
+
+
+def test_audit_logs_ndjson_export_streams_all_batches(client, db_session, monkeypatch):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    admin = create_user(db_session, "admin-audit-export")
+    seed_logs(db_session, admin.id)
+    login_v2(client, "admin-audit-export")
+    monkeypatch.setattr(audit_api, "EXPORT_BATCH_SIZE", 2)
+
+    commits = []
+
+    def _count_commit(session):
+        commits.append(session)
+
+    event.listen(Session, "after_commit", _count_commit)
+    try:
+        response = client.get(
+            "/api/v2/admin/audit",
+            params={"format": "ndjson", "user_id": admin.id}
+        )
+    finally:
+        event.remove(Session, "after_commit", _count_commit)
+    assert response.status_code == 200
+    # The export event plus one commit per batch: no transaction spans the stream.
+    assert len(commits) >= 1 + 4
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    # Seeded rows plus the login and the export itself, newest first.
+    assert len(rows) == 7
+    assert rows[0]["action"] == "audit_log_export"
+    assert rows[-1]["created_at"][:19] == "2026-01-10T12:00:00"
+
+    exported = db_session.query(SecurityAuditLog).filter(
+        SecurityAuditLog.action == "audit_log_export"
+    ).one()
+    assert exported.user_id == admin.id
+
+    empty = client.get(
+        "/api/v2/admin/audit",
+        params={"format": "ndjson", "action": "missing"}
+    )
+    assert empty.text == ""
+
+
+def test_audit_logs_require_admin(client, db_session):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    create_user(db_session, "viewer-audit-api", is_admin=False)
+    login_v2(client, "viewer-audit-api")
+
+    response = client.get("/api/v2/admin/audit")
+    assert response.status_code == 403
@@ -0,0 +1,166 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.jobs.audit_retention as retention_module
+from app.db.database import Base
+from app.db.models import SecurityAuditLog
+
+
+def test_partition_helpers():
+    assert retention_module.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert retention_module.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert retention_module.partition_name(date(2026, 3, 1)) == "security_audit_logs_y2026m03"
+    assert retention_module.partition_month("security_audit_logs_y2026m03") == date(2026, 3, 1)
+    assert retention_module.partition_month("security_audit_logs_default") is None
+    assert retention_module.retention_cutoff(date(2026, 10, 17), 12) == date(2025, 10, 1)
+    assert retention_module.expired_partitions(
+        [
+            "security_audit_logs_y2025m10",
+            "security_audit_logs_default",
+            "security_audit_logs_y2025m09",
+            "security_audit_logs_y2025m08",
+        ],
+        date(2025, 10, 1)
+    ) == ["security_audit_logs_y2025m08", "security_audit_logs_y2025m09"]
+
+
+def test_run_retention_deletes_expired_rows_without_partitions(tmp_path, monkeypatch, capsys):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        for created_at in (datetime(2024, 1, 5), datetime(2025, 9, 30), datetime(2025, 10, 1)):
+            db.add(SecurityAuditLog(
+                action="auth_login",
+                success=True,
+                created_at=created_at.replace(tzinfo=timezone.utc)
+            ))
+        db.commit()
+
+    report = retention_module.run_retention(engine, retention_months=12, today=date(2026, 10, 17))
+    assert report.cutoff == date(2025, 10, 1)
+    assert report.deleted_rows == 2
+    assert report.ensured == []
+    default = retention_module.run_retention(engine, today=date(2026, 10, 17))
+    assert default.cutoff == retention_module.retention_cutoff(
+        date(2026, 10, 17),
+        retention_module.settings.audit_retention_months
+    )
+
+    monkeypatch.setattr(retention_module.database, "engine", engine)
+    assert retention_module.main(["--retention-months", "1"]) == 0
+    assert "deleted_rows=1" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"retention_months": 0},
+    {"retention_months": -1},
+    {"retention_months": 12, "months_ahead": 0},
+])
+def test_run_retention_refuses_values_that_reach_the_current_month(kwargs):
+    with pytest.raises(ValueError):
+        retention_module.run_retention(today=date(2026, 10, 17), **kwargs)
+
+
+@pytest.mark.parametrize("option", ["--retention-months", "--months-ahead"])
+def test_retention_cli_rejects_non_positive_months(option, capsys):
+    with pytest.raises(SystemExit) as exc:
+        retention_module.main([option, "-1"])
+    assert exc.value.code == 2
+    assert "must be >= 1" in capsys.readouterr().err
+
+
+class FakeResult(list):
+    rowcount = 3
+
+    def scalar(self):
+        return self[0] if self else None
+
+
+class FakeConnection:
+    def __init__(self, partitions, crowded_months=()):
+        self.dialect = type("Dialect", (), {"name": "postgresql"})()
+        self.partitions = partitions
+        self.crowded_months = set(crowded_months)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "pg_inherits" in sql:
+            return FakeResult([(name,) for name in self.partitions])
+        if sql.startswith("SELECT EXISTS"):
+            return FakeResult([params["start"] in self.crowded_months])
+        return FakeResult()
+
+
+class FakeEngine:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def begin(self):
+        engine = self
+
+        class _Begin:
+            def __enter__(self):
+                return engine.connection
+
+            def __exit__(self, *exc):
+                return None
+
+        return _Begin()
+
+
+def test_run_retention_rolls_partitions_on_postgres():
+    engine = FakeEngine(FakeConnection([
+        "security_audit_logs_default",
+        "security_audit_logs_y2025m09",
+        "security_audit_logs_y2025m10",
+        "security_audit_logs_y2026m10",
+    ]))
+    report = retention_module.run_retention(
+        engine,
+        retention_months=12,
+        months_ahead=1,
+        today=date(2026, 10, 17)
+    )
+
+    assert report.ensured == ["security_audit_logs_y2026m10", "security_audit_logs_y2026m11"]
+    assert report.dropped == ["security_audit_logs_y2025m09"]
+    assert report.moved_rows == 0
+    assert report.deleted_rows == 3
+    statements = engine.connection.statements
+    creates = [sql for sql in statements if sql.startswith("CREATE TABLE")]
+    assert len(creates) == 1
+    assert "PARTITION OF security_audit_logs FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')" in creates[0]
+    assert not any("DETACH" in sql for sql in statements)
+    assert "DROP TABLE IF EXISTS security_audit_logs_y2025m09" in statements
+
+
+def test_run_retention_moves_default_partition_rows_before_creating_a_partition():
+    engine = FakeEngine(FakeConnection(
+        ["security_audit_logs_default", "security_audit_logs_y2026m09"],
+        crowded_months=[date(2026, 10, 1)]
+    ))
+    report = retention_module.run_retention(
+        engine,
+        retention_months=12,
+        months_ahead=1,
+        today=date(2026, 10, 17)
+    )
+
+    assert report.ensured == ["security_audit_logs_y2026m10", "security_audit_logs_y2026m11"]
+    assert report.moved_rows == 3
+    ddl = [
+        sql for sql in engine.connection.statements
+        if sql.startswith(("ALTER", "CREATE", "WITH"))
+    ]
+    assert ddl[0] == "ALTER TABLE security_audit_logs DETACH PARTITION security_audit_logs_default"
+    assert "security_audit_logs_y2026m10 PARTITION OF" in ddl[1]
+    assert "security_audit_logs_y2026m11 PARTITION OF" in ddl[2]
+    assert ddl[3].startswith("WITH moved AS (DELETE FROM security_audit_logs_default")
+    assert ddl[3].endswith("INSERT INTO security_audit_logs_y2026m10 SELECT * FROM moved")
+    assert ddl[4] == "ALTER TABLE security_audit_logs ATTACH PARTITION security_audit_logs_default DEFAULT"
+    assert len(ddl) == 5
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app.crud import user as user_crud
+from app.db.database import get_async_db
+from app.db.models import SecurityAuditLog
+from app.main import app
+from app.schemas.user import UserCreate
+from app.services import audit, security_store
+
+
+def _event(index: int) -> dict:
+    return {
+        "action": "test_event",
+        "success": True,
+        "target_id": str(index),
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    }
+
+
+def test_writer_batches_by_size_and_drains_on_stop(db_session, async_session_factory):
+    async def _exercise():
+        writer = audit.AuditLogWriter(
+            async_session_factory,
+            max_queue=2,
+            batch_size=3,
+            flush_interval_seconds=5
+        )
+        await writer.stop()
+        writer.start()
+        for index in range(7):
+            await writer.submit(_event(index))
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(_exercise())
+    assert stats["written"] == 7
+    assert stats["failed"] == 0
+    assert stats["queued"] == 0
+    assert stats["batches"] >= 3
+
+    rows = db_session.query(SecurityAuditLog).order_by(SecurityAuditLog.id).all()
+    assert [row.target_id for row in rows] == [str(index) for index in range(7)]
+    assert rows[0].created_at.year == 2024
+
+
+def test_writer_flushes_partial_batch_after_interval(db_session, async_session_factory):
+    async def _exercise():
+        writer = audit.AuditLogWriter(
+            async_session_factory,
+            max_queue=10,
+            batch_size=100,
+            flush_interval_seconds=0.05
+        )
+        writer.start()
+        await writer.submit(_event(1))
+        for _ in range(100):
+            if writer.written:
+                break
+            await asyncio.sleep(0.01)
+        written_before_stop = writer.written
+        await writer.stop()
+        return written_before_stop
+
+    assert asyncio.run(_exercise()) == 1
+    assert db_session.query(SecurityAuditLog).count() == 1
+
+
+def test_writer_counts_failed_batches():
+    def _broken_factory():
+        raise RuntimeError("database down")
+
+    async def _exercise():
+        writer = audit.AuditLogWriter(
+            _broken_factory,
+            max_queue=10,
+            batch_size=10,
+            flush_interval_seconds=0
+        )
+        writer.start()
+        await writer.submit(_event(1))
+        await asyncio.sleep(0.01)
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(_exercise())
+    assert stats["failed"] == 1
+    assert stats["written"] == 0
+
+
+def test_app_routes_audit_through_writer_and_flush_on_shutdown(
+    db_session,
+    async_session_factory,
+    monkeypatch
+):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    monkeypatch.setattr(audit.settings, "audit_writer_enabled", True)
+    monkeypatch.setattr(audit, "AsyncSessionLocal", async_session_factory)
+    user_crud.create_user(
+        db_session,
+        UserCreate(
+            username="audited-admin",
+            email="audited-admin@example.com",
+            password="strong-password",
+            is_admin=True
+        )
+    )
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        with TestClient(app) as client:
+            assert audit.start_audit_writer() is audit.get_audit_writer()
+            login = client.post(
+                "/api/v2/auth/login",
+                json={"username": "audited-admin", "password": "strong-password"}
+            )
+            assert login.status_code == 200
+            metrics = client.get("/api/v2/admin/metrics").json()
+            assert metrics["audit_writer"]["enabled"] is True
+    finally:
+        app.dependency_overrides.clear()
+
+    assert audit.get_audit_writer() is None
+    actions = [row.action for row in db_session.query(SecurityAuditLog).all()]
+    assert actions == ["auth_login"]
+
+    monkeypatch.setattr(audit.settings, "audit_writer_enabled", False)
+    assert audit.start_audit_writer() is None
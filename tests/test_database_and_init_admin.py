@@ -1,3 +1,4 @@
+import asyncio
 from types import SimpleNamespace
 
 import app.db.database as database_module
@@ -111,3 +112,40 @@ def test_init_admin_handles_exception(monkeypatch, capsys):
 
     assert events["closed"] is True
     assert "Error creating admin user" in output
+
+
+def test_get_async_db_yields_session_and_closes(monkeypatch):
+    events = {"closed": False}
+
+    class FakeAsyncSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            events["closed"] = True
+
+    monkeypatch.setattr(database_module, "AsyncSessionLocal", lambda: FakeAsyncSession())
+
+    async def _consume():
+        gen = database_module.get_async_db()
+        yielded = await gen.__anext__()
+        assert isinstance(yielded, FakeAsyncSession)
+        await gen.aclose()
+
+    asyncio.run(_consume())
+    assert events["closed"] is True
+
+
+def test_get_async_database_url_maps_sync_drivers():
+    assert database_module.get_async_database_url(
+        "postgresql://user:pass@db:5432/copytrade"
+    ) == "postgresql+asyncpg://user:pass@db:5432/copytrade"
+    assert database_module.get_async_database_url(
+        "postgresql+psycopg2://user:pass@db/copytrade"
+    ) == "postgresql+asyncpg://user:pass@db/copytrade"
+    assert database_module.get_async_database_url(
+        "sqlite:///./copytrade.db"
+    ) == "sqlite+aiosqlite:///./copytrade.db"
+    assert database_module.get_async_database_url(
+        "postgresql+asyncpg://db/copytrade"
+    ) == "postgresql+asyncpg://db/copytrade"
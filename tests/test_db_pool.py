@@ -0,0 +1,75 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.config import Settings, get_settings
+from app.db.pool import (
+    PoolWaitStats,
+    describe_pool,
+    instrumented_pool_class,
+    pool_engine_options,
+)
+
+
+def test_pool_engine_options_only_apply_to_server_databases():
+    wait_stats = PoolWaitStats()
+    sqlite_settings = get_settings().model_copy(update={"database_url": "sqlite:///./x.db"})
+    assert pool_engine_options(sqlite_settings, QueuePool, wait_stats) == {}
+
+    postgres_settings = get_settings().model_copy(
+        update={
+            "database_url": "postgresql://user:pass@db/app",
+            "db_pool_size": 20,
+            "db_max_overflow": 5,
+            "db_pool_recycle_seconds": 600,
+        }
+    )
+    options = pool_engine_options(postgres_settings, QueuePool, wait_stats)
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 5
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is True
+    assert issubclass(options["poolclass"], QueuePool)
+    assert options["poolclass"].wait_stats is wait_stats
+
+
+def test_instrumented_pool_reports_usage_and_wait_time(tmp_path):
+    wait_stats = PoolWaitStats()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented_pool_class(QueuePool, wait_stats),
+        pool_size=2,
+        max_overflow=1,
+        pool_pre_ping=True,
+    )
+    assert describe_pool(engine.pool)["checkouts"] == 0
+
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        busy = describe_pool(engine.pool)
+        assert busy["pool"] == "InstrumentedQueuePool"
+        assert busy["size"] == 2
+        assert busy["checked_out"] == 2
+
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    stats = describe_pool(engine.pool)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 3
+    assert stats["max_wait_ms"] >= stats["avg_wait_ms"] >= 0
+
+
+def test_describe_pool_without_queue_pool_reports_class_only():
+    engine = create_engine("sqlite://")
+    assert describe_pool(engine.pool) == {"pool": "SingletonThreadPool"}
+
+
+def test_pool_settings_are_validated():
+    with pytest.raises(ValidationError):
+        Settings(db_pool_size=0)
+    with pytest.raises(ValidationError):
+        Settings(db_max_overflow=-1)
+    assert Settings(db_max_overflow=0).db_max_overflow == 0
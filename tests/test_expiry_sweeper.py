@@ -0,0 +1,200 @@
+import asyncio
+from datetime import date, timedelta
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy import inspect
+
+from app.db.models import CopyTradeAccount
+from app.services import expiry_sweeper, security_store
+from app.services.stats_cache import PUBLIC_STATS_CACHE_KEY
+
+TODAY = date(2026, 10, 17)
+
+
+@pytest.fixture(autouse=True)
+def in_memory_store():
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    yield
+    security_store._store_cache = None
+
+
+def _rows(accounts: dict[str, tuple[str, date | None]]) -> list[dict]:
+    return [
+        {
+            "account_number": account_number,
+            "purchase_date": TODAY - timedelta(days=60),
+            "expiry_date": expiry_date,
+            "status": status,
+        }
+        for account_number, (status, expiry_date) in accounts.items()
+    ]
+
+
+def _statuses(session_factory) -> dict[str, str]:
+    with session_factory() as db:
+        return dict(db.query(CopyTradeAccount.account_number, CopyTradeAccount.status))
+
+
+def test_sweep_expires_due_accounts_in_bounded_batches(session_factory, seed_accounts):
+    yesterday = TODAY - timedelta(days=1)
+    seed_accounts(*_rows({
+        "due-pending": ("pending", yesterday),
+        "due-approved": ("approved", yesterday),
+        "due-in-copy": ("in_copy", TODAY - timedelta(days=30)),
+        "suspended": ("suspended", yesterday),
+        "already-expired": ("expired", yesterday),
+        "expires-today": ("approved", TODAY),
+        "future": ("approved", TODAY + timedelta(days=1)),
+        "no-expiry": ("approved", None),
+    }))
+
+    report = expiry_sweeper.sweep_expired_accounts(session_factory, today=TODAY, batch_size=2)
+    assert report.transitioned == 3
+    assert report.batches == 2
+    assert _statuses(session_factory) == {
+        "due-pending": "expired",
+        "due-approved": "expired",
+        "due-in-copy": "expired",
+        "suspended": "suspended",
+        "already-expired": "expired",
+        "expires-today": "approved",
+        "future": "approved",
+        "no-expiry": "approved",
+    }
+
+    rerun = expiry_sweeper.sweep_expired_accounts(session_factory, today=TODAY)
+    assert (rerun.transitioned, rerun.batches) == (0, 0)
+
+    with session_factory() as db:
+        indexes = {index["name"]: index["column_names"] for index in inspect(db.get_bind()).get_indexes("copy_trade_accounts")}
+    assert indexes["ix_copy_trade_accounts_expiry_date_status"] == ["expiry_date", "status"]
+
+
+def test_only_the_lease_holder_sweeps(session_factory, seed_accounts):
+    seed_accounts(*_rows({"due": ("approved", date.today() - timedelta(days=1))}))
+    store = security_store.get_security_store()
+    store.set_with_ttl(PUBLIC_STATS_CACHE_KEY, "{}", 60)
+
+    leader = expiry_sweeper.ExpirySweeper(session_factory, interval_seconds=60, batch_size=10, owner="a")
+    follower = expiry_sweeper.ExpirySweeper(session_factory, interval_seconds=60, batch_size=10, owner="b")
+
+    async def _flow():
+        first = await leader.run_once()
+        skipped = await follower.run_once()
+        renewed = await leader.run_once()
+        await leader.stop()
+        taken_over = await follower.run_once()
+        return first, skipped, renewed, taken_over
+
+    first, skipped, renewed, taken_over = asyncio.run(_flow())
+    assert first.transitioned == 1
+    assert skipped is None
+    assert renewed.transitioned == 0
+    assert taken_over is not None
+    assert store.get_value(PUBLIC_STATS_CACHE_KEY) is None
+    assert _statuses(session_factory) == {"due": "expired"}
+
+    stats = leader.stats()
+    assert stats["runs"] == 2
+    assert stats["is_leader"] is False
+    assert stats["transitioned_total"] == 1
+    assert [run["transitioned"] for run in stats["recent_runs"]] == [1, 0]
+    assert follower.stats()["skipped_not_leader"] == 1
+    assert follower.stats()["is_leader"] is True
+
+
+def test_sweeper_lifecycle_and_failures(session_factory, monkeypatch):
+    async def _exercise():
+        await expiry_sweeper.stop_expiry_sweeper()
+        assert expiry_sweeper.start_expiry_sweeper() is None
+
+        monkeypatch.setattr(expiry_sweeper.settings, "expiry_sweeper_enabled", True)
+        sweeper = expiry_sweeper.start_expiry_sweeper(session_factory)
+        assert expiry_sweeper.start_expiry_sweeper() is sweeper
+        assert expiry_sweeper.get_expiry_sweeper() is sweeper
+        for _ in range(100):
+            if sweeper.runs:
+                break
+            await asyncio.sleep(0.01)
+        await expiry_sweeper.stop_expiry_sweeper()
+        assert expiry_sweeper.get_expiry_sweeper() is None
+
+        failing = expiry_sweeper.ExpirySweeper(session_factory, interval_seconds=0, batch_size=10)
+
+        async def _boom():
+            raise RuntimeError("database down")
+
+        monkeypatch.setattr(failing, "run_once", _boom)
+        failing.start()
+        for _ in range(100):
+            if failing.failures >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await failing.stop()
+        await failing.stop()
+        return sweeper, failing
+
+    sweeper, failing = asyncio.run(_exercise())
+    assert sweeper.runs == 1
+    assert failing.failures >= 2
+
+
+def test_store_leases_across_backends(monkeypatch):
+    in_memory = security_store.InMemorySecurityStore()
+    assert in_memory.acquire_lease("lease", "a", 60) is True
+    assert in_memory.acquire_lease("lease", "b", 60) is False
+    in_memory.release_lease("lease", "b")
+    assert in_memory.acquire_lease("lease", "a", 60) is True
+    in_memory.release_lease("lease", "a")
+    assert in_memory.acquire_lease("lease", "b", 60) is True
+
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    sync_store = security_store.RedisSecurityStore(redis_client)
+    assert sync_store.acquire_lease("lease", "a", 60) is True
+    assert sync_store.acquire_lease("lease", "a", 120) is True
+    assert redis_client.ttl("lease") > 60
+    assert sync_store.acquire_lease("lease", "b", 60) is False
+    sync_store.release_lease("lease", "b")
+    assert redis_client.get("lease") == "a"
+    sync_store.release_lease("lease", "a")
+    assert redis_client.get("lease") is None
+
+    async def _async_leases():
+        store = security_store.AsyncRedisSecurityStore(fakeredis.aioredis.FakeRedis(decode_responses=True))
+        results = [
+            await store.acquire_lease("lease", "a", 60),
+            await store.acquire_lease("lease", "b", 60),
+        ]
+        await store.release_lease("lease", "a")
+        results.append(await store.acquire_lease("lease", "b", 60))
+        wrapped = security_store.AsyncInMemorySecurityStore(security_store.InMemorySecurityStore())
+        results.append(await wrapped.acquire_lease("lease", "a", 60))
+        await wrapped.release_lease("lease", "a")
+        results.append(await wrapped.acquire_lease("lease", "b", 60))
+        return results
+
+    assert asyncio.run(_async_leases()) == [True, False, True, True, True]
+
+    def _broken(*args, **kwargs):
+        raise RedisError("down")
+
+    async def _broken_async(*args, **kwargs):
+        raise RedisError("down")
+
+    monkeypatch.setattr(sync_store, "_lease_acquire", _broken)
+    monkeypatch.setattr(sync_store, "_lease_release", _broken)
+    assert sync_store.acquire_lease("lease", "a", 60) is False
+    sync_store.release_lease("lease", "a")
+
+    async def _broken_async_leases():
+        store = security_store.AsyncRedisSecurityStore(fakeredis.aioredis.FakeRedis(decode_responses=True))
+        monkeypatch.setattr(store, "_lease_acquire", _broken_async)
+        monkeypatch.setattr(store, "_lease_release", _broken_async)
+        acquired = await store.acquire_lease("lease", "a", 60)
+        await store.release_lease("lease", "a")
+        return acquired
+
+    assert asyncio.run(_broken_async_leases()) is False
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import get_settings
+from app.core.security import get_password_hash, verify_password
+from app.crud import user as user_crud
+from app.schemas.user import UserCreate
+from app.services import password_hashing, security_store
+
+
+def test_password_pool_runs_work_off_loop_and_tracks_stats():
+    pool = password_hashing.PasswordHashPool(max_workers=2, max_queue=1)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        worker_thread = await pool.run(threading.get_ident)
+        assert worker_thread != loop_thread
+
+    asyncio.run(scenario())
+    assert pool.stats() == {
+        "max_workers": 2,
+        "max_queue": 1,
+        "in_flight": 0,
+        "queued": 0,
+        "completed": 1,
+        "rejected": 0,
+    }
+
+
+def test_password_pool_rejects_when_saturated():
+    pool = password_hashing.PasswordHashPool(max_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(pool.run(gate.wait, 5))
+        waiting = asyncio.create_task(pool.run(gate.wait, 5))
+        await asyncio.sleep(0)
+        stats = pool.stats()
+        assert stats["in_flight"] == 1
+        assert stats["queued"] == 1
+
+        with pytest.raises(HTTPException) as exc:
+            await pool.run(lambda: True)
+        assert exc.value.status_code == 503
+        assert exc.value.headers == {"Retry-After": "1"}
+
+        gate.set()
+        assert await running is True
+        assert await waiting is True
+
+    asyncio.run(scenario())
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["completed"] == 2
+
+
+def test_verify_password_async_uses_shared_pool(monkeypatch):
+    monkeypatch.setattr(password_hashing, "_pool_cache", None)
+    hashed = get_password_hash("pool-secret")
+    assert asyncio.run(password_hashing.verify_password_async("pool-secret", hashed)) is True
+    assert password_hashing.get_password_pool() is password_hashing.get_password_pool()
+    assert password_hashing.get_password_pool().stats()["completed"] == 1
+
+
+def test_admin_metrics_endpoint_exposes_password_pool(client, db_session):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    settings = get_settings()
+    user_crud.create_user(
+        db_session,
+        UserCreate(
+            username="metrics-admin",
+            email="metrics-admin@example.com",
+            password="strong-password",
+            is_admin=True
+        )
+    )
+    login = client.post(
+        "/api/v2/auth/login",
+        json={"username": "metrics-admin", "password": "strong-password"}
+    )
+    assert login.status_code == 200
+
+    metrics = client.get("/api/v2/admin/metrics")
+    assert metrics.status_code == 200
+    pool_stats = metrics.json()["password_hashing"]
+    assert pool_stats["max_workers"] == settings.password_hash_workers
+    assert pool_stats["completed"] >= 1
+    database_stats = metrics.json()["database"]
+    assert set(database_stats) == {"sync", "async"}
+    assert "pool" in database_stats["sync"]
+
+
+def test_v1_login_sends_only_the_bcrypt_check_to_the_pool(client, db_session, monkeypatch):
+    user_crud.create_user(
+        db_session,
+        UserCreate(
+            username="pool-v1-user",
+            email="pool-v1-user@example.com",
+            password="strong-password"
+        )
+    )
+    pool = password_hashing.PasswordHashPool(max_workers=1, max_queue=1)
+    submitted = []
+    run = pool.run
+
+    async def _spy(fn, *args):
+        submitted.append(fn)
+        return await run(fn, *args)
+
+    monkeypatch.setattr(pool, "run", _spy)
+    monkeypatch.setattr(password_hashing, "_pool_cache", pool)
+
+    ok = client.post("/api/auth/login", json={"username": "pool-v1-user", "password": "strong-password"})
+    assert ok.status_code == 200
+    bad = client.post("/api/auth/login", json={"username": "pool-v1-user", "password": "wrong-password"})
+    assert bad.status_code == 401
+    missing = client.post("/api/auth/login", json={"username": "nobody", "password": "wrong-password"})
+    assert missing.status_code == 401
+    assert submitted == [verify_password, verify_password]
@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.crud import user as user_crud
+from app.db.models import User
+from app.schemas.user import UserCreate
+from app.services import principal_cache, security_store
+
+
+def _create_user(db_session, username: str, is_admin: bool = True) -> User:
+    return user_crud.create_user(
+        db_session,
+        UserCreate(
+            username=username,
+            email=f"{username}@example.com",
+            password="strong-password",
+            is_admin=is_admin
+        )
+    )
+
+
+def _login(client, username: str) -> None:
+    login = client.post(
+        "/api/v2/auth/login",
+        json={"username": username, "password": "strong-password"}
+    )
+    assert login.status_code == 200
+
+
+def test_cached_principal_skips_user_query_until_invalidated(client, db_session):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    user = _create_user(db_session, "cached-admin")
+    _login(client, "cached-admin")
+
+    user_queries = []
+
+    def _capture(conn, cursor, statement, *args):
+        if "FROM users" in statement:
+            user_queries.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _capture)
+    try:
+        assert client.get("/api/v2/auth/me").status_code == 200
+        queries_after_first = len(user_queries)
+        assert queries_after_first > 0
+        me = client.get("/api/v2/auth/me")
+        assert me.status_code == 200
+        assert me.json()["username"] == "cached-admin"
+        assert me.json()["is_admin"] is True
+        assert len(user_queries) == queries_after_first
+    finally:
+        event.remove(Engine, "before_cursor_execute", _capture)
+
+    assert client.get("/api/v2/admin/stats").status_code == 200
+    user_crud.update_user_flags(db_session, user, is_admin=False)
+    assert client.get("/api/v2/admin/stats").status_code == 403
+
+    user_crud.update_user_flags(db_session, user, is_active=False)
+    inactive = client.get("/api/v2/auth/me")
+    assert inactive.status_code == 401
+    assert inactive.json()["detail"] == "Usuario inativo"
+
+
+def test_principal_cache_tiers_and_expiry(db_session, monkeypatch):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    user = _create_user(db_session, "tiered-user", is_admin=False)
+
+    asyncio.run(principal_cache.cache_principal(user))
+    cached = asyncio.run(principal_cache.get_cached_principal("tiered-user"))
+    assert cached.id == user.id
+    assert cached.is_admin is False
+    assert cached.created_at is not None
+    assert cached.hashed_password is None
+
+    # Another worker only shares the store tier.
+    principal_cache.clear_local_principals()
+    assert asyncio.run(principal_cache.get_cached_principal("tiered-user")).id == user.id
+
+    now = principal_cache.time.monotonic()
+    monkeypatch.setattr(principal_cache.time, "monotonic", lambda: now + 3600)
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    assert asyncio.run(principal_cache.get_cached_principal("tiered-user")) is None
+
+    user_crud.update_user_flags(db_session, user, is_active=False)
+    asyncio.run(principal_cache.cache_principal(user))
+    assert asyncio.run(principal_cache.get_cached_principal("tiered-user")) is None
+
+
+def test_principal_cache_local_tier_is_bounded(db_session, monkeypatch):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    monkeypatch.setattr(principal_cache, "LOCAL_CACHE_MAX_ENTRIES", 1)
+    first = _create_user(db_session, "first-user", is_admin=False)
+    second = _create_user(db_session, "second-user", is_admin=False)
+    first.created_at = None
+
+    asyncio.run(principal_cache.cache_principal(first))
+    asyncio.run(principal_cache.cache_principal(second))
+    assert set(principal_cache._local_cache) == {"second-user"}
+    assert asyncio.run(principal_cache.get_cached_principal("first-user")).created_at is None
+
+
+def test_manage_user_cli_changes_flags_and_password_through_the_cache_hook(
+    db_session,
+    monkeypatch,
+    capsys
+):
+    from app.jobs import manage_user
+
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    user = _create_user(db_session, "managed-user")
+    monkeypatch.setattr(manage_user, "SessionLocal", lambda: contextlib.nullcontext(db_session))
+    invalidated = []
+    monkeypatch.setattr(user_crud, "publish_principal_invalidation", invalidated.append)
+
+    assert manage_user.main(["managed-user", "--deactivate", "--no-admin"]) == 0
+    assert "active=False admin=False" in capsys.readouterr().out
+    assert invalidated == ["managed-user"]
+
+    old_hash = user.hashed_password
+    monkeypatch.setattr(manage_user.getpass, "getpass", lambda prompt: "another-password")
+    assert manage_user.main(["managed-user", "--reset-password", "--activate"]) == 0
+    db_session.refresh(user)
+    assert user.hashed_password != old_hash
+    assert user.is_active is True
+    assert invalidated == ["managed-user"] * 3
+
+    monkeypatch.setattr(manage_user.getpass, "getpass", lambda prompt: "")
+    assert manage_user.main(["managed-user", "--reset-password"]) == 1
+    assert manage_user.main(["ghost", "--admin"]) == 2
+    with pytest.raises(SystemExit):
+        manage_user.main(["managed-user"])
@@ -5,6 +5,7 @@ from app.crud import account as account_crud
 from app.crud import user as user_crud
 from app.schemas.account import AccountCreate
 from app.schemas.user import UserCreate
+from app.services import security_store
 
 
 def build_account_payload(account_number: str, buyer_name: str, status: str) -> AccountCreate:
@@ -40,6 +41,7 @@ def test_health_and_root_endpoints(client):
 
 
 def test_public_stats_endpoint_returns_aggregated_counts(client, db_session):
+    security_store._store_cache = security_store.InMemorySecurityStore()
     admin = user_crud.create_user(
         db_session,
         UserCreate(
@@ -70,3 +72,74 @@ def test_public_stats_endpoint_returns_aggregated_counts(client, db_session):
         "expired": 0,
         "suspended": 0
     }
+
+
+def test_public_stats_endpoint_is_cached_with_http_validators(client, db_session):
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    admin = user_crud.create_user(
+        db_session,
+        UserCreate(
+            username="admin",
+            email="admin@example.com",
+            password="strong-password",
+            is_admin=True
+        )
+    )
+
+    first = client.get("/api/public/stats")
+    assert first.status_code == 200
+    assert first.json()["total_accounts"] == 0
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "public, max-age=30"
+
+    # New rows are not visible until the cached payload expires.
+    account_crud.create_account(
+        db_session,
+        build_account_payload("ACC-201", "Buyer 201", "pending"),
+        admin.id
+    )
+    cached = client.get("/api/public/stats")
+    assert cached.json()["total_accounts"] == 0
+    assert cached.headers["ETag"] == etag
+
+    not_modified = client.get("/api/public/stats", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+
+    weak = client.get("/api/public/stats", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert weak.status_code == 304
+    wildcard = client.get("/api/public/stats", headers={"If-None-Match": "*"})
+    assert wildcard.status_code == 304
+    mismatch = client.get("/api/public/stats", headers={"If-None-Match": '"other"'})
+    assert mismatch.status_code == 200
+
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    refreshed = client.get("/api/public/stats", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["total_accounts"] == 1
+    assert refreshed.headers["ETag"] != etag
+
+
+def test_public_stats_misses_share_one_query():
+    import asyncio
+
+    from app.services import stats_cache
+
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    queries = []
+
+    class SlowSession:
+        async def run_sync(self, fn):
+            queries.append(fn)
+            await asyncio.sleep(0.01)
+            return {"total_accounts": 5}
+
+    async def burst():
+        return await asyncio.gather(*(
+            stats_cache.get_public_stats_payload(SlowSession()) for _ in range(5)
+        ))
+
+    payloads = asyncio.run(burst())
+    assert payloads == ['{"total_accounts":5}'] * 5
+    assert queries == [stats_cache.get_stats]
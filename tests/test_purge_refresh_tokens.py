@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.jobs.purge_refresh_tokens as purge_module
+from app.db.models import RefreshToken
+
+NOW = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _seed(session_factory, user_id: int, now: datetime = NOW) -> None:
+    rows = {
+        "live": (now + timedelta(days=5), None),
+        "expired-old": (now - timedelta(days=30), None),
+        "revoked-old": (now + timedelta(days=1), now - timedelta(days=10)),
+        "expired-recent": (now - timedelta(days=1), None),
+        "revoked-recent": (now + timedelta(days=1), now - timedelta(days=2)),
+        "both-old": (now - timedelta(days=20), now - timedelta(days=25)),
+    }
+    with session_factory() as db:
+        for name, (expires_at, revoked_at) in rows.items():
+            db.add(RefreshToken(
+                user_id=user_id,
+                session_id=name,
+                token_hash=f"hash-{name}",
+                csrf_token="csrf",
+                expires_at=expires_at,
+                revoked_at=revoked_at
+            ))
+        db.commit()
+
+
+def _remaining(session_factory) -> set[str]:
+    with session_factory() as db:
+        return {row.session_id for row in db.query(RefreshToken).all()}
+
+
+def test_purge_deletes_dead_rows_past_grace_in_batches(session_factory, create_user, monkeypatch):
+    _seed(session_factory, create_user("purge-user").id)
+    sleeps = []
+    monkeypatch.setattr(purge_module.time, "sleep", sleeps.append)
+    reports = []
+
+    report = purge_module.purge_refresh_tokens(
+        session_factory,
+        grace_days=7,
+        batch_size=2,
+        pause_seconds=0.05,
+        now=NOW,
+        progress=lambda current: reports.append(current.deleted)
+    )
+
+    assert report.cutoff == NOW - timedelta(days=7)
+    assert report.deleted == 3
+    assert report.batches == 2
+    assert reports == [2, 3]
+    assert sleeps == [0.05, 0.05]
+    assert _remaining(session_factory) == {"live", "expired-recent", "revoked-recent"}
+
+    rerun = purge_module.purge_refresh_tokens(session_factory, grace_days=7, now=NOW)
+    assert rerun.deleted == 0
+    assert rerun.batches == 0
+
+
+def test_purge_main_prints_summary(session_factory, create_user, monkeypatch, capsys):
+    _seed(session_factory, create_user("purge-user").id, datetime.now(timezone.utc))
+    monkeypatch.setattr(purge_module, "SessionLocal", session_factory)
+
+    assert purge_module.main(["--grace-days", "1", "--batch-size", "10"]) == 0
+    output = capsys.readouterr().out
+    assert "Done: cutoff=" in output
+    assert "deleted=5 batches=1" in output
+    assert _remaining(session_factory) == {"live"}
+
+
+def test_purge_zero_grace_days_is_not_replaced_by_the_default(session_factory, create_user):
+    _seed(session_factory, create_user("purge-user").id)
+
+    report = purge_module.purge_refresh_tokens(session_factory, grace_days=0, now=NOW)
+
+    assert report.cutoff == NOW
+    assert _remaining(session_factory) == {"live"}
+
+
+def test_purge_refuses_negative_grace_and_empty_batches(session_factory, create_user):
+    _seed(session_factory, create_user("purge-user").id)
+
+    with pytest.raises(ValueError):
+        purge_module.purge_refresh_tokens(session_factory, grace_days=-7, now=NOW)
+    with pytest.raises(ValueError):
+        purge_module.purge_refresh_tokens(session_factory, batch_size=0, now=NOW)
+    assert len(_remaining(session_factory)) == 6
+
+
+@pytest.mark.parametrize("option,value,message", [
+    ("--grace-days", "-7", "must be >= 0"),
+    ("--pause-ms", "-1", "must be >= 0"),
+    ("--batch-size", "0", "must be >= 1"),
+])
+def test_purge_cli_rejects_out_of_range_values(option, value, message, capsys):
+    with pytest.raises(SystemExit) as exc:
+        purge_module.main([option, value])
+    assert exc.value.code == 2
+    assert message in capsys.readouterr().err
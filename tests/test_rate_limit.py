@@ -0,0 +1,189 @@
+import asyncio
+
+import fakeredis
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+import app.services.security_store as store_module
+from app.config import Settings
+from app.services import rate_limit
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(store_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_inmemory_sliding_window_releases_hits_gradually(clock):
+    store = store_module.InMemorySecurityStore()
+    assert store.sliding_window_hit("k", 2, 60) == (True, 60, 1)
+    clock[0] += 30
+    assert store.sliding_window_hit("k", 2, 60) == (True, 60, 2)
+    assert store.sliding_window_hit("k", 2, 60) == (False, 30, 3)
+
+    # Only the first hit has left the window; a fixed window would have reset both.
+    clock[0] += 31
+    assert store.sliding_window_hit("k", 2, 60) == (True, 60, 2)
+    assert store.sliding_window_hit("k", 2, 60) == (False, 29, 3)
+
+    clock[0] += 120
+    store.get_value("prune")
+    assert "k" not in store._windows
+
+
+def test_inmemory_token_bucket_refills_over_window(clock):
+    store = store_module.InMemorySecurityStore()
+    assert store.token_bucket_hit("b", 2, 60) == (True, 60, 1)
+    assert store.token_bucket_hit("b", 2, 60) == (True, 60, 2)
+    assert store.token_bucket_hit("b", 2, 60) == (False, 30, 3)
+
+    clock[0] += 30
+    assert store.token_bucket_hit("b", 2, 60) == (True, 60, 2)
+
+    clock[0] += 61
+    store.get_value("prune")
+    assert "b" not in store._buckets
+
+
+def test_redis_scripts_are_atomic_and_loaded_once():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    store = store_module.RedisSecurityStore(client)
+
+    assert store.incr_with_window("fixed", 60) == (1, 60)
+    assert store.incr_with_window("fixed", 60)[0] == 2
+    assert 0 < client.ttl("fixed") <= 60
+
+    assert store.sliding_window_hit("sliding", 2, 60) == (True, 60, 1)
+    assert store.sliding_window_hit("sliding", 2, 60) == (True, 60, 2)
+    allowed, retry_after, count = store.sliding_window_hit("sliding", 2, 60)
+    assert (allowed, count) == (False, 3)
+    assert 1 <= retry_after <= 60
+    assert client.zcard("sliding") == 2
+    assert 0 < client.pttl("sliding") <= 60000
+
+    assert store.token_bucket_hit("bucket", 2, 60) == (True, 60, 1)
+    assert store.token_bucket_hit("bucket", 2, 60) == (True, 60, 2)
+    allowed, retry_after, count = store.token_bucket_hit("bucket", 2, 60)
+    assert (allowed, count) == (False, 3)
+    assert 1 <= retry_after <= 30
+    assert 0 < client.pttl("bucket") <= 60000
+
+    assert client.script_exists(
+        store._fixed_window.sha,
+        store._sliding_window.sha,
+        store._token_bucket.sha
+    ) == [True, True, True]
+
+
+def test_rate_limit_algorithm_selected_per_namespace(monkeypatch):
+    monkeypatch.setattr(store_module, "_store_cache", store_module.InMemorySecurityStore())
+    monkeypatch.setattr(
+        rate_limit.settings,
+        "rate_limit_algorithms",
+        "burst=token_bucket, login_ip = sliding_window"
+    )
+    assert rate_limit.resolve_algorithm("burst") == rate_limit.TOKEN_BUCKET
+    assert rate_limit.resolve_algorithm("login_ip") == rate_limit.SLIDING_WINDOW
+    assert rate_limit.resolve_algorithm("other") == rate_limit.FIXED_WINDOW
+    assert rate_limit.resolve_algorithm("burst", rate_limit.FIXED_WINDOW) == rate_limit.FIXED_WINDOW
+
+    asyncio.run(rate_limit.enforce_rate_limit("burst", "user-1", limit=1, window_seconds=60))
+    with pytest.raises(HTTPException) as bucket_exc:
+        asyncio.run(rate_limit.enforce_rate_limit("burst", "user-1", limit=1, window_seconds=60))
+    assert bucket_exc.value.detail["algorithm"] == rate_limit.TOKEN_BUCKET
+    assert bucket_exc.value.headers["Retry-After"] == "60"
+
+    asyncio.run(rate_limit.enforce_rate_limit("login_ip", "10.0.0.1", limit=1, window_seconds=60))
+    with pytest.raises(HTTPException) as sliding_exc:
+        asyncio.run(rate_limit.enforce_rate_limit("login_ip", "10.0.0.1", limit=1, window_seconds=60))
+    assert sliding_exc.value.detail["algorithm"] == rate_limit.SLIDING_WINDOW
+
+
+def test_rate_limit_algorithms_setting_is_validated():
+    with pytest.raises(ValidationError, match="RATE_LIMIT_ALGORITHMS"):
+        Settings(rate_limit_algorithms="login_ip=leaky_bucket")
+    with pytest.raises(ValidationError, match="RATE_LIMIT_ALGORITHMS"):
+        Settings(rate_limit_algorithms="=sliding_window")
+    assert Settings(rate_limit_algorithms="a=sliding_window,,").rate_limit_algorithm_overrides == {
+        "a": "sliding_window"
+    }
+
+
+def test_async_redis_store_runs_scripts_without_blocking():
+    async def _exercise():
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        store = store_module.AsyncRedisSecurityStore(client)
+        fixed = [await store.incr_with_window("fixed", 60) for _ in range(2)]
+        sliding = [await store.sliding_window_hit("sliding", 1, 60) for _ in range(2)]
+        bucket = [await store.token_bucket_hit("bucket", 1, 60) for _ in range(2)]
+        await store.set_with_ttl("kv", "v", 10)
+        stored = await store.get_value("kv")
+        await store.delete("kv")
+        await store.publish("channel", "message")
+        return fixed, sliding, bucket, stored, await store.get_value("kv")
+
+    fixed, sliding, bucket, stored, deleted = asyncio.run(_exercise())
+    assert fixed == [(1, 60), (2, 60)]
+    assert sliding[0] == (True, 60, 1)
+    assert sliding[1][0] is False
+    assert bucket[0] == (True, 60, 1)
+    assert bucket[1][0] is False
+    assert stored == "v"
+    assert deleted is None
+
+
+def test_async_redis_store_fails_open_on_redis_errors(monkeypatch):
+    monkeypatch.setattr(store_module, "RedisError", RuntimeError)
+
+    class ExplodingAsyncRedis:
+        def register_script(self, script):
+            async def _explode(*args, **kwargs):
+                raise RuntimeError("boom")
+            return _explode
+
+        async def setex(self, *args):
+            raise RuntimeError("boom")
+
+        async def get(self, key):
+            raise RuntimeError("boom")
+
+        async def delete(self, key):
+            raise RuntimeError("boom")
+
+        async def publish(self, channel, message):
+            raise RuntimeError("boom")
+
+    async def _exercise():
+        store = store_module.AsyncRedisSecurityStore(ExplodingAsyncRedis())
+        await store.set_with_ttl("kv", "v", 10)
+        await store.delete("kv")
+        await store.publish("channel", "message")
+        return (
+            await store.incr_with_window("k", 60),
+            await store.token_bucket_hit("k", 1, 60),
+            await store.get_value("kv"),
+        )
+
+    assert asyncio.run(_exercise()) == ((1, 60), (True, 60, 1), None)
+
+
+def test_async_inmemory_store_shares_state_with_sync_store():
+    sync_store = store_module.InMemorySecurityStore()
+    async_store = store_module.AsyncInMemorySecurityStore(sync_store)
+
+    async def _exercise():
+        await async_store.set_with_ttl("kv", "v", 10)
+        await async_store.delete("missing")
+        await async_store.publish("channel", "message")
+        return (
+            await async_store.get_value("kv"),
+            await async_store.incr_with_window("fixed", 60),
+            await async_store.sliding_window_hit("sliding", 1, 60),
+            await async_store.token_bucket_hit("bucket", 1, 60),
+        )
+
+    assert asyncio.run(_exercise()) == ("v", (1, 60), (True, 60, 1), (True, 60, 1))
+    assert sync_store.get_value("kv") == "v"
@@ -0,0 +1,162 @@
+import pytest
+from cryptography.fernet import Fernet
+
+import app.jobs.reencrypt_accounts as reencrypt_module
+from app.core import security
+from app.db.models import CopyTradeAccount
+
+
+def _accounts(encrypted_values):
+    return [
+        {"account_number": f"ROT-{index}", "account_password": encrypted}
+        for index, encrypted in enumerate(encrypted_values)
+    ]
+
+
+def test_reencrypt_accounts_rotates_old_rows_in_parallel_and_is_rerunnable(
+    session_factory,
+    seed_accounts,
+    monkeypatch
+):
+    old_key = Fernet.generate_key().decode()
+    new_key = Fernet.generate_key().decode()
+    old_cipher = Fernet(old_key.encode())
+    new_cipher = Fernet(new_key.encode())
+    monkeypatch.setattr(security.settings, "encryption_key", new_key)
+    monkeypatch.setattr(security.settings, "encryption_previous_keys", old_key)
+
+    seed_accounts(*_accounts([
+        old_cipher.encrypt(b"pass-0").decode(),
+        old_cipher.encrypt(b"pass-1").decode(),
+        new_cipher.encrypt(b"pass-2").decode(),
+        "not-a-fernet-token",
+        old_cipher.encrypt(b"pass-4").decode(),
+    ]))
+
+    progress_events = []
+    report = reencrypt_module.reencrypt_accounts(
+        session_factory,
+        batch_size=2,
+        workers=2,
+        progress=progress_events.append
+    )
+    assert report.scanned == 5
+    assert report.rotated == 3
+    assert report.failed_ids == [4]
+    assert report.last_id == 5
+    assert report.rows_per_second > 0
+    marks = [event.last_id for event in progress_events]
+    assert marks == sorted(marks)
+    assert marks[-1] == 5
+    assert progress_events[-1].scanned == 5
+
+    with session_factory() as db:
+        rows = db.query(CopyTradeAccount).order_by(CopyTradeAccount.id).all()
+        decrypted = [
+            new_cipher.decrypt(row.account_password.encode()).decode()
+            for row in rows
+            if row.id != 4
+        ]
+    assert decrypted == ["pass-0", "pass-1", "pass-2", "pass-4"]
+
+    rerun = reencrypt_module.reencrypt_accounts(session_factory, batch_size=10)
+    assert rerun.scanned == 5
+    assert rerun.rotated == 0
+
+    resumed = reencrypt_module.reencrypt_accounts(session_factory, start_id=3, end_id=4)
+    assert resumed.scanned == 1
+    assert resumed.failed_ids == [4]
+
+    assert reencrypt_module.reencrypt_accounts(session_factory, start_id=5).scanned == 0
+
+
+def test_progress_low_water_mark_waits_for_the_slowest_range():
+    ranges = [(0, 10), (10, 20), (20, 30)]
+    reports = [
+        reencrypt_module.RotationReport(last_id=4),
+        reencrypt_module.RotationReport(last_id=20),
+        reencrypt_module.RotationReport(last_id=27),
+    ]
+    # Later ranges running ahead must not move the mark past unrotated ids.
+    assert reencrypt_module._low_water_mark(ranges, reports, [False, True, False]) == 4
+    assert reencrypt_module._low_water_mark(ranges, reports, [True, True, False]) == 27
+    assert reencrypt_module._low_water_mark(ranges, reports, [True, True, True]) == 30
+
+
+def test_reencrypt_accounts_empty_table_and_report_defaults(session_factory):
+    report = reencrypt_module.reencrypt_accounts(session_factory, workers=4)
+    assert report.scanned == 0
+    assert report.last_id == 0
+    assert reencrypt_module.RotationReport().rows_per_second == 0.0
+
+
+def test_reencrypt_main_prints_summary_and_exit_code(
+    session_factory,
+    seed_accounts,
+    monkeypatch,
+    capsys
+):
+    key = Fernet.generate_key().decode()
+    monkeypatch.setattr(security.settings, "encryption_key", key)
+    monkeypatch.setattr(security.settings, "encryption_previous_keys", "")
+    monkeypatch.setattr(reencrypt_module, "SessionLocal", session_factory)
+
+    seed_accounts(*_accounts([Fernet(key.encode()).encrypt(b"ok").decode()]))
+    assert reencrypt_module.main(["--batch-size", "10"]) == 0
+    output = capsys.readouterr().out
+    assert "last_id=1" in output
+    assert "Done: scanned=1 rotated=0 skipped=0 failed=0" in output
+
+    with session_factory() as db:
+        db.query(CopyTradeAccount).update({"account_password": "broken"})
+        db.commit()
+    assert reencrypt_module.main([]) == 1
+    assert "Undecryptable ids: [1]" in capsys.readouterr().out
+
+
+def test_reencrypt_skips_rows_changed_after_the_chunk_was_read(
+    session_factory,
+    seed_accounts,
+    monkeypatch
+):
+    old_key = Fernet.generate_key().decode()
+    new_key = Fernet.generate_key().decode()
+    new_cipher = Fernet(new_key.encode())
+    monkeypatch.setattr(security.settings, "encryption_key", new_key)
+    monkeypatch.setattr(security.settings, "encryption_previous_keys", old_key)
+
+    old_cipher = Fernet(old_key.encode())
+    seed_accounts(*_accounts([
+        old_cipher.encrypt(b"pass-0").decode(),
+        old_cipher.encrypt(b"pass-1").decode(),
+    ]))
+    changed = new_cipher.encrypt(b"changed-by-api").decode()
+    rotate = reencrypt_module.rotate_encrypted_value
+
+    def _rotate_while_the_api_writes(encrypted):
+        # A password change lands between the chunk SELECT and the write-back.
+        with session_factory() as other:
+            other.query(CopyTradeAccount).filter(CopyTradeAccount.id == 2).update(
+                {"account_password": changed}
+            )
+            other.commit()
+        return rotate(encrypted)
+
+    monkeypatch.setattr(reencrypt_module, "rotate_encrypted_value", _rotate_while_the_api_writes)
+    report = reencrypt_module.reencrypt_accounts(session_factory, batch_size=10)
+    assert report.scanned == 2
+    assert report.rotated == 1
+    assert report.skipped == 1
+
+    with session_factory() as db:
+        rows = db.query(CopyTradeAccount).order_by(CopyTradeAccount.id).all()
+        assert new_cipher.decrypt(rows[0].account_password.encode()) == b"pass-0"
+        assert rows[1].account_password == changed
+
+
+@pytest.mark.parametrize("option", ["--workers", "--batch-size"])
+def test_reencrypt_main_rejects_non_positive_counts(option, capsys):
+    with pytest.raises(SystemExit) as exc:
+        reencrypt_module.main([option, "0"])
+    assert exc.value.code == 2
+    assert "must be >= 1" in capsys.readouterr().err
@@ -0,0 +1,589 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.config import get_settings
+from app.core.security import hash_token
+from app.crud import user as user_crud
+from app.db.models import RefreshToken
+from app.schemas.user import UserCreate
+from app.services import refresh_cache, security_store
+from app.services.batch_writer import BatchWriter
+from app.services.session import (
+    create_session_tokens,
+    create_session_tokens_async,
+    revoke_access_session_async,
+    revoke_refresh_session_async,
+    rotate_session_tokens_async,
+)
+
+settings = get_settings()
+
+
+@pytest.fixture(autouse=True)
+def in_memory_store():
+    security_store._store_cache = security_store.InMemorySecurityStore()
+    yield
+    security_store._store_cache = None
+
+
+def _create_user(db_session, username: str):
+    return user_crud.create_user(
+        db_session,
+        UserCreate(
+            username=username,
+            email=f"{username}@example.com",
+            password="strong-password"
+        )
+    )
+
+
+def _state(session_id: str = "sid", expires_in: timedelta = timedelta(days=1)):
+    return refresh_cache.RefreshSessionState(
+        user_id=1,
+        username="cached-user",
+        session_id=session_id,
+        csrf_token="csrf",
+        expires_at=datetime.now(timezone.utc) + expires_in
+    )
+
+
+def _refresh_selects(statements: list[str]) -> list[str]:
+    return [
+        statement for statement in statements
+        if statement.lstrip().upper().startswith("SELECT") and "refresh_tokens" in statement
+    ]
+
+
+def test_refresh_route_rotates_from_cache_without_reading_refresh_tokens(client, db_session):
+    _create_user(db_session, "refresh-cache-user")
+    login = client.post(
+        "/api/v2/auth/login",
+        json={"username": "refresh-cache-user", "password": "strong-password"}
+    )
+    assert login.status_code == 200
+    old_refresh = client.cookies.get(settings.session_cookie_name_refresh)
+    csrf = client.cookies.get(settings.session_cookie_name_csrf)
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _record)
+    try:
+        refreshed = client.post(
+            "/api/v2/auth/refresh",
+            headers={settings.csrf_header_name: csrf}
+        )
+    finally:
+        event.remove(Engine, "before_cursor_execute", _record)
+    assert refreshed.status_code == 204
+    assert _refresh_selects(statements) == []
+
+    db_session.expire_all()
+    old_row = db_session.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_token(old_refresh)
+    ).one()
+    new_refresh = client.cookies.get(settings.session_cookie_name_refresh)
+    new_row = db_session.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_token(new_refresh)
+    ).one()
+    assert old_row.revoked_at is not None
+    assert new_row.revoked_at is None
+    assert new_row.session_id == old_row.session_id
+
+    # The old token was claimed; replaying it fails without a database fallback.
+    client.cookies.set(settings.session_cookie_name_refresh, old_refresh)
+    replay = client.post(
+        "/api/v2/auth/refresh",
+        headers={settings.csrf_header_name: client.cookies.get(settings.session_cookie_name_csrf)}
+    )
+    assert replay.status_code == 401
+
+
+def test_cached_rotation_guards(db_session, async_session_factory):
+    user = _create_user(db_session, "refresh-cache-guards")
+
+    async def _flow():
+        async with async_session_factory() as db:
+            bundle = await create_session_tokens_async(db, user=user)
+            bad_csrf = await rotate_session_tokens_async(
+                db,
+                refresh_token=bundle.refresh_token,
+                csrf_token="wrong"
+            )
+            # The state was put back, so the right CSRF token still works.
+            rotated = await rotate_session_tokens_async(
+                db,
+                refresh_token=bundle.refresh_token,
+                csrf_token=bundle.csrf_token
+            )
+
+            expired_hash = hash_token("expired-token")
+            store = security_store.get_security_store()
+            store.set_with_ttl(
+                refresh_cache.REFRESH_SESSION_PREFIX + expired_hash,
+                refresh_cache._encode(_state(expires_in=timedelta(seconds=-1))),
+                60
+            )
+            expired = await rotate_session_tokens_async(
+                db,
+                refresh_token="expired-token",
+                csrf_token="csrf"
+            )
+
+            await revoke_access_session_async(rotated.session_id)
+            revoked = await rotate_session_tokens_async(
+                db,
+                refresh_token=rotated.refresh_token,
+                csrf_token=rotated.csrf_token
+            )
+            return bundle, bad_csrf, rotated, expired, revoked
+
+    bundle, bad_csrf, rotated, expired, revoked = asyncio.run(_flow())
+    assert bad_csrf is None
+    assert rotated.session_id == bundle.session_id
+    assert rotated.username == "refresh-cache-guards"
+    assert expired is None
+    assert revoked is None
+
+
+def test_database_fallback_caches_rotated_token_and_releases_failed_claims(
+    db_session,
+    async_session_factory
+):
+    user = _create_user(db_session, "refresh-cache-fallback")
+    created = create_session_tokens(db_session, user=user)
+    store = security_store.get_security_store()
+
+    async def _flow():
+        async with async_session_factory() as db:
+            bad_csrf = await rotate_session_tokens_async(
+                db,
+                refresh_token=created.refresh_token,
+                csrf_token="wrong"
+            )
+            released = store.get_value(
+                refresh_cache.REFRESH_SESSION_PREFIX + hash_token(created.refresh_token)
+            )
+            rotated = await rotate_session_tokens_async(
+                db,
+                refresh_token=created.refresh_token,
+                csrf_token=created.csrf_token
+            )
+            return bad_csrf, released, rotated
+
+    bad_csrf, released, rotated = asyncio.run(_flow())
+    assert bad_csrf is None
+    assert released is None
+    cached = store.get_value(refresh_cache.REFRESH_SESSION_PREFIX + hash_token(rotated.refresh_token))
+    assert refresh_cache._decode(cached).session_id == created.session_id
+
+
+def test_logout_revokes_cached_and_claimed_tokens(db_session, async_session_factory):
+    user = _create_user(db_session, "refresh-cache-logout")
+
+    async def _flow():
+        async with async_session_factory() as db:
+            bundle = await create_session_tokens_async(db, user=user)
+            revoked = await revoke_refresh_session_async(db, bundle.refresh_token)
+            # A second logout with the same cookie finds the claim marker.
+            again = await revoke_refresh_session_async(db, bundle.refresh_token)
+            return bundle, revoked, again
+
+    bundle, revoked, again = asyncio.run(_flow())
+    assert revoked.session_id == bundle.session_id
+    assert revoked.revoked_at is not None
+    assert again is None
+
+
+def test_revocation_wins_regardless_of_write_order(db_session):
+    user = _create_user(db_session, "refresh-cache-order")
+    now = datetime.now(timezone.utc)
+    state = _state()
+    state.user_id = user.id
+    issued = {"issued": state.row_values("hash-a", created_ip="1.1.1.1", created_user_agent="ua")}
+    revoked = {"revoked": state.row_values("hash-a", revoked_at=now, last_used_at=now)}
+
+    refresh_cache.apply_refresh_rows(db_session, [revoked])
+    refresh_cache.apply_refresh_rows(db_session, [issued])
+    row = db_session.query(RefreshToken).filter(RefreshToken.token_hash == "hash-a").one()
+    assert row.revoked_at is not None
+
+    later = now + timedelta(minutes=1)
+    refresh_cache.apply_refresh_rows(db_session, [
+        {"issued": state.row_values("hash-b", created_ip=None, created_user_agent=None)},
+    ])
+    refresh_cache.apply_refresh_rows(db_session, [
+        {"revoked": state.row_values("hash-b", revoked_at=now, last_used_at=now)},
+        {"revoked": state.row_values("hash-a", revoked_at=later, last_used_at=later)},
+    ])
+    db_session.expire_all()
+    rows = {
+        row.token_hash: row
+        for row in db_session.query(RefreshToken).filter(RefreshToken.user_id == user.id)
+    }
+    assert rows["hash-b"].revoked_at is not None
+    # The first revocation time is kept.
+    assert rows["hash-a"].revoked_at.replace(tzinfo=None) == now.replace(tzinfo=None)
+
+
+def test_refresh_writer_lifecycle_and_cache_switch(db_session, async_session_factory, monkeypatch):
+    user = _create_user(db_session, "refresh-cache-writer")
+    state = _state()
+    state.user_id = user.id
+    now = datetime.now(timezone.utc)
+
+    async def _exercise():
+        await refresh_cache.stop_refresh_writer()
+        monkeypatch.setattr(refresh_cache.settings, "refresh_writer_enabled", True)
+        writer = refresh_cache.start_refresh_writer(async_session_factory)
+        assert refresh_cache.start_refresh_writer() is writer
+        assert refresh_cache.get_refresh_writer() is writer
+        async with async_session_factory() as db:
+            await refresh_cache.record_refresh_rows(db, {
+                "issued": state.row_values("hash-w", created_ip=None, created_user_agent=None),
+                "revoked": state.row_values("hash-v", revoked_at=now, last_used_at=now),
+            })
+        await refresh_cache.stop_refresh_writer()
+        return writer.stats()
+
+    stats = asyncio.run(_exercise())
+    assert stats["written"] == 1
+    assert refresh_cache.get_refresh_writer() is None
+    hashes = {row.token_hash for row in db_session.query(RefreshToken).all()}
+    assert {"hash-w", "hash-v"} <= hashes
+
+    monkeypatch.setattr(refresh_cache.settings, "refresh_session_cache_enabled", False)
+
+    async def _disabled():
+        await refresh_cache.remember_refresh_session("hash-x", state)
+        await refresh_cache.settle_refresh_claim("hash-x", state.expires_at)
+        await refresh_cache.release_refresh_claim("hash-x")
+        return await refresh_cache.claim_refresh_session("hash-x")
+
+    assert asyncio.run(_disabled()) is None
+    assert security_store.get_security_store().get_value("refresh_session:hash-x") is None
+
+
+def test_remember_skips_expired_state():
+    asyncio.run(refresh_cache.remember_refresh_session(
+        "hash-expired",
+        _state(expires_in=timedelta(seconds=-5))
+    ))
+    assert security_store.get_security_store().get_value("refresh_session:hash-expired") is None
+
+
+def test_base_batch_writer_is_abstract(async_session_factory):
+    with pytest.raises(TypeError):
+        BatchWriter(
+            async_session_factory,
+            max_queue=1,
+            batch_size=1,
+            flush_interval_seconds=0
+        )
+
+
+class FlakyWriter(BatchWriter):
+    def __init__(self, *args, failures: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = failures
+        self.rows: list = []
+
+    async def write_batch(self, db, batch):
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError("INSERT", {}, ConnectionError("database is down"))
+        self.rows.extend(batch)
+
+
+def test_batch_writer_retries_transient_errors_past_max_attempts(async_session_factory):
+    writer = FlakyWriter(
+        async_session_factory,
+        max_queue=10,
+        batch_size=10,
+        flush_interval_seconds=0,
+        max_attempts=2,
+        retry_delay_seconds=0,
+        failures=4
+    )
+
+    async def _run():
+        writer.start()
+        await writer.submit({"n": 1})
+        while not writer.rows:
+            await asyncio.sleep(0)
+        await writer.stop()
+
+    asyncio.run(_run())
+    assert writer.rows == [{"n": 1}]
+    assert writer.stats()["retries"] == 4
+    assert writer.stats()["failed"] == 0
+
+
+def test_batch_writer_gives_up_on_transient_errors_past_the_retry_window(async_session_factory):
+    writer = FlakyWriter(
+        async_session_factory,
+        max_queue=10,
+        batch_size=10,
+        flush_interval_seconds=0,
+        max_attempts=2,
+        retry_delay_seconds=0,
+        failures=10
+    )
+    writer.max_retry_seconds = 0
+    asyncio.run(writer._write([{"n": 1}]))
+    assert writer.rows == []
+    assert writer.stats()["failed"] == 1
+    assert writer.stats()["retries"] == 1
+
+
+def test_batch_writer_submit_drops_items_when_the_queue_stays_full(async_session_factory):
+    writer = FlakyWriter(
+        async_session_factory,
+        max_queue=1,
+        batch_size=1,
+        flush_interval_seconds=0,
+        failures=0
+    )
+    writer.submit_timeout_seconds = 0.01
+
+    async def _fill():
+        # Not started: nothing drains the queue, as during a long outage.
+        await writer.submit({"n": 1})
+        await writer.submit({"n": 2})
+
+    asyncio.run(_fill())
+    assert writer.stats()["queued"] == 1
+    assert writer.stats()["dropped"] == 1
+
+
+def test_batch_writer_gives_up_on_transient_errors_while_stopping(async_session_factory):
+    writer = FlakyWriter(
+        async_session_factory,
+        max_queue=10,
+        batch_size=10,
+        flush_interval_seconds=0,
+        max_attempts=2,
+        retry_delay_seconds=0,
+        failures=10
+    )
+    writer._stopping = True
+    asyncio.run(writer._write([{"n": 1}]))
+    assert writer.rows == []
+    assert writer.stats()["failed"] == 1
+
+
+def test_store_swap_value_across_backends():
+    in_memory = security_store.InMemorySecurityStore()
+    assert in_memory.swap_value("k", "a", 60) is None
+    assert in_memory.swap_value("k", "b", 60) == "a"
+    assert in_memory.get_value("k") == "b"
+
+    sync_store = security_store.RedisSecurityStore(fakeredis.FakeRedis(decode_responses=True))
+    assert sync_store.swap_value("k", "a", 60) is None
+    assert sync_store.swap_value("k", "b", 60) == "a"
+
+    async def _async_swaps():
+        store = security_store.AsyncRedisSecurityStore(
+            fakeredis.aioredis.FakeRedis(decode_responses=True)
+        )
+        first = await store.swap_value("k", "a", 60)
+        second = await store.swap_value("k", "b", 60)
+        wrapped = security_store.AsyncInMemorySecurityStore(in_memory)
+        return first, second, await wrapped.swap_value("k", "c", 60)
+
+    assert asyncio.run(_async_swaps()) == (None, "a", "b")
+
+    class BrokenRedis(fakeredis.FakeRedis):
+        def set(self, *args, **kwargs):
+            raise RedisError("down")
+
+    class BrokenAsyncRedis(fakeredis.aioredis.FakeRedis):
+        async def set(self, *args, **kwargs):
+            raise RedisError("down")
+
+    # An outage must not look like a missing key.
+    broken = security_store.RedisSecurityStore(BrokenRedis(decode_responses=True))
+    with pytest.raises(RedisError):
+        broken.swap_value("k", "a", 60)
+    broken_async = security_store.AsyncRedisSecurityStore(
+        BrokenAsyncRedis(decode_responses=True)
+    )
+    with pytest.raises(RedisError):
+        asyncio.run(broken_async.swap_value("k", "a", 60))
+
+
+def test_claimed_token_stays_rejected_after_its_revocation_row_is_lost(
+    db_session,
+    async_session_factory,
+    monkeypatch
+):
+    user = _create_user(db_session, "refresh-cache-lost-row")
+
+    async def _rotate(refresh_token, csrf_token):
+        async with async_session_factory() as db:
+            return await rotate_session_tokens_async(
+                db,
+                refresh_token=refresh_token,
+                csrf_token=csrf_token
+            )
+
+    async def _create():
+        async with async_session_factory() as db:
+            return await create_session_tokens_async(db, user=user)
+
+    bundle = asyncio.run(_create())
+    assert asyncio.run(_rotate(bundle.refresh_token, bundle.csrf_token)) is not None
+
+    # The write-behind revocation never landed and the old marker TTL is long past.
+    old_row = db_session.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_token(bundle.refresh_token)
+    ).one()
+    old_row.revoked_at = None
+    db_session.commit()
+    real_time = security_store.time.time
+    monkeypatch.setattr(security_store.time, "time", lambda: real_time() + 3600)
+
+    assert asyncio.run(_rotate(bundle.refresh_token, bundle.csrf_token)) is None
+
+
+def test_store_outage_rejects_refresh_and_logout(
+    db_session,
+    async_session_factory,
+    monkeypatch
+):
+    user = _create_user(db_session, "refresh-cache-outage")
+    created = create_session_tokens(db_session, user=user)
+
+    class BrokenAsyncRedis(fakeredis.aioredis.FakeRedis):
+        async def set(self, *args, **kwargs):
+            raise RedisError("down")
+
+    broken_async = security_store.AsyncRedisSecurityStore(BrokenAsyncRedis(decode_responses=True))
+    monkeypatch.setattr(refresh_cache, "get_async_security_store", lambda: broken_async)
+
+    async def _flow():
+        async with async_session_factory() as db:
+            rotated = await rotate_session_tokens_async(
+                db,
+                refresh_token=created.refresh_token,
+                csrf_token=created.csrf_token
+            )
+            # A database-only revocation could be undone by a queued write or
+            # by the cached state once the store is back.
+            with pytest.raises(refresh_cache.RefreshSessionUnavailable):
+                await revoke_refresh_session_async(db, created.refresh_token)
+            return rotated
+
+    assert asyncio.run(_flow()) is None
+    db_session.expire_all()
+    row = db_session.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_token(created.refresh_token)
+    ).one()
+    assert row.revoked_at is None
+
+
+def test_logout_route_fails_loudly_when_the_store_is_down(client, db_session, monkeypatch):
+    _create_user(db_session, "refresh-cache-logout-outage")
+    login = client.post(
+        "/api/v2/auth/login",
+        json={"username": "refresh-cache-logout-outage", "password": "strong-password"}
+    )
+    assert login.status_code == 200
+    refresh_token = client.cookies.get(settings.session_cookie_name_refresh)
+
+    class BrokenAsyncRedis(fakeredis.aioredis.FakeRedis):
+        async def set(self, *args, **kwargs):
+            raise RedisError("down")
+
+    broken_async = security_store.AsyncRedisSecurityStore(BrokenAsyncRedis(decode_responses=True))
+    monkeypatch.setattr(refresh_cache, "get_async_security_store", lambda: broken_async)
+    logout = client.post(
+        "/api/v2/auth/logout",
+        headers={settings.csrf_header_name: client.cookies.get(settings.session_cookie_name_csrf)}
+    )
+    assert logout.status_code == 503
+    assert logout.headers["Retry-After"] == "1"
+    assert "set-cookie" not in logout.headers
+    assert client.cookies.get(settings.session_cookie_name_refresh) == refresh_token
+
+
+def test_claim_marker_lives_only_as_long_as_the_claimed_token(db_session, async_session_factory):
+    user = _create_user(db_session, "refresh-cache-marker-ttl")
+    # Issued without the cache, so both go through the database fallback.
+    created = create_session_tokens(db_session, user=user)
+    logged_out = create_session_tokens(db_session, user=user)
+    soon = datetime.now(timezone.utc) + timedelta(hours=2)
+    for row in db_session.query(RefreshToken).filter(RefreshToken.user_id == user.id):
+        row.expires_at = soon
+    db_session.commit()
+    store = security_store.get_security_store()
+    cached_hash = hash_token("cached-token")
+    store.set_with_ttl(
+        refresh_cache.REFRESH_SESSION_PREFIX + cached_hash,
+        refresh_cache._encode(_state(expires_in=timedelta(hours=1))),
+        3600
+    )
+    expired_hash = hash_token("expired-token")
+    store.set_with_ttl(
+        refresh_cache.REFRESH_SESSION_PREFIX + expired_hash,
+        refresh_cache._encode(_state(expires_in=timedelta(seconds=-1))),
+        60
+    )
+
+    async def _flow():
+        await refresh_cache.claim_refresh_session(cached_hash)
+        await refresh_cache.claim_refresh_session(expired_hash)
+        async with async_session_factory() as db:
+            await rotate_session_tokens_async(
+                db,
+                refresh_token=created.refresh_token,
+                csrf_token=created.csrf_token
+            )
+            return await revoke_refresh_session_async(db, logged_out.refresh_token)
+
+    revoked = asyncio.run(_flow())
+    assert revoked.revoked_at is not None
+
+    def _marker_ttl(token_hash):
+        value, expiry = store._values[refresh_cache.REFRESH_SESSION_PREFIX + token_hash]
+        assert value == refresh_cache.CLAIMED_MARKER
+        return expiry - time.time()
+
+    assert 3500 < _marker_ttl(cached_hash) <= 3600
+    assert refresh_cache.REFRESH_SESSION_PREFIX + expired_hash not in store._values
+    # The database fallback shortens the marker to the row's expires_at.
+    assert 7100 < _marker_ttl(hash_token(created.refresh_token)) <= 7200
+    assert 7100 < _marker_ttl(hash_token(logged_out.refresh_token)) <= 7200
+
+
+def test_database_fallback_rejects_tokens_whose_user_is_gone(async_session_factory, monkeypatch):
+    import app.services.session as session_module
+
+    class OrphanToken:
+        csrf_token = "csrf"
+        session_id = "sid-123"
+        token_hash = "hash-123"
+        user_id = 1
+        user = None
+        revoked_at = None
+        last_used_at = None
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    monkeypatch.setattr(session_module, "_get_active_refresh_row", lambda db, refresh: OrphanToken())
+
+    async def _flow():
+        async with async_session_factory() as db:
+            return await rotate_session_tokens_async(db, refresh_token="any", csrf_token="csrf")
+
+    assert asyncio.run(_flow()) is None
@@ -0,0 +1,155 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.services import principal_cache, revocation_cache, security_store
+from app.services import session as session_service
+from app.services.revocation_cache import (
+    REVOCATION_CHANNEL,
+    RevokedSessionCache,
+    encode_revocation,
+    run_revocation_listener,
+)
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_revoked_session_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(revocation_cache.time, "time", lambda: now[0])
+    cache = RevokedSessionCache()
+    cache.add("sid-1", 60)
+    cache.add_many({"sid-2": 10, "sid-1": 5})
+    assert cache.contains("sid-1")
+    assert cache.contains("sid-2")
+    assert not cache.contains("other")
+
+    now[0] += 30
+    assert cache.contains("sid-1")
+    assert not cache.contains("sid-2")
+    cache.add("sid-3", 60)
+    assert cache.stats() == {"ready": False, "entries": 2}
+
+
+def test_listener_mirrors_snapshot_messages_and_resync():
+    async def _exercise():
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        await client.setex("revoked_session:before-start", 60, "1")
+        cache = RevokedSessionCache()
+        task = asyncio.create_task(
+            run_revocation_listener(client, cache, resync_seconds=1, poll_seconds=0.01)
+        )
+        await _wait_for(lambda: cache.ready)
+        assert cache.contains("before-start")
+
+        await client.publish(REVOCATION_CHANNEL, encode_revocation("published", 60))
+        await client.publish(REVOCATION_CHANNEL, "garbage")
+        await _wait_for(lambda: cache.contains("published"))
+
+        # A revocation whose publish was lost is picked up by the next resync.
+        await client.setex("revoked_session:unpublished", 60, "1")
+        await _wait_for(lambda: cache.contains("unpublished"))
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return cache
+
+    cache = asyncio.run(_exercise())
+    assert cache.ready is False
+
+
+def test_listener_falls_back_while_redis_is_unreachable(monkeypatch):
+    monkeypatch.setattr(revocation_cache, "RedisError", RuntimeError)
+
+    class FlakyPubSub:
+        async def subscribe(self, channel):
+            raise RuntimeError("connection refused")
+
+        async def aclose(self):
+            return None
+
+    async def _exercise():
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        real_pubsub = client.pubsub
+        attempts = []
+
+        def _pubsub():
+            attempts.append(1)
+            return FlakyPubSub() if len(attempts) == 1 else real_pubsub()
+
+        client.pubsub = _pubsub
+        cache = RevokedSessionCache()
+        task = asyncio.create_task(
+            run_revocation_listener(client, cache, poll_seconds=0.01, retry_seconds=0.01)
+        )
+        await _wait_for(lambda: cache.ready)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return len(attempts)
+
+    assert asyncio.run(_exercise()) == 2
+
+
+def test_start_and_stop_listener(monkeypatch):
+    monkeypatch.setattr(security_store, "_store_cache", security_store.InMemorySecurityStore())
+    monkeypatch.setattr(revocation_cache, "revoked_sessions", RevokedSessionCache())
+
+    async def _exercise():
+        assert revocation_cache.start_revocation_listener() is False
+        await revocation_cache.stop_revocation_listener()
+
+        redis_store = security_store.AsyncRedisSecurityStore(
+            fakeredis.FakeAsyncRedis(decode_responses=True)
+        )
+        monkeypatch.setattr(revocation_cache, "get_async_security_store", lambda: redis_store)
+        assert revocation_cache.start_revocation_listener() is True
+        assert revocation_cache.start_revocation_listener() is True
+        await revocation_cache.stop_revocation_listener()
+        assert revocation_cache._listener_task is None
+
+    asyncio.run(_exercise())
+
+
+def test_ready_near_cache_answers_without_the_store(monkeypatch):
+    cache = RevokedSessionCache()
+    cache.ready = True
+    cache.add("revoked-sid", 60)
+    monkeypatch.setattr(session_service, "revoked_sessions", cache)
+
+    def _no_store():
+        raise AssertionError("store must not be consulted")
+
+    monkeypatch.setattr(session_service, "get_async_security_store", _no_store)
+
+    assert asyncio.run(session_service.is_access_session_revoked_async("revoked-sid")) is True
+    assert asyncio.run(session_service.is_access_session_revoked_async("live-sid")) is False
+
+
+def test_principal_invalidation_reaches_every_worker_local_tier(db_session):
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    security_store._store_cache = security_store.RedisSecurityStore(redis_client)
+    published = redis_client.pubsub()
+    published.subscribe(REVOCATION_CHANNEL)
+    published.get_message(timeout=1)
+    try:
+        revocation_cache.publish_principal_invalidation("alice")
+        message = published.get_message(timeout=1)
+    finally:
+        published.close()
+        security_store._store_cache = None
+    assert message["data"] == "principal:alice"
+
+    # Another worker receiving that message drops only its local copy.
+    principal_cache._remember_locally("alice", {"username": "alice"})
+    principal_cache._remember_locally("bob", {"username": "bob"})
+    revocation_cache._apply_message(RevokedSessionCache(), message["data"])
+    assert set(principal_cache._local_cache) == {"bob"}
+    principal_cache.clear_local_principals()
@@ -1,6 +1,7 @@
 from datetime import timedelta
 
 import pytest
+from cryptography.fernet import Fernet
 
 from app.core import security
 
@@ -58,3 +59,54 @@ def test_get_fernet_cipher_invalid_key_raises(monkeypatch):
     monkeypatch.setattr(security.settings, "encryption_key", "invalid-short-key")
     with pytest.raises(ValueError, match="valid Fernet key"):
         security.get_fernet_cipher()
+
+
+def test_get_fernet_cipher_is_memoized_per_key_ring(monkeypatch):
+    monkeypatch.setattr(
+        security.settings,
+        "encryption_key",
+        "MDEyMzQ1Njc4OWFiY2RlZjAxMjM0NTY3ODlhYmNkZWY="
+    )
+    monkeypatch.setattr(security.settings, "encryption_previous_keys", "")
+    first = security.get_fernet_cipher()
+    assert security.get_fernet_cipher() is first
+
+    monkeypatch.setattr(security.settings, "encryption_previous_keys", Fernet.generate_key().decode())
+    assert security.get_fernet_cipher() is not first
+
+
+def test_key_ring_decrypts_values_from_previous_key(monkeypatch):
+    old_key = Fernet.generate_key().decode()
+    new_key = Fernet.generate_key().decode()
+    legacy_token = Fernet(old_key.encode()).encrypt(b"legacy-pass").decode()
+
+    monkeypatch.setattr(security.settings, "encryption_key", new_key)
+    monkeypatch.setattr(security.settings, "encryption_previous_keys", f" {old_key} ,")
+    assert security.decrypt_account_password(legacy_token) == "legacy-pass"
+
+    fresh = security.encrypt_account_password("fresh-pass")
+    assert Fernet(new_key.encode()).decrypt(fresh.encode()) == b"fresh-pass"
+
+
+def test_encrypt_many_and_decrypt_many_roundtrip(monkeypatch):
+    monkeypatch.setattr(
+        security.settings,
+        "encryption_key",
+        "MDEyMzQ1Njc4OWFiY2RlZjAxMjM0NTY3ODlhYmNkZWY="
+    )
+    encrypted = security.encrypt_many(["a-pass", "b-pass"])
+    assert len(encrypted) == 2
+    assert security.decrypt_many(encrypted) == ["a-pass", "b-pass"]
+    assert security.decrypt_many([]) == []
+
+
+def test_settings_reject_invalid_previous_encryption_keys():
+    from app.config import Settings
+
+    with pytest.raises(ValueError, match="ENCRYPTION_PREVIOUS_KEYS"):
+        Settings(
+            app_env="test",
+            jwt_secret_key="x" * 32,
+            encryption_key="MDEyMzQ1Njc4OWFiY2RlZjAxMjM0NTY3ODlhYmNkZWY=",
+            encryption_previous_keys="not-a-key"
+        )
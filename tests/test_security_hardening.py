@@ -3,13 +3,16 @@ from __future__ import annotations
 import asyncio
 from datetime import datetime, timezone
 
+import fakeredis
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import text
 from starlette.requests import Request
 
 import app.main as main_module
 from app.config import Settings, get_settings
 from app.core.dependencies import get_current_user_v2, require_csrf
+from app.core.middleware import ResponseHeadersMiddleware
 from app.core import request_meta as request_meta_module
 from app.core.security import create_access_token
 from app.crud import user as user_crud
@@ -17,9 +20,10 @@ from app.schemas.user import UserCreate
 from app.services import rate_limit, security_store
 from app.services.session import (
     create_session_tokens,
-    revoke_access_session,
-    revoke_refresh_session,
-    rotate_session_tokens
+    is_access_session_revoked_async,
+    revoke_access_session_async,
+    revoke_refresh_session_async,
+    rotate_session_tokens_async
 )
 
 
@@ -167,7 +171,15 @@ def test_csrf_dependency_validation():
     require_csrf(safe_request)
 
 
-def test_get_current_user_v2_and_session_revocation(db_session):
+def _current_user_v2(async_session_factory, request):
+    async def _call():
+        async with async_session_factory() as db:
+            return await get_current_user_v2(request=request, db=db)
+
+    return _run(_call())
+
+
+def test_get_current_user_v2_and_session_revocation(db_session, async_session_factory):
     user = user_crud.create_user(
         db_session,
         UserCreate(
@@ -182,12 +194,12 @@ def test_get_current_user_v2_and_session_revocation(db_session):
         "GET",
         cookies={get_settings().session_cookie_name_access: token}
     )
-    current = _run(get_current_user_v2(request=request, db=db_session))
+    current = _current_user_v2(async_session_factory, request)
     assert current.username == "cookie-user"
 
-    revoke_access_session("session-1")
+    _run(revoke_access_session_async("session-1"))
     with pytest.raises(HTTPException) as exc:
-        _run(get_current_user_v2(request=request, db=db_session))
+        _current_user_v2(async_session_factory, request)
     assert exc.value.status_code == 401
 
     token_without_sid = create_access_token({"sub": user.username})
@@ -196,7 +208,7 @@ def test_get_current_user_v2_and_session_revocation(db_session):
         cookies={get_settings().session_cookie_name_access: token_without_sid}
     )
     with pytest.raises(HTTPException) as no_sid_exc:
-        _run(get_current_user_v2(request=no_sid_request, db=db_session))
+        _current_user_v2(async_session_factory, no_sid_request)
     assert no_sid_exc.value.status_code == 401
 
 
@@ -206,58 +218,51 @@ def test_rate_limit_and_security_store_inmemory():
     store.set_with_ttl("k1", "v1", 60)
     assert store.get_value("k1") == "v1"
 
-    allowed, _, _ = rate_limit.check_rate_limit("demo", "id-1", 2, 60)
+    allowed, _, _ = asyncio.run(rate_limit.check_rate_limit("demo", "id-1", 2, 60))
     assert allowed is True
-    allowed, _, _ = rate_limit.check_rate_limit("demo", "id-1", 2, 60)
+    allowed, _, _ = asyncio.run(rate_limit.check_rate_limit("demo", "id-1", 2, 60))
     assert allowed is True
     with pytest.raises(HTTPException) as exc:
-        rate_limit.enforce_rate_limit("demo", "id-1", 2, 60)
+        asyncio.run(rate_limit.enforce_rate_limit("demo", "id-1", 2, 60))
     assert exc.value.status_code == 429
 
 
-def test_security_store_redis_and_production_branches(monkeypatch):
+def test_inmemory_store_expires_keys_through_heap(monkeypatch):
     import app.services.security_store as store_module
 
-    class FakePipeline:
-        def __init__(self, client):
-            self.client = client
-
-        def __enter__(self):
-            return self
-
-        def __exit__(self, exc_type, exc, tb):
-            return None
-
-        def incr(self, key):
-            self.client.counter += 1
+    clock = [1000.0]
+    monkeypatch.setattr(store_module.time, "time", lambda: clock[0])
+    store = store_module.InMemorySecurityStore()
 
-        def ttl(self, key):
-            return None
+    store.set_with_ttl("short", "a", 10)
+    store.set_with_ttl("long", "b", 100)
+    store.set_with_ttl("short", "a2", 50)
+    assert store.incr_with_window("counter", 20) == (1, 20)
 
-        def execute(self):
-            return self.client.counter, -1
+    clock[0] += 30
+    # The first "short" heap entry is stale: the key was re-set with a later expiry.
+    assert store.get_value("short") == "a2"
+    assert store.incr_with_window("counter", 20) == (1, 20)
 
-    class FakeRedisClient:
-        def __init__(self):
-            self.counter = 0
-            self.values = {}
+    clock[0] += 30
+    assert store.get_value("short") is None
+    assert store.get_value("long") == "b"
+    assert "counter" not in store._counters
 
-        def ping(self):
-            return True
+    monkeypatch.setattr(store_module.InMemorySecurityStore, "_COMPACT_MIN_ENTRIES", 4)
+    for _ in range(10):
+        store.set_with_ttl("hot", "x", 100)
+    assert len(store._expiries) <= 4
+    assert store.get_value("hot") == "x"
 
-        def pipeline(self):
-            return FakePipeline(self)
 
-        def expire(self, key, ttl):
-            self.values[f"ttl:{key}"] = str(ttl)
+def test_security_store_redis_and_production_branches(monkeypatch):
+    import app.services.security_store as store_module
 
-        def setex(self, key, ttl, value):
-            self.values[key] = value
+    class FakeRedisClient(fakeredis.FakeRedis):
+        pass
 
-        def get(self, key):
-            return self.values.get(key)
-
-    fake_client = FakeRedisClient()
+    fake_client = FakeRedisClient(decode_responses=True)
 
     class FakeRedisFactory:
         @staticmethod
@@ -282,10 +287,15 @@ def test_security_store_redis_and_production_branches(monkeypatch):
     redis_store.set_with_ttl("kv", "v", 10)
     assert redis_store.get_value("kv") == "v"
     assert redis_store.get_value("missing") is None
+    redis_store.delete("kv")
+    assert redis_store.get_value("kv") is None
+    redis_store.publish("channel", "message")
 
     class ExplodingRedisClient(FakeRedisClient):
-        def pipeline(self):
-            raise RuntimeError("boom")
+        def register_script(self, script):
+            def _explode(*args, **kwargs):
+                raise RuntimeError("boom")
+            return _explode
 
         def setex(self, key, ttl, value):
             raise RuntimeError("boom")
@@ -293,10 +303,19 @@ def test_security_store_redis_and_production_branches(monkeypatch):
         def get(self, key):
             raise RuntimeError("boom")
 
+        def delete(self, key):
+            raise RuntimeError("boom")
+
+        def publish(self, channel, message):
+            raise RuntimeError("boom")
+
     exploding_store = store_module.RedisSecurityStore(ExplodingRedisClient())
     assert exploding_store.incr_with_window("k", 60) == (1, 60)
+    assert exploding_store.sliding_window_hit("sw", 1, 60) == (True, 60, 1)
     exploding_store.set_with_ttl("kv", "v", 10)
     assert exploding_store.get_value("kv") is None
+    exploding_store.delete("kv")
+    exploding_store.publish("channel", "message")
 
     class BrokenRedisFactory:
         @staticmethod
@@ -320,6 +339,38 @@ def test_security_store_redis_and_production_branches(monkeypatch):
     assert isinstance(store_module.get_security_store(), store_module.InMemorySecurityStore)
 
 
+def test_async_security_store_factory(monkeypatch):
+    import app.services.security_store as store_module
+
+    in_memory = store_module.InMemorySecurityStore()
+    monkeypatch.setattr(store_module, "_store_cache", in_memory)
+    async_store = store_module.get_async_security_store()
+    assert isinstance(async_store, store_module.AsyncInMemorySecurityStore)
+    assert async_store.store is in_memory
+
+    monkeypatch.setattr(store_module.settings, "redis_url", "")
+    monkeypatch.setattr(store_module, "_async_redis_cache", None)
+    assert store_module.get_async_redis_client() is None
+
+    monkeypatch.setattr(store_module.settings, "redis_url", "redis://localhost:6390/0")
+    monkeypatch.setattr(store_module.settings, "redis_max_connections", 7)
+    client = store_module.get_async_redis_client()
+    assert client.connection_pool.max_connections == 7
+    assert store_module.get_async_redis_client() is client
+
+    sync_client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(store_module, "_store_cache", store_module.RedisSecurityStore(sync_client))
+    monkeypatch.setattr(store_module, "_async_store_cache", None)
+    redis_store = store_module.get_async_security_store()
+    assert isinstance(redis_store, store_module.AsyncRedisSecurityStore)
+    assert store_module.get_async_security_store() is redis_store
+
+    _run(store_module.close_async_redis_client())
+    assert store_module._async_redis_cache is None
+    assert store_module._async_store_cache is None
+    _run(store_module.close_async_redis_client())
+
+
 def test_request_ip_helpers_cover_forwarded_and_client_scope():
     forwarded = _make_request("GET", headers={"X-Forwarded-For": "198.51.100.1, 203.0.113.1"})
     assert request_meta_module.get_request_ip(forwarded) is None
@@ -344,78 +395,68 @@ def test_request_ip_helpers_cover_forwarded_and_client_scope():
     ) == "pytest-agent"
 
 
-def test_session_service_create_rotate_and_revoke(db_session):
+def test_refresh_tokens_keep_only_the_token_hash_unique_constraint(db_session):
+    rows = db_session.execute(text(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = 'refresh_tokens'"
+    )).all()
+    indexes = {name: sql for name, sql in rows}
+
+    assert "ix_refresh_tokens_id" not in indexes
+    assert "ix_refresh_tokens_token_hash" not in indexes
+    assert "ix_refresh_tokens_active_token_hash" not in indexes
+    # The unique constraint is the ON CONFLICT target of the write-behind upserts.
+    assert any(name.startswith("sqlite_autoindex_refresh_tokens") for name in indexes)
+
+
+def test_session_service_async_rotate_and_revoke(db_session, async_session_factory):
     security_store._store_cache = security_store.InMemorySecurityStore()
     user = user_crud.create_user(
         db_session,
         UserCreate(
-            username="session-user",
-            email="session-user@example.com",
-            password="strong-password",
-            is_admin=True
+            username="async-session-user",
+            email="async-session-user@example.com",
+            password="strong-password"
         )
     )
-
-    created = create_session_tokens(db_session, user=user, ip="127.0.0.1", user_agent="pytest")
-    assert created.access_token
-    assert created.refresh_token
-    assert created.csrf_token
-
-    assert rotate_session_tokens(
-        db_session,
-        refresh_token=created.refresh_token,
-        csrf_token="bad-csrf"
-    ) is None
-
-    rotated = rotate_session_tokens(
-        db_session,
-        refresh_token=created.refresh_token,
-        csrf_token=created.csrf_token,
-        ip="127.0.0.1",
-        user_agent="pytest"
-    )
-    assert rotated is not None
-    assert rotated.refresh_token != created.refresh_token
-
-    revoked = revoke_refresh_session(db_session, rotated.refresh_token)
-    assert revoked is not None
-    assert revoke_refresh_session(db_session, "non-existent") is None
-
-    # Unknown token branch in rotate
-    assert rotate_session_tokens(
-        db_session,
-        refresh_token="unknown-token",
-        csrf_token="anything"
-    ) is None
-
-    revoked_session = create_session_tokens(db_session, user=user)
-    revoke_access_session(revoked_session.session_id)
-    assert rotate_session_tokens(
-        db_session,
-        refresh_token=revoked_session.refresh_token,
-        csrf_token=revoked_session.csrf_token
-    ) is None
-
-
-def test_session_service_rotate_user_missing_branch(monkeypatch, db_session):
-    import app.services.session as session_module
-
-    class FakeToken:
-        csrf_token = "csrf"
-        session_id = "sid-123"
-        user_id = 1
-        user = None
-        revoked_at = None
-        last_used_at = None
-
-    monkeypatch.setattr(session_module, "_get_active_refresh_row", lambda db, refresh: FakeToken())
-    monkeypatch.setattr(session_module, "is_access_session_revoked", lambda _: False)
-
-    assert session_module.rotate_session_tokens(
-        db_session,
-        refresh_token="any",
-        csrf_token="csrf"
-    ) is None
+    created = create_session_tokens(db_session, user=user)
+    revoked_elsewhere = create_session_tokens(db_session, user=user)
+    _run(revoke_access_session_async(revoked_elsewhere.session_id))
+
+    async def _flow():
+        async with async_session_factory() as db:
+            unknown = await rotate_session_tokens_async(
+                db,
+                refresh_token="unknown-token",
+                csrf_token="anything"
+            )
+            bad_csrf = await rotate_session_tokens_async(
+                db,
+                refresh_token=created.refresh_token,
+                csrf_token="bad-csrf"
+            )
+            already_revoked = await rotate_session_tokens_async(
+                db,
+                refresh_token=revoked_elsewhere.refresh_token,
+                csrf_token=revoked_elsewhere.csrf_token
+            )
+            assert already_revoked is None
+            rotated = await rotate_session_tokens_async(
+                db,
+                refresh_token=created.refresh_token,
+                csrf_token=created.csrf_token
+            )
+            revoked = await revoke_refresh_session_async(db, rotated.refresh_token)
+            missing = await revoke_refresh_session_async(db, "non-existent")
+            return unknown, bad_csrf, rotated, revoked, missing
+
+    unknown, bad_csrf, rotated, revoked, missing = _run(_flow())
+    assert unknown is None
+    assert bad_csrf is None
+    assert rotated.session_id == created.session_id
+    assert revoked.session_id == created.session_id
+    assert missing is None
+    assert _run(is_access_session_revoked_async(created.session_id)) is True
 
 
 def test_main_deprecation_headers_and_sunset_guard(client, db_session, monkeypatch):
@@ -441,9 +482,36 @@ def test_main_deprecation_headers_and_sunset_guard(client, db_session, monkeypat
     # Force sunset
     monkeypatch.setattr(main_module.settings, "v1_deprecation_start", "2000-01-01T00:00:00+00:00")
     monkeypatch.setattr(main_module.settings, "v1_deprecation_window_days", 1)
+    monkeypatch.setattr(main_module.app, "middleware_stack", None)
     gone = client.post("/api/auth/login", json={"username": "x", "password": "y"})
     assert gone.status_code == 410
     assert gone.json()["detail"] == "API v1 descontinuada. Use /api/v2."
+    assert gone.headers.get("Deprecation") == "true"
+    assert gone.headers.get("X-Frame-Options") == "DENY"
+
+
+def test_response_headers_middleware_streams_and_keeps_route_headers():
+    async def streaming_app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"x-frame-options", b"SAMEORIGIN"), (b"deprecation", b"false")],
+        })
+        await send({"type": "http.response.body", "body": b"a", "more_body": True})
+        await send({"type": "http.response.body", "body": b"b"})
+
+    middleware = ResponseHeadersMiddleware(streaming_app, Settings(app_env="test"))
+    messages = []
+
+    async def collect(message):
+        messages.append(message)
+
+    _run(middleware({"type": "http", "path": "/api/admin/accounts"}, None, collect))
+    headers = dict(messages[0]["headers"])
+    assert headers[b"x-frame-options"] == b"SAMEORIGIN"
+    assert headers[b"deprecation"] == b"true"
+    assert headers[b"x-content-type-options"] == b"nosniff"
+    assert [message["body"] for message in messages[1:]] == [b"a", b"b"]
 
 
 def test_main_security_headers_and_auth_no_store(client, db_session, monkeypatch):
@@ -454,10 +522,14 @@ def test_main_security_headers_and_auth_no_store(client, db_session, monkeypatch
     assert health.headers.get("Referrer-Policy") == "no-referrer"
     assert "geolocation=()" in (health.headers.get("Permissions-Policy") or "")
 
+    assert health.headers.get("Strict-Transport-Security") is None
+
     monkeypatch.setattr(main_module.settings, "app_env", "production")
+    monkeypatch.setattr(main_module.app, "middleware_stack", None)
     hsts = client.get("/api/health")
     assert "max-age=31536000" in (hsts.headers.get("Strict-Transport-Security") or "")
     monkeypatch.setattr(main_module.settings, "app_env", "test")
+    main_module.app.middleware_stack = None
 
     user_crud.create_user(
         db_session,
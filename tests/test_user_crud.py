@@ -1,3 +1,5 @@
+import asyncio
+
 from app.crud import user as user_crud
 from app.schemas.user import UserCreate
 
@@ -30,3 +32,25 @@ def test_create_and_authenticate_user(db_session):
 
     assert user_crud.authenticate_user(db_session, "admin", "wrong-password") is None
     assert user_crud.authenticate_user(db_session, "missing-user", "any-password") is None
+
+
+def test_authenticate_user_async_offloads_verification(db_session, async_session_factory):
+    user_crud.create_user(
+        db_session,
+        UserCreate(
+            username="async-admin",
+            email="async-admin@example.com",
+            password="strong-password",
+            is_admin=True
+        )
+    )
+
+    async def _authenticate(username: str, password: str):
+        async with async_session_factory() as db:
+            return await user_crud.authenticate_user_async(db, username, password)
+
+    authenticated = asyncio.run(_authenticate("async-admin", "strong-password"))
+    assert authenticated is not None
+    assert authenticated.username == "async-admin"
+    assert asyncio.run(_authenticate("async-admin", "wrong-password")) is None
+    assert asyncio.run(_authenticate("missing-user", "any-password")) is None